@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+"""Benchmarks for the game's simulation and rendering hot paths.
+
+Runs headless under SDL's dummy video driver and prints JSON timings, so
+runs on different commits can be compared:
+
+    python benchmark.py --output before.json
+    python benchmark.py --compare before.json
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import itertools
+import json
+import math
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import numpy as np
+import pygame
+from src.settings import Settings
+from src.simulation import Simulation
+from src.particle import ParticleSystem
+from src.food import Food
+from src.game import Game
+from src.menu import MainMenu
+from src.batch import BatchSimulation
+from src.autopilot import Autopilot
+from src.hamiltonian import HamiltonianSolver
+from src.env import SnakeEnv, VectorSnakeEnv
+
+SNAKE_LENGTHS = [10, 1000, 10000]
+PARTICLE_COUNTS = [0, 100, 10000]
+BATCH_SIZES = [1, 256, 4096]
+ENV_GRIDS = [(60, 40), (600, 400)]
+WORLD_SIZES = [None, (500, 500), (2000, 2000)]
+MODES = {"open": "classic", "walled": "survival"}
+
+class BenchmarkRunner:
+    """Times benchmark cases and collects the results."""
+    def __init__(self, repeat=5, name_filter=None, quick=False):
+        self.repeat = repeat
+        self.name_filter = name_filter
+        self.quick = quick
+        self.results = []
+        
+    def wants(self, name):
+        return self.name_filter is None or self.name_filter in name
+        
+    def run(self, name, params, func, setup=None, number=100):
+        """Time number calls of func, repeat times, running setup before each batch."""
+        if not self.wants(name):
+            return
+        if self.quick:
+            number = max(1, number // 10)
+            
+        func()  # Warm up caches (sprites, glyphs) outside the timed region
+        batches = []
+        for _ in range(self.repeat):
+            if setup is not None:
+                setup()
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            batches.append((time.perf_counter() - start) / number * 1e6)
+            
+        result = {
+            "name": name,
+            "params": params,
+            "number": number,
+            "repeat": self.repeat,
+            "min_us": round(min(batches), 3),
+            "median_us": round(statistics.median(batches), 3),
+            "mean_us": round(statistics.fmean(batches), 3),
+        }
+        self.results.append(result)
+        print(f"{name} {params}: {result['median_us']:.1f} us", file=sys.stderr)
+
+
+def make_settings(snake_length=0):
+    """Settings with a grid big enough for the snake, plus a matching display."""
+    settings = Settings()
+    settings.SOUND_ENABLED = False
+    settings.REPLAY_RECORDING = False
+    settings.HAS_TOUCHSCREEN = False
+    
+    # Add rows until the snake fits inside the walls with a free row to spare
+    rows = math.ceil(snake_length / (settings.GRID_WIDTH - 2)) + 3
+    if rows > settings.GRID_HEIGHT:
+        settings.GRID_HEIGHT = rows
+        settings.HEIGHT = rows * settings.CELL_SIZE
+        
+    screen = pygame.display.set_mode((settings.WIDTH, settings.HEIGHT))
+    return settings, screen
+
+
+def build_snake(simulation, length):
+    """Lay the snake out in rows, head on the top playable row facing right.
+    
+    The rest of the head's row is left free, so the snake can keep moving
+    for almost a full row (or forever, in open modes) without dying.
+    """
+    settings = simulation.settings
+    walls = 1 if simulation.mode_data.get('walls', False) else 0
+    left, right = walls, settings.GRID_WIDTH - 1 - walls
+    top = walls
+    
+    # Drop any food the body would cover
+    for food in simulation.foods[:]:
+        simulation._remove_food(food)
+        
+    cells = [(left, top)]
+    y = top + 1
+    columns = list(range(left, right + 1))
+    while len(cells) < length:
+        cells.extend((x, y) for x in columns[:length - len(cells)])
+        columns.reverse()
+        y += 1
+    simulation.snake.set_body(cells)
+    simulation.snake.direction = simulation.snake.next_direction = "RIGHT"
+    simulation.snake.speed = settings.INITIAL_SNAKE_SPEED
+    simulation.game_over = False
+    simulation.spawn_food()
+
+
+def bench_simulation(runner):
+    for mode_name, mode in MODES.items():
+        for length in runner.snake_lengths:
+            params = {"mode": mode_name, "length": length}
+            settings, _ = make_settings(length)
+            simulation = Simulation(settings, mode)
+            
+            # One move per step; each batch fits in the free row ahead of the head
+            moves = settings.GRID_WIDTH - 4
+            runner.run("simulation.step", params,
+                       lambda: simulation.step(1000 / simulation.snake.speed),
+                       setup=lambda: build_snake(simulation, length), number=moves)
+                       
+            build_snake(simulation, length)
+            runner.run("simulation.check_collisions", params, simulation._check_collisions, number=1000)
+            
+            def spawn_and_remove():
+                food = simulation.spawn_food()
+                simulation._remove_food(food)
+            runner.run("simulation.spawn_food", params, spawn_and_remove, number=1000)
+
+
+def bench_batch(runner):
+    settings, _ = make_settings()
+    for mode_name, mode in MODES.items():
+        for num_envs in runner.batch_sizes:
+            batch = BatchSimulation(settings, num_envs, mode, seed=0)
+            actions = itertools.cycle(np.random.default_rng(0).integers(-1, 4, (64, num_envs)))
+            runner.run("batch.step", {"mode": mode_name, "envs": num_envs},
+                       lambda: batch.step(next(actions)), number=100)
+
+
+def bench_env(runner):
+    for width, height in runner.env_grids:
+        settings, _ = make_settings()
+        settings.GRID_WIDTH, settings.GRID_HEIGHT = width, height
+        params = {"grid": f"{width}x{height}"}
+        env = SnakeEnv(settings, "classic", seed=0)
+        
+        # Going straight wraps around the open board without ever dying
+        runner.run("env.step", params, lambda: env.step(-1), setup=env.reset, number=200)
+        runner.run("env.reset", params, env.reset, number=10)
+        
+    settings, _ = make_settings()
+    for num_envs in runner.batch_sizes:
+        env = VectorSnakeEnv(num_envs, settings, "classic", seed=0)
+        env.reset()
+        actions = itertools.cycle(np.random.default_rng(0).integers(-1, 4, (64, num_envs)))
+        runner.run("vector_env.step", {"envs": num_envs}, lambda: env.step(next(actions)), number=100)
+
+
+def bench_autopilot(runner):
+    for mode_name, mode in MODES.items():
+        for length in runner.snake_lengths[:2]:
+            params = {"mode": mode_name, "length": length}
+            settings, _ = make_settings(length)
+            simulation = Simulation(settings, mode, seed=0)
+            autopilot = Autopilot(simulation)
+            
+            # Planning from scratch, as after a reset
+            build_snake(simulation, length)
+            
+            def plan():
+                autopilot.reset()
+                autopilot.next_direction()
+            runner.run("autopilot.plan", params, plan, number=20)
+            
+            # Steady play: one decision and one move per call
+            def setup():
+                build_snake(simulation, length)
+                autopilot.reset()
+                
+            def move():
+                simulation.step(1000 / simulation.snake.speed, autopilot.next_direction())
+            runner.run("autopilot.move", params, move, setup=setup, number=200)
+
+
+def fill_board(settings, mode, seed=0):
+    """Play a game with the Hamiltonian solver until the snake fills the board.
+    
+    Only apples are spawned: power-ups could shrink the snake, and near the
+    end food worth more growth than there is room for ends the game. For
+    the same reason, once the snake will be long enough to fill the board,
+    food is cleared away until its last growth is done. Stops early if no
+    food gets eaten for several trips round the board (food the solver
+    can't get to). Returns the simulation and solver, with the game still
+    running.
+    """
+    settings.POWERUP_SPAWN_CHANCE = 0
+    settings.BONUS_FOOD_SPAWN_CHANCE = 0
+    simulation = Simulation(settings, mode, seed)
+    solver = HamiltonianSolver(simulation)
+    start = time.perf_counter()
+    patience = 4 * settings.GRID_WIDTH * settings.GRID_HEIGHT
+    score, last_meal = 0, 0
+    snake = simulation.snake
+    while not simulation.game_over and simulation.ticks - last_meal < patience:
+        if simulation.ticks and snake.length + snake.growth_pending >= len(solver.cycle):
+            for food in simulation.foods[:]:
+                simulation._remove_food(food)
+            if not snake.growth_pending:
+                break
+        simulation.step(1000 / snake.speed, solver.next_direction())
+        if simulation.score != score:
+            score, last_meal = simulation.score, simulation.ticks
+    print(f"Filled the {mode} board to length {simulation.snake.length} in {simulation.ticks} moves "
+          f"({time.perf_counter() - start:.0f}s)", file=sys.stderr)
+    if simulation.game_over:
+        print(f"The solver lost ({simulation.cause_of_death}); timings won't mean much", file=sys.stderr)
+    return simulation, solver
+
+
+def bench_full_board(runner):
+    """Per-move costs with the snake as long as the board allows."""
+    if not runner.full_board:
+        return
+    for mode_name, mode in MODES.items():
+        if not runner.wants("full_board"):
+            return
+        settings, _ = make_settings()
+        simulation, solver = fill_board(settings, mode)
+        params = {"mode": mode_name, "length": simulation.snake.length}
+        
+        def step():
+            simulation.step(1000 / simulation.snake.speed, solver.next_direction())
+        runner.run("full_board.step", params, step, number=1000)
+        runner.run("full_board.check_collisions", params, simulation._check_collisions, number=1000)
+        
+        def spawn_food():
+            # There's normally no free cell left, so this measures the failed search
+            food = simulation.spawn_food()
+            if food is not None:
+                simulation._remove_food(food)
+        runner.run("full_board.spawn_food", params, spawn_food, number=1000)
+
+
+def bench_snake(runner):
+    for length in runner.snake_lengths:
+        params = {"length": length}
+        settings, screen = make_settings(length)
+        simulation = Simulation(settings)
+        build_snake(simulation, length)
+        snake = simulation.snake
+        food_positions = list(simulation.foods)
+        
+        runner.run("snake.update", params, lambda: snake.update(1000 / settings.TICK_RATE, food_positions))
+        runner.run("snake.draw", params, lambda: snake.draw(screen, 0.5), number=20)
+
+
+def bench_particles(runner):
+    settings, screen = make_settings()
+    for count in runner.particle_counts:
+        params = {"count": count}
+        system = ParticleSystem(settings, capacity=max(count, 1))
+        
+        def refill():
+            system.clear()
+            system.create_particles(settings.WIDTH // 2, settings.HEIGHT // 2, count)
+            
+        # Particles only live PARTICLE_LIFETIME frames, so batches stay shorter
+        refill()
+        runner.run("particles.update", params, system.update, setup=refill,
+                   number=settings.PARTICLE_LIFETIME // 2)
+        refill()
+        runner.run("particles.draw", params, lambda: system.draw(screen), number=20)
+
+
+def bench_food(runner):
+    settings, screen = make_settings()
+    for food_type in settings.FOOD_COLORS:
+        food = Food(settings, food_type, (settings.GRID_WIDTH // 2, settings.GRID_HEIGHT // 2))
+        
+        def animate_and_draw():
+            food.animate()
+            food.draw(screen)
+        runner.run("food.draw", {"type": food_type}, animate_and_draw, number=200)
+
+
+def bench_obstacles(runner):
+    for mode in ("obstacle", "survival"):
+        settings, screen = make_settings()
+        simulation = Simulation(settings, mode)
+        obstacles = simulation.obstacles
+        
+        def draw_all():
+            for obstacle in obstacles:
+                obstacle.draw(screen)
+        runner.run("obstacle.draw", {"mode": mode, "count": len(obstacles)}, draw_all, number=20)
+
+
+def bench_game(runner):
+    for mode_name, mode in MODES.items():
+        for length in runner.snake_lengths[:2]:
+            params = {"mode": mode_name, "length": length}
+            settings, screen = make_settings(length)
+            game = Game(screen, settings)
+            game.set_mode(mode)
+            build_snake(game.simulation, length)
+            
+            def rebuild_background():
+                game.background_key = None
+                game.chunk_layers.key = None
+                game._get_background_layer()
+            runner.run("game.background_layer", params, rebuild_background, number=5)
+            runner.run("game.render", params, game.render, number=20)
+
+
+def bench_world(runner):
+    for size in runner.world_sizes:
+        params = {"world": "window" if size is None else "x".join(map(str, size))}
+        settings, screen = make_settings()
+        settings.set_world_size(size)
+        game = Game(screen, settings)
+        game.set_mode("classic")
+        runner.run("world.reset", params, game.reset, number=1)
+        
+        # Keep the snake moving, so the camera scrolls and new chunks come into view
+        step_ms = 1000 / settings.TICK_RATE
+        
+        def step_and_render():
+            game.simulation.step(step_ms)
+            game.render()
+        runner.run("world.render", params, step_and_render, number=20)
+
+
+def bench_menu(runner):
+    settings, screen = make_settings()
+    menu = MainMenu(screen, settings)
+    runner.run("menu.draw_background", {}, menu._draw_background, number=50)
+    
+    def stars():
+        menu.star_field.update()
+        menu.star_field.draw(screen)
+    runner.run("menu.star_field", {"count": len(menu.star_field)}, stars, number=200)
+    runner.run("menu.render", {}, menu.render, number=20)
+
+
+BENCHMARKS = [bench_simulation, bench_batch, bench_env, bench_autopilot, bench_full_board,
+              bench_snake, bench_particles, bench_food, bench_obstacles, bench_game, bench_world,
+              bench_menu]
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path):
+    """Print each benchmark's median time against a previous run's."""
+    with open(baseline_path) as f:
+        baseline = {(r["name"], json.dumps(r["params"], sort_keys=True)): r
+                    for r in json.load(f)["results"]}
+    print(f"{'benchmark':<66} {'before':>10} {'after':>10} {'ratio':>7}", file=sys.stderr)
+    for result in results:
+        key = (result["name"], json.dumps(result["params"], sort_keys=True))
+        label = f"{result['name']} {key[1]}"
+        before = baseline.get(key)
+        if before is None:
+            print(f"{label:<66} {'-':>10} {result['median_us']:>10.1f}", file=sys.stderr)
+            continue
+        ratio = result["median_us"] / before["median_us"] if before["median_us"] else float("inf")
+        print(f"{label:<66} {before['median_us']:>10.1f} {result['median_us']:>10.1f} {ratio:>6.2f}x",
+              file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the game's hot paths.")
+    parser.add_argument("--output", help="write JSON results to this file instead of stdout")
+    parser.add_argument("--repeat", type=int, default=5, help="timed batches per benchmark")
+    parser.add_argument("--filter", help="only run benchmarks whose name contains this")
+    parser.add_argument("--quick", action="store_true",
+                        help="skip the largest workloads and run fewer iterations")
+    parser.add_argument("--compare", metavar="JSON", help="compare against a previous run")
+    parser.add_argument("--full-board", action="store_true",
+                        help="also play games until the board is full and time moves at that "
+                             "length (takes a few minutes)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    args = parser.parse_args()
+    
+    random.seed(args.seed)
+    pygame.init()
+    
+    runner = BenchmarkRunner(args.repeat, args.filter, args.quick)
+    runner.snake_lengths = SNAKE_LENGTHS[:-1] if args.quick else SNAKE_LENGTHS
+    runner.particle_counts = PARTICLE_COUNTS[:-1] if args.quick else PARTICLE_COUNTS
+    runner.batch_sizes = BATCH_SIZES[:-1] if args.quick else BATCH_SIZES
+    runner.env_grids = ENV_GRIDS[:-1] if args.quick else ENV_GRIDS
+    runner.world_sizes = WORLD_SIZES[:-1] if args.quick else WORLD_SIZES
+    runner.full_board = args.full_board
+    for bench in BENCHMARKS:
+        bench(runner)
+        
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "video_driver": pygame.display.get_driver(),
+            "repeat": args.repeat,
+            "quick": args.quick,
+        },
+        "results": runner.results,
+    }
+    pygame.quit()
+    
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+        
+    if args.compare:
+        compare(runner.results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
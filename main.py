@@ -1,19 +1,96 @@
 #!/usr/bin/env python3
 import pygame
+import argparse
 import sys
 import os
+import time
 from src.game import Game
 from src.menu import MainMenu
 from src.settings import Settings
+from src.text import render_text
+from src.profiler import profiler
+from src.replay import Replay, play_headless
+
+def world_size(text):
+    """Parse a world size given as COLUMNSxROWS, e.g. 2000x2000."""
+    try:
+        columns, rows = (int(n) for n in text.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected COLUMNSxROWS, got {text!r}")
+    if columns < 10 or rows < 10:
+        raise argparse.ArgumentTypeError("the world must be at least 10x10 cells")
+    return (columns, rows)
+
+def replay_settings(replay):
+    """Settings for watching a replay, sized to the world it was recorded in."""
+    settings = Settings()
+    if replay.grid_size != (settings.GRID_WIDTH, settings.GRID_HEIGHT):
+        settings.set_world_size(replay.grid_size)
+    return settings
+
+def can_write_replays(directory):
+    """Whether replays can be saved in directory, creating it if needed."""
+    try:
+        os.makedirs(directory, exist_ok=True)
+    except OSError:
+        return False
+    return os.access(directory, os.W_OK)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Realistic Snake")
+    parser.add_argument("--replay", metavar="FILE", help="watch a recorded game")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay playback rate")
+    parser.add_argument("--headless", action="store_true",
+                        help="re-simulate the replay at full speed without a display and check it")
+    parser.add_argument("--profile", action="store_true",
+                        help="record frame timings from launch (otherwise only while F3 shows them)")
+    parser.add_argument("--record", action="store_true",
+                        help="save a replay of every game in the replays folder")
+    parser.add_argument("--autopilot", action="store_true",
+                        help="let the computer play, restarting after each game (attract mode)")
+    parser.add_argument("--world", type=world_size, metavar="COLUMNSxROWS",
+                        help="play in a world of this many cells, scrolling if it's bigger than the window")
+    args = parser.parse_args()
+    if args.headless and not args.replay:
+        parser.error("--headless needs --replay")
+    return args
+
+def verify_replay(path):
+    """Re-simulate a replay headlessly and report whether it matched the recording."""
+    replay = Replay.load(path)
+    start = time.perf_counter()
+    player = play_headless(replay, replay_settings(replay))
+    elapsed = time.perf_counter() - start
+    
+    print(f"{path}: {replay.mode}, seed {replay.seed}, {player.position} steps "
+          f"({replay.duration / 1000:.1f}s of play) re-simulated in {elapsed:.2f}s")
+    print(f"Score {player.simulation.score} (recorded {replay.score})")
+    if player.desync_step is not None:
+        print(f"Out of sync from step {player.desync_step}")
+        return 1
+    return 0
 
 def main():
+    args = parse_args()
+    if args.headless:
+        sys.exit(verify_replay(args.replay))
+        
     # Initialize pygame and mixer
     pygame.mixer.pre_init(44100, -16, 2, 512)
     pygame.init()
     pygame.mixer.init()
     
-    # Set up the game window
-    settings = Settings()
+    # Set up the game window (a replay is watched in the world it was recorded in)
+    replay = Replay.load(args.replay) if args.replay else None
+    if replay is not None:
+        settings = replay_settings(replay)
+    else:
+        settings = Settings()
+        settings.set_world_size(args.world)
+    if args.record:
+        settings.REPLAY_RECORDING = can_write_replays(settings.REPLAY_DIR)
+        if not settings.REPLAY_RECORDING:
+            print(f"Can't write to {settings.REPLAY_DIR}, so replays won't be saved")
     screen = pygame.display.set_mode((settings.WIDTH, settings.HEIGHT))
     pygame.display.set_caption("Realistic Snake")
     
@@ -32,6 +109,10 @@ def main():
         pygame.draw.circle(icon, (80, 180, 30), (icon_size//2, icon_size//2), icon_size//3)  # Snake head
         pygame.display.set_icon(icon)
     
+    # Per-frame timing instrumentation (also on while the F3 overlay is shown)
+    settings.PROFILING_ENABLED = settings.PROFILING_ENABLED or args.profile
+    profiler.set_enabled(settings.PROFILING_ENABLED)
+    
     # Initialize clock for controlling frame rate
     clock = pygame.time.Clock()
     
@@ -43,6 +124,19 @@ def main():
     state = 0
     selected_mode = None
     
+    # In attract mode the computer plays, and starts again when it loses
+    game.set_autopilot(args.autopilot)
+    game_over_time = None
+    if args.autopilot and replay is None:
+        selected_mode = "classic"
+        game.set_mode(selected_mode)
+        state = 1
+    
+    # Go straight to watching a replay if one was given
+    if replay is not None:
+        game.start_playback(replay, args.speed)
+        state = 1
+    
     # Detect if this is likely a touch device - try to detect at launch
     try:
         # Use a dummy event check to try to detect touch capability
@@ -59,6 +153,9 @@ def main():
     # Main game loop
     running = True
     while running:
+        profiler.begin_frame()
+        events_start = time.perf_counter()
+        
         # Process pygame events - get all events at the start of the frame
         current_events = list(pygame.event.get())
         
@@ -78,7 +175,17 @@ def main():
             # Detect touch events at any point
             if event.type == pygame.FINGERDOWN:
                 settings.HAS_TOUCHSCREEN = True
-            
+                
+            # Profiling overlay (F3) and timing dump (F4) work in every state
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                profiler.toggle_overlay()
+                profiler.set_enabled(profiler.overlay_visible or settings.PROFILING_ENABLED)
+                continue
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F4:
+                path = profiler.dump(time.strftime("profile-%Y%m%d-%H%M%S.json"))
+                print(f"Saved frame timings to {path}")
+                continue
+                
             # Pass events to current game state
             if state == 0:  # Menu
                 new_state = main_menu.handle_event(event)
@@ -127,29 +234,36 @@ def main():
                         state = 1  # Start new game
                     elif event.key == pygame.K_ESCAPE:
                         state = 0  # Return to menu
+        profiler.record("events", events_start)
         
-        # Update and render current game state
-        screen.fill(settings.BG_COLOR)
-        
-        if state == 0:  # Menu
-            main_menu.update()
-            main_menu.render()
+        # Update and render current game state (the game draws its own
+        # pre-rendered background)
+        if state != 1:
+            screen.fill(settings.BG_COLOR)
             
+        if state == 0:  # Menu
+            with profiler.measure("menu"):
+                main_menu.update()
+                main_menu.render()
+                
         elif state == 1:  # Game
             game.update()
             game.render()
             if game.game_over:
                 state = 2  # Go to game over screen
+                game_over_time = pygame.time.get_ticks()
                 
         elif state == 2:  # Game Over
+            if args.autopilot and pygame.time.get_ticks() - game_over_time > 3000:
+                game.reset()
+                state = 1
+                continue
             # Game over screen
-            font = pygame.font.Font(None, 74)
-            text = font.render("Game Over", True, settings.TEXT_COLOR)
+            text = render_text("Game Over", 74, settings.TEXT_COLOR)
             text_rect = text.get_rect(center=(settings.WIDTH // 2, settings.HEIGHT // 2 - 50))
             screen.blit(text, text_rect)
             
-            font = pygame.font.Font(None, 36)
-            text = font.render(f"Score: {game.score}", True, settings.TEXT_COLOR)
+            text = render_text(f"Score: {game.score}", 36, settings.TEXT_COLOR)
             text_rect = text.get_rect(center=(settings.WIDTH // 2, settings.HEIGHT // 2 + 20))
             screen.blit(text, text_rect)
             
@@ -166,24 +280,36 @@ def main():
             pygame.draw.rect(screen, restart_color, restart_button, border_radius=8)
             pygame.draw.rect(screen, menu_color, menu_button, border_radius=8)
             
-            font = pygame.font.Font(None, 28)
-            restart_text = font.render("Restart", True, settings.TEXT_COLOR)
-            menu_text = font.render("Menu", True, settings.TEXT_COLOR)
+            restart_text = render_text("Restart", 28, settings.TEXT_COLOR)
+            menu_text = render_text("Menu", 28, settings.TEXT_COLOR)
             
             screen.blit(restart_text, restart_text.get_rect(center=restart_button.center))
             screen.blit(menu_text, menu_text.get_rect(center=menu_button.center))
             
             # Show keyboard instructions if not using touch
             if not settings.HAS_TOUCHSCREEN:
-                text = font.render("Press SPACE to restart or ESC for menu", True, settings.TEXT_COLOR)
+                text = render_text("Press SPACE to restart or ESC for menu", 28, settings.TEXT_COLOR)
                 text_rect = text.get_rect(center=(settings.WIDTH // 2, settings.HEIGHT // 2 + 70))
                 screen.blit(text, text_rect)
         
-        # Update display and cap framerate
-        pygame.display.flip()
+        # The profiling overlay isn't one of the game's dirty rects, so the
+        # whole screen is redrawn while it's visible
+        if profiler.overlay_visible:
+            profiler.draw_overlay(screen, settings.TEXT_COLOR)
+            if game.dirty_rects is not None:
+                game.dirty_rects.invalidate()
+                
+        # Update display (only the changed regions when the game renders
+        # with dirty rects) and cap framerate
+        with profiler.measure("flip"):
+            if state == 1 and game.update_rects is not None and not profiler.overlay_visible:
+                pygame.display.update(game.update_rects)
+            else:
+                pygame.display.flip()
         clock.tick(settings.FPS)
     
     # Clean up
+    game.finish_recording()
     pygame.quit()
     sys.exit()
 
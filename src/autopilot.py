@@ -0,0 +1,375 @@
+from array import array
+from collections import deque
+from src.grid import SNAKE, OBSTACLE, FOOD, LARGE_GRID_CELLS
+from src.simulation import DIRECTIONS
+
+class NeighborGrid:
+    """UP/DOWN/LEFT/RIGHT neighbours of a cell index, worked out when asked for.
+    
+    Indexed like the list neighbor_table() builds for small grids, but
+    stores nothing per cell.
+    """
+    def __init__(self, width, height, wrap=True):
+        self.width = width
+        self.height = height
+        self.wrap = wrap
+        
+    def __getitem__(self, cell):
+        width, height = self.width, self.height
+        y, x = divmod(cell, width)
+        if self.wrap:
+            size = width * height
+            row = cell - x
+            return ((cell - width) % size, (cell + width) % size,
+                    row + (x - 1) % width, row + (x + 1) % width)
+        return (cell - width if y > 0 else None, cell + width if y < height - 1 else None,
+                cell - 1 if x > 0 else None, cell + 1 if x < width - 1 else None)
+
+
+def cell_table(size, value=0):
+    """A table of one int per cell: a list, which is quickest to index, or
+    on grids of more than LARGE_GRID_CELLS cells an array at 4 bytes a cell."""
+    if size > LARGE_GRID_CELLS:
+        return array('i', [value]) * size
+    return [value] * size
+
+def neighbor_table(width, height, wrap=True):
+    """For each cell index, its UP/DOWN/LEFT/RIGHT neighbours (None off the edge).
+    
+    Large grids get a NeighborGrid instead of a table.
+    """
+    if width * height > LARGE_GRID_CELLS:
+        return NeighborGrid(width, height, wrap)
+    table = []
+    for y in range(height):
+        for x in range(width):
+            neighbors = []
+            for dx, dy in ((0, -1), (0, 1), (-1, 0), (1, 0)):
+                nx, ny = x + dx, y + dy
+                if wrap:
+                    nx %= width
+                    ny %= height
+                elif not (0 <= nx < width and 0 <= ny < height):
+                    neighbors.append(None)
+                    continue
+                neighbors.append(ny * width + nx)
+            table.append(neighbors)
+    return table
+
+
+class Autopilot:
+    """Steers a simulation's snake: to the nearest food when that's safe,
+    otherwise after its own tail.
+    
+    Paths are found by breadth-first search over the occupancy grid. The
+    tick at which the head entered each cell is kept up to date as the
+    snake moves, so how long a body cell stays occupied is known without
+    walking the body, and a search may enter it once the tail has left. A
+    path to food is only taken if the tail is still reachable after eating.
+    
+    A planned path is then followed without searching again while only the
+    tail moves. If the snake grows unexpectedly on the way, the rest of the
+    path is re-checked and only the part from the first cell that's no
+    longer safe is searched again. When no food can be reached safely, the
+    snake chases its tail for RETRY_MOVES moves before looking again.
+    
+    A search gives up after reaching MAX_SEARCH_CELLS cells, so a move
+    costs the same however big the world is. Food further away than that
+    is headed for through the searched cell closest to it.
+    """
+    RETRY_MOVES = 8
+    MAX_SEARCH_CELLS = 8192
+    
+    def __init__(self, simulation):
+        self.simulation = simulation
+        self.path = deque()  # Cells still to visit, next move first
+        self.target = None  # Food cell the path leads to (None when chasing the tail)
+        self.planned_length = None  # Length + pending growth the path was checked for
+        self.direction = None
+        self.last_ticks = None
+        self.last_head = None
+        self.retry_ticks = 0  # Don't look for food again before this tick
+        self.grid_key = None
+        
+    def reset(self):
+        self.path.clear()
+        self.target = None
+        self.last_ticks = None
+        self.retry_ticks = 0
+        
+    def _prepare(self, grid, walls):
+        """Build the per-cell tables for the grid's size and wrapping."""
+        self.neighbors = neighbor_table(grid.width, grid.height, wrap=not walls)
+        self.wrap = not walls
+        size = grid.width * grid.height
+        self.entered = cell_table(size)  # Tick at which the head last entered each cell
+        self.seen = cell_table(size)  # Search stamp per cell, so searches need no clearing
+        self.parent = cell_table(size)
+        self.stamp = 0
+        self.exhausted = False  # Whether the last search gave up at MAX_SEARCH_CELLS
+        self.grid_key = (grid.width, grid.height, walls)
+        self.last_ticks = None
+        
+    def next_direction(self):
+        """Direction for the snake's next move (cached until the snake moves)."""
+        simulation = self.simulation
+        ticks = simulation.ticks
+        if ticks == self.last_ticks:
+            return self.direction
+            
+        grid = simulation.grid
+        walls = simulation.mode_data.get('walls', False)
+        if (grid.width, grid.height, walls) != self.grid_key:
+            self._prepare(grid, walls)
+            
+        snake = simulation.snake
+        head_x, head_y = snake.get_head_grid_position()
+        head = head_y * grid.width + head_x
+        if (self.last_ticks is not None and ticks == self.last_ticks + 1
+                and head in self.neighbors[self.last_head]):
+            self.entered[head] = ticks
+        else:
+            # First move, or the game was reset or rewound: stamp the whole body
+            self.path.clear()
+            self.retry_ticks = 0
+            for i, (x, y) in enumerate(snake.get_segments_positions()):
+                self.entered[y * grid.width + x] = ticks - i
+        self.last_ticks = ticks
+        self.last_head = head
+        
+        # A body cell is vacated entered + expiry moves from now
+        length = snake.length + snake.growth_pending
+        expiry = length - ticks
+        if not self._follow_path(head, grid, length, expiry):
+            if ticks < self.retry_ticks or not self._plan(head, grid, snake, expiry):
+                if ticks >= self.retry_ticks:
+                    self.retry_ticks = ticks + self.RETRY_MOVES
+                self._chase_tail(head, grid, snake, expiry)
+                
+        self.direction = self._direction_to(head, self.path[0]) if self.path else None
+        return self.direction
+        
+    def _blocked(self, cell, contents, moves, expiry):
+        return contents & OBSTACLE or (contents & SNAKE and self.entered[cell] + expiry > moves)
+        
+    def _follow_path(self, head, grid, length, expiry):
+        """Advance along the current path, repairing it if the snake grew unexpectedly."""
+        path = self.path
+        if len(path) < 2 or head != path[0]:
+            return False
+        if self.target is not None and not grid.cells[self.target] & FOOD:
+            return False
+        path.popleft()
+        if length == self.planned_length:
+            return True
+            
+        # The snake ate something on the way, so its body cells free up later
+        previous = head
+        for moves, cell in enumerate(path, 1):
+            if self._blocked(cell, grid.cells[cell], moves, expiry):
+                if self.target is None:
+                    return False
+                kept = list(path)[:moves - 1]
+                rest = self._search(previous, {self.target}, grid, expiry, len(kept))
+                if rest is None:
+                    return False
+                self.path = deque(kept + rest)
+                break
+            previous = cell
+        self.planned_length = length
+        return True
+        
+    def _search(self, start, targets, grid, expiry, start_moves=0, extra=(), avoid=OBSTACLE,
+                timed=True, partial=False):
+        """Shortest path from start to any target cell.
+        
+        A snake cell may be entered once the tail has left it, i.e. when
+        entered + expiry is at most the number of moves taken to get there;
+        extra cells count as snake cells too. With timed=False only target
+        cells are let through that way, and the rest of the body stays where
+        it is when the search starts. Cells tagged with anything in avoid are
+        never entered. Returns the cells after start, or None if no target
+        is reachable. If the search gives up (see exhausted) with partial
+        set, the path to the searched cell closest to a target is returned.
+        """
+        neighbors = self.neighbors
+        cells = grid.cells
+        entered = self.entered
+        seen = self.seen
+        parent = self.parent
+        self.stamp += 1
+        stamp = self.stamp
+        seen[start] = stamp
+        frontier = [start]
+        moves = start_moves
+        frozen_limit = -expiry
+        budget = self.MAX_SEARCH_CELLS
+        self.exhausted = False
+        while frontier:
+            if budget <= 0:
+                self.exhausted = True
+                if partial:
+                    return self._path(start, self._closest(frontier, targets, grid))
+                return None
+            moves += 1
+            limit = moves - expiry
+            next_frontier = []
+            for cell in frontier:
+                for neighbor in neighbors[cell]:
+                    if neighbor is None or seen[neighbor] == stamp:
+                        continue
+                    contents = cells[neighbor]
+                    if contents & avoid:
+                        continue
+                    if contents & SNAKE or neighbor in extra:
+                        if entered[neighbor] > (limit if timed or neighbor in targets else frozen_limit):
+                            continue
+                    seen[neighbor] = stamp
+                    parent[neighbor] = cell
+                    if neighbor in targets:
+                        return self._path(start, neighbor)
+                    next_frontier.append(neighbor)
+                    budget -= 1
+            frontier = next_frontier
+        return None
+        
+    def _path(self, start, end):
+        """Cells after start up to end, following the last search's parents."""
+        parent = self.parent
+        path = []
+        while end != start:
+            path.append(end)
+            end = parent[end]
+        path.reverse()
+        return path
+        
+    def _closest(self, cells, targets, grid):
+        """The cell nearest (in moves on an empty board) to any target."""
+        width, height = grid.width, grid.height
+        points = [(target % width, target // width) for target in targets]
+        
+        def distance(cell):
+            x, y = cell % width, cell // width
+            best = None
+            for target_x, target_y in points:
+                dx, dy = abs(x - target_x), abs(y - target_y)
+                if self.wrap:
+                    dx, dy = min(dx, width - dx), min(dy, height - dy)
+                if best is None or dx + dy < best:
+                    best = dx + dy
+            return best
+        return min(cells, key=distance)
+                
+    def _plan(self, head, grid, snake, expiry):
+        """Plan a path to the nearest food that leaves a way back to the tail."""
+        width = grid.width
+        foods = {}
+        for food in self.simulation.foods:
+            x, y = food.position
+            foods[y * width + x] = food.points
+        if not foods:
+            return False
+        path = self._search(head, foods, grid, expiry, partial=True)
+        if not path:
+            return False
+            
+        # Look for a way from the food (or the cell on the way to it) to where
+        # the tail will be just after eating, with the path cells stamped as if
+        # the head had moved along it. Only cells free at that point count
+        # (see _chase_tail), and a search that gives up has found plenty of room.
+        target = path[-1]
+        ticks = self.last_ticks
+        length = snake.length + snake.growth_pending
+        body_length = snake.length + min(snake.growth_pending, len(path))
+        tail_index = body_length - 1 - len(path)
+        if tail_index >= 0:
+            x, y = snake.get_segment_position(tail_index)
+            tail = y * width + x
+        else:
+            tail = path[-tail_index - 1]
+            
+        entered = self.entered
+        saved = [entered[cell] for cell in path]
+        for moves, cell in enumerate(path, 1):
+            entered[cell] = ticks + moves
+        future_expiry = length + foods.get(target, 0) - ticks - len(path)
+        escape = tail == target or self._search(target, {tail}, grid, future_expiry,
+                                                extra=set(path), timed=False) is not None
+        escape = escape or (self.exhausted and length < self.MAX_SEARCH_CELLS)
+        for cell, value in zip(path, saved):
+            entered[cell] = value
+        if not escape:
+            return False
+            
+        self.path = deque(path)
+        self.target = target if target in foods else None
+        self.planned_length = length
+        return True
+        
+    def _chase_tail(self, head, grid, snake, expiry):
+        """Follow the tail, or failing that head for the most open space."""
+        self.path.clear()
+        self.target = None
+        self.planned_length = snake.length + snake.growth_pending
+        if snake.length > 1:
+            # Only go through cells that are free now. Cutting through cells
+            # the tail is about to leave would put body between the head and
+            # wherever the tail has got to by the time the path ends; this way
+            # the cells it left behind lead straight to it. Stay off food if
+            # possible, since eating stops the tail as the head catches up.
+            x, y = snake.get_segment_position(snake.length - 1)
+            tail = {y * grid.width + x}
+            path = (self._search(head, tail, grid, expiry, avoid=OBSTACLE | FOOD, timed=False,
+                                 partial=True)
+                    or self._search(head, tail, grid, expiry, timed=False))
+            if path:
+                self.path.extend(path)
+                return
+                
+            # Otherwise take one step towards where the tail will be and look again
+            path = self._search(head, tail, grid, expiry)
+            if path:
+                self.path.append(path[0])
+                return
+                
+        best_step, best_space = None, 0
+        for neighbor in self.neighbors[head]:
+            if neighbor is None or self._blocked(neighbor, grid.cells[neighbor], 1, expiry):
+                continue
+            space = self._open_space(neighbor, grid, expiry, min(snake.length, self.MAX_SEARCH_CELLS))
+            if space > best_space:
+                best_step, best_space = neighbor, space
+        if best_step is not None:
+            self.path.append(best_step)
+            
+    def _open_space(self, start, grid, expiry, limit):
+        """Count the cells reachable from start, stopping once limit are found."""
+        neighbors = self.neighbors
+        cells = grid.cells
+        seen = self.seen
+        self.stamp += 1
+        stamp = self.stamp
+        seen[start] = stamp
+        count = 1
+        frontier = [start]
+        moves = 1
+        while frontier and count < limit:
+            moves += 1
+            next_frontier = []
+            for cell in frontier:
+                for neighbor in neighbors[cell]:
+                    if neighbor is None or seen[neighbor] == stamp:
+                        continue
+                    if self._blocked(neighbor, cells[neighbor], moves, expiry):
+                        continue
+                    seen[neighbor] = stamp
+                    count += 1
+                    next_frontier.append(neighbor)
+            frontier = next_frontier
+        return count
+        
+    def _direction_to(self, head, cell):
+        for direction, neighbor in zip(DIRECTIONS, self.neighbors[head]):
+            if neighbor == cell:
+                return direction
+        return None
\ No newline at end of file
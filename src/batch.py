@@ -0,0 +1,229 @@
+import numpy as np
+from src.grid import SNAKE, OBSTACLE, FOOD
+from src.simulation import DIRECTION_CODES
+
+# Moves for each direction code
+DX = np.array([0, 0, -1, 1], dtype=np.int64)
+DY = np.array([-1, 1, 0, 0], dtype=np.int64)
+
+# Causes of death, indexed by the cause codes in BatchSimulation.cause
+CAUSES = [None, "self", "obstacle", "time"]
+
+class BatchSimulation:
+    """Many independent games stepped in lockstep with NumPy.
+    
+    Every game's occupancy grid, body ring buffer, food, score and alive
+    flag are rows of shared arrays, so step() moves every snake, checks
+    every collision and handles every meal with a fixed number of
+    vectorized operations however many games there are. The rules follow
+    Simulation: tails move out of the way before the head moves in, eating
+    skips the fatal checks, walls are obstacles on the border and the board
+    wraps around.
+    
+    One step is one snake move, so snake speed (and with it speed-ups and
+    the slow/speed power-ups) doesn't apply; timed modes end after as many
+    moves as fit in the time limit at the initial speed. Each game has one
+    food at a time, a bonus (3 points) with BONUS_FOOD_SPAWN_CHANCE or else
+    an apple (1 point), and power-ups aren't spawned.
+    """
+    APPLE_POINTS = 1
+    BONUS_POINTS = 3
+    
+    def __init__(self, settings, num_envs, mode="classic", seed=None, auto_reset=True):
+        self.settings = settings
+        self.num_envs = num_envs
+        self.width = settings.GRID_WIDTH
+        self.height = settings.GRID_HEIGHT
+        self.size = self.width * self.height
+        self.mode = mode
+        self.mode_data = settings.GAME_MODES[mode]
+        self.num_obstacles = self.mode_data.get('num_obstacles', 10) if self.mode_data.get('obstacles', False) else 0
+        time_limit = self.mode_data.get('time_limit', None)
+        self.max_steps = time_limit * settings.INITIAL_SNAKE_SPEED // 1000 if time_limit else None
+        self.auto_reset = auto_reset  # Start a new game as soon as one ends
+        self.rng = np.random.default_rng(seed)
+        
+        # Per-game state; body[i] is a ring buffer of cell indices (y * width + x)
+        # with the head at body[i, head[i]] and the tail length[i] - 1 slots before
+        self.grid = np.zeros((num_envs, self.size), dtype=np.uint8)
+        self.body = np.zeros((num_envs, self.size), dtype=np.int32)
+        self.head = np.zeros(num_envs, dtype=np.int64)
+        self.length = np.zeros(num_envs, dtype=np.int64)
+        self.growth = np.zeros(num_envs, dtype=np.int64)
+        self.direction = np.zeros(num_envs, dtype=np.int64)
+        self.food = np.full(num_envs, -1, dtype=np.int64)
+        self.food_points = np.zeros(num_envs, dtype=np.int64)
+        self.score = np.zeros(num_envs, dtype=np.int64)
+        self.steps = np.zeros(num_envs, dtype=np.int64)
+        self.alive = np.zeros(num_envs, dtype=bool)
+        self.cause = np.zeros(num_envs, dtype=np.int8)
+        self.envs = np.arange(num_envs)
+        
+        # Results of each game's last finished episode
+        self.episode_score = np.zeros(num_envs, dtype=np.int64)
+        self.episode_length = np.zeros(num_envs, dtype=np.int64)
+        self.episode_steps = np.zeros(num_envs, dtype=np.int64)
+        self.episode_cause = np.zeros(num_envs, dtype=np.int8)
+        self.episodes = 0
+        
+        # Empty board (with walls for walled modes), the same initial snake
+        # as Snake.reset() (tail first), and the cells food and obstacles may
+        # be placed on (as in Simulation)
+        self.empty_grid = np.zeros((self.height, self.width), dtype=np.uint8)
+        if self.mode_data.get('walls', False):
+            self.empty_grid[[0, -1], :] = OBSTACLE
+            self.empty_grid[:, [0, -1]] = OBSTACLE
+        self.empty_grid = self.empty_grid.ravel()
+        start_x = self.width // 4
+        start_y = self.height // 2
+        self.initial_body = np.array([start_y * self.width + start_x - i
+                                      for i in range(settings.INITIAL_SNAKE_LENGTH - 1, -1, -1)])
+        self.food_region = self._region(1)
+        self.obstacle_region = self._region(2)
+        
+        self.reset()
+        
+    def _region(self, margin):
+        ys, xs = np.mgrid[margin:self.height - margin, margin:self.width - margin]
+        return (ys * self.width + xs).ravel()
+        
+    def reset(self, env_ids=None):
+        """Start new games in the given environments (all by default)."""
+        if env_ids is None:
+            env_ids = self.envs
+        env_ids = np.asarray(env_ids)
+        if not len(env_ids):
+            return
+            
+        length = len(self.initial_body)
+        self.grid[env_ids] = self.empty_grid
+        self.grid[env_ids[:, None], self.initial_body] = SNAKE
+        self.body[env_ids, :length] = self.initial_body
+        self.head[env_ids] = length - 1
+        self.length[env_ids] = length
+        self.growth[env_ids] = 0
+        self.direction[env_ids] = DIRECTION_CODES["RIGHT"]
+        self.score[env_ids] = 0
+        self.steps[env_ids] = 0
+        self.alive[env_ids] = True
+        self.cause[env_ids] = 0
+        
+        # Food first, then obstacles, as in Simulation.reset()
+        self._spawn_food(env_ids)
+        for _ in range(self.num_obstacles):
+            cells = self._choose_free_cells(env_ids, self.obstacle_region)
+            placed = cells >= 0
+            self.grid[env_ids[placed], cells[placed]] |= OBSTACLE
+            
+    def _choose_free_cells(self, env_ids, region):
+        """Pick a random empty cell of region for each game (-1 if there are none)."""
+        cells = np.full(len(env_ids), -1, dtype=np.int64)
+        pending = np.arange(len(env_ids))
+        
+        # Random guesses find a free cell almost immediately unless the board
+        # is nearly full; those games fall back to scanning their region
+        for _ in range(8):
+            if not len(pending):
+                return cells
+            guesses = region[self.rng.integers(0, len(region), len(pending))]
+            free = self.grid[env_ids[pending], guesses] == 0
+            cells[pending[free]] = guesses[free]
+            pending = pending[~free]
+        for i in pending:
+            free_cells = region[self.grid[env_ids[i], region] == 0]
+            if len(free_cells):
+                cells[i] = free_cells[self.rng.integers(len(free_cells))]
+        return cells
+        
+    def _spawn_food(self, env_ids):
+        cells = self._choose_free_cells(env_ids, self.food_region)
+        self.food[env_ids] = cells
+        placed = cells >= 0
+        self.grid[env_ids[placed], cells[placed]] |= FOOD
+        bonus = self.rng.random(len(env_ids)) < self.settings.BONUS_FOOD_SPAWN_CHANCE
+        self.food_points[env_ids] = np.where(bonus, self.BONUS_POINTS, self.APPLE_POINTS)
+        
+    def head_cells(self):
+        """Cell index of every game's head."""
+        return self.body[self.envs, self.head]
+        
+    def grid_view(self):
+        """The occupancy grids as a (num_envs, height, width) view."""
+        return self.grid.reshape(self.num_envs, self.height, self.width)
+        
+    def snake_cells(self, env):
+        """Cell indices of one game's body, head first."""
+        slots = (self.head[env] - np.arange(self.length[env])) % self.size
+        return self.body[env, slots]
+        
+    def step(self, actions=None):
+        """Move every live snake once.
+        
+        actions holds a direction code per game (see DIRECTIONS in
+        src.simulation), or -1 to keep going straight; reversing is ignored as
+        in Snake.change_direction.
+        Returns (points eaten, done) arrays. Finished games are restarted
+        straight away when auto_reset is set, after copying their results
+        into the episode_* arrays.
+        """
+        alive = self.alive
+        if actions is not None:
+            actions = np.asarray(actions)
+            turn = alive & (actions >= 0) & (actions != (self.direction ^ 1))
+            self.direction[turn] = actions[turn]
+            
+        # Next head cell, wrapping around the board
+        head_cells = self.body[self.envs, self.head]
+        x = (head_cells % self.width + DX[self.direction]) % self.width
+        y = (head_cells // self.width + DY[self.direction]) % self.height
+        new_heads = y * self.width + x
+        
+        # Vacate the tail cell of snakes that aren't growing first, so the
+        # head may follow the tail into it
+        growing = alive & (self.growth > 0)
+        self.growth[growing] -= 1
+        movers = np.flatnonzero(alive & ~growing)
+        tails = self.body[movers, (self.head[movers] - self.length[movers] + 1) % self.size]
+        self.grid[movers, tails] &= ~SNAKE & 0xFF
+        self.length[movers] -= 1
+        
+        # Collisions are one lookup into each game's grid
+        target = self.grid[self.envs, new_heads]
+        eaten = alive & ((target & FOOD) != 0)
+        crashed = alive & ~eaten & ((target & (SNAKE | OBSTACLE)) != 0)
+        self.cause[crashed] = np.where(target[crashed] & SNAKE, 1, 2)
+        
+        # Push the new heads, including ones that crashed, as Simulation
+        # moves the snake before checking collisions (eating replaces the food)
+        moved = np.flatnonzero(alive)
+        self.head[moved] = (self.head[moved] + 1) % self.size
+        self.body[moved, self.head[moved]] = new_heads[moved]
+        self.grid[moved, new_heads[moved]] = (target[moved] & (~FOOD & 0xFF)) | SNAKE
+        self.length[moved] += 1
+        self.steps[moved] += 1
+        
+        points = np.where(eaten, self.food_points, 0)
+        eaters = np.flatnonzero(eaten)
+        if len(eaters):
+            self.score[eaters] += points[eaters]
+            self.growth[eaters] += points[eaters]
+            self._spawn_food(eaters)
+            
+        # Timed modes end after a fixed number of moves
+        done = crashed
+        if self.max_steps is not None:
+            timed_out = alive & ~crashed & (self.steps >= self.max_steps)
+            self.cause[timed_out] = 3
+            done = crashed | timed_out
+        self.alive[done] = False
+        
+        finished = np.flatnonzero(done)
+        if len(finished):
+            self.episode_score[finished] = self.score[finished]
+            self.episode_length[finished] = self.length[finished]
+            self.episode_steps[finished] = self.steps[finished]
+            self.episode_cause[finished] = self.cause[finished]
+            self.episodes += len(finished)
+            if self.auto_reset:
+                self.reset(finished)
+        return points, done
\ No newline at end of file
@@ -0,0 +1,44 @@
+import pygame
+
+class Camera:
+    """The part of the world shown in the window.
+    
+    x and y are the world pixel at the window's top-left corner; things in
+    the world are drawn at their world pixel position minus offset. follow()
+    centres the view on a point but keeps it inside the world, so a world
+    no bigger than the window never scrolls.
+    """
+    def __init__(self, settings):
+        self.settings = settings
+        self.x = 0
+        self.y = 0
+        
+    @property
+    def offset(self):
+        return (self.x, self.y)
+        
+    def follow(self, x, y):
+        """Centre the view on world pixel (x, y) as far as the world's edges allow."""
+        settings = self.settings
+        self.x = self._clamp(x - settings.WIDTH / 2,
+                             settings.GRID_WIDTH * settings.CELL_SIZE - settings.WIDTH)
+        self.y = self._clamp(y - settings.HEIGHT / 2,
+                             settings.GRID_HEIGHT * settings.CELL_SIZE - settings.HEIGHT)
+                             
+    @staticmethod
+    def _clamp(position, limit):
+        # Whole pixels, so cached layers line up with the grid
+        return int(min(max(position, 0), max(limit, 0)))
+        
+    def view_rect(self, margin=0):
+        """World pixel rect in view, grown by margin on every side."""
+        return pygame.Rect(self.x - margin, self.y - margin,
+                           self.settings.WIDTH + margin * 2, self.settings.HEIGHT + margin * 2)
+                           
+    def visible_cells(self):
+        """Grid cells in view as (left, top, right, bottom), right and bottom exclusive."""
+        settings = self.settings
+        cell_size = settings.CELL_SIZE
+        return (self.x // cell_size, self.y // cell_size,
+                min(settings.GRID_WIDTH, -(-(self.x + settings.WIDTH) // cell_size)),
+                min(settings.GRID_HEIGHT, -(-(self.y + settings.HEIGHT) // cell_size)))
\ No newline at end of file
@@ -0,0 +1,52 @@
+import pygame
+
+class DirtyRectTracker:
+    """Tracks which parts of the screen changed since the last frame.
+    
+    Everything drawn over the static background is recorded with add().
+    At the start of a frame the regions drawn last frame are restored from
+    the background, so only those and this frame's regions need to be sent
+    to the display. When they cover more than threshold of the screen a
+    full flip is cheaper, and end_frame() returns None instead.
+    """
+    def __init__(self, size, threshold=0.5):
+        self.screen_rect = pygame.Rect((0, 0), size)
+        self.threshold = threshold
+        self.previous = []
+        self.current = []
+        self.full_redraw = True
+        
+    def invalidate(self):
+        """Redraw and update the whole screen on the next frame."""
+        self.full_redraw = True
+        
+    def begin_frame(self, screen, background):
+        """Restore the background under everything drawn last frame."""
+        self.current = []
+        if self.full_redraw:
+            screen.blit(background, (0, 0))
+        else:
+            for rect in self.previous:
+                screen.blit(background, rect, rect)
+                
+    def add(self, rect):
+        """Record a region drawn this frame."""
+        if rect is None:
+            return
+        rect = self.screen_rect.clip(rect)
+        if rect.width and rect.height:
+            self.current.append(rect)
+            
+    def end_frame(self):
+        """Return the rects to pass to pygame.display.update(), or None to flip."""
+        rects = self.previous + self.current
+        self.previous = self.current
+        
+        if self.full_redraw:
+            self.full_redraw = False
+            return None
+            
+        dirty_area = sum(rect.width * rect.height for rect in rects)
+        if dirty_area > self.threshold * self.screen_rect.width * self.screen_rect.height:
+            return None
+        return rects
\ No newline at end of file
@@ -0,0 +1,289 @@
+import random
+import numpy as np
+from src.settings import Settings
+from src.simulation import Simulation, DIRECTIONS
+from src.batch import BatchSimulation
+from src.grid import SNAKE, OBSTACLE
+
+# Observation channels, in order
+CHANNELS = ["head", "body", "apple", "bonus", "power", "obstacle"]
+HEAD, BODY, APPLE, BONUS, POWER, OBSTACLES = range(len(CHANNELS))
+FOOD_CHANNELS = {"apple": APPLE, "bonus": BONUS, "power": POWER}
+
+# Reward for each event; a step's reward is the sum over its events
+DEFAULT_REWARDS = {
+    # Eating each type of food
+    "apple": 1.0,
+    "bonus": 3.0,
+    "power": 2.0,
+    # Each power-up taking effect, on top of eating it
+    "speed": 0.0,
+    "slow": 0.0,
+    "shrink": 0.0,
+    "ghost": 0.0,
+    # Crashing (running out of time in timed modes isn't a death)
+    "death": -1.0,
+    # Every move
+    "move": 0.0,
+}
+
+def make_rewards(rewards=None):
+    """DEFAULT_REWARDS with the given entries overridden."""
+    table = dict(DEFAULT_REWARDS)
+    if rewards:
+        unknown = set(rewards) - set(table)
+        if unknown:
+            raise ValueError(f"Unknown reward events: {', '.join(sorted(unknown))}")
+        table.update(rewards)
+    return table
+
+
+class SnakeEnv:
+    """Reinforcement learning environment over a Simulation, one snake move per step.
+    
+    Follows the Gymnasium API without depending on it: reset() returns
+    (observation, info) and step(action) returns (observation, reward,
+    terminated, truncated, info). Actions are indices into DIRECTIONS, or
+    -1 (or None) to keep going.
+    
+    The observation is a (channels, height, width) array, with a 1 in each
+    channel of CHANNELS where that thing is. It's allocated once and kept
+    up to date in place: a step rewrites only the cells the occupancy grid
+    logged as changed, the old and new head and the food, so it costs the
+    same on any size of board. Every call returns the same array, so copy
+    it to keep an earlier observation.
+    
+    The reward sums the rewards table (see DEFAULT_REWARDS) over the step's
+    events; override reward() to shape it some other way.
+    """
+    actions = DIRECTIONS
+    
+    def __init__(self, settings=None, mode="classic", seed=None, rewards=None, max_moves=None,
+                 dtype=np.uint8):
+        self.settings = settings if settings is not None else Settings()
+        self.rewards = make_rewards(rewards)
+        self.max_moves = max_moves  # Truncate episodes after this many moves
+        self.rng = random.Random(seed)  # Picks each episode's game seed
+        self.simulation = Simulation(self.settings, mode, self.rng.randrange(2 ** 32))
+        self.grid = self.simulation.grid
+        self.grid.record_changes()
+        self.width, self.height = self.grid.width, self.grid.height
+        self.observation = np.zeros((len(CHANNELS), self.height, self.width), dtype=dtype)
+        self.flat = self.observation.reshape(len(CHANNELS), -1)  # View with one row per channel
+        self.head = None
+        self.food_cells = []
+        self.obstacle_version = None
+        self.moves = 0
+        
+    def reset(self, seed=None):
+        """Start a new game. A seed reseeds the sequence of game seeds."""
+        if seed is not None:
+            self.rng.seed(seed)
+        self.simulation.reset(self.rng.randrange(2 ** 32))
+        self.moves = 0
+        self._rebuild()
+        return self.observation, self._info()
+        
+    def step(self, action):
+        """Play one snake move."""
+        simulation = self.simulation
+        if simulation.game_over:
+            raise RuntimeError("The game is over; call reset() first")
+        direction = DIRECTIONS[action] if action is not None and action >= 0 else None
+        
+        # Advance the clock to the snake's next move, carrying power-up
+        # timers and time limits along as in a real game
+        events = []
+        ticks = simulation.ticks
+        while simulation.ticks == ticks and not simulation.game_over:
+            snake = simulation.snake
+            dt = max(0.0, 1000 / snake.speed - snake.time_since_last_move)
+            events.extend(simulation.step(dt, direction))
+            direction = None
+        self.moves += 1
+        self._update()
+        
+        terminated = simulation.game_over
+        truncated = not terminated and self.max_moves is not None and self.moves >= self.max_moves
+        return self.observation, self.reward(events), terminated, truncated, self._info()
+        
+    def reward(self, events):
+        """Reward for a move that produced the given simulation events."""
+        rewards = self.rewards
+        total = rewards["move"]
+        for kind, value in events:
+            if kind == "eat":
+                total += rewards[value.food_type]
+            elif kind == "powerup":
+                total += rewards[value]
+            elif kind == "game_over":
+                total += rewards["death"]
+        return total
+        
+    def _info(self):
+        simulation = self.simulation
+        return {
+            "score": simulation.score,
+            "length": simulation.snake.length,
+            "moves": self.moves,
+            "cause": simulation.cause_of_death,
+        }
+        
+    def _rebuild(self):
+        """Fill in the whole observation from the grid."""
+        cells = np.frombuffer(self.grid.cells, dtype=np.uint8)
+        flat = self.flat
+        flat[:] = 0
+        flat[BODY] = cells & SNAKE
+        flat[OBSTACLES] = (cells & OBSTACLE) != 0
+        self.grid.changes.clear()
+        self.obstacle_version = self.simulation.obstacle_version
+        self.head = None
+        self.food_cells = []
+        self._update()
+        
+    def _update(self):
+        """Bring the observation up to date with what changed since the last call."""
+        simulation = self.simulation
+        if simulation.obstacle_version != self.obstacle_version:
+            # Reset or restored, so every cell may have changed
+            self._rebuild()
+            return
+        flat = self.flat
+        body = flat[BODY]
+        cells = self.grid.cells
+        changes = self.grid.changes
+        for cell in changes:
+            body[cell] = cells[cell] & SNAKE
+        changes.clear()
+        
+        # The head's cell belongs to the head channel only
+        head_x, head_y = simulation.snake.get_head_grid_position()
+        head = head_y * self.width + head_x
+        if head != self.head:
+            if self.head is not None:
+                flat[HEAD, self.head] = 0
+                body[self.head] = cells[self.head] & SNAKE
+            flat[HEAD, head] = 1
+            self.head = head
+        body[head] = 0
+        
+        # There are only ever a few foods, so they're simply redrawn
+        for channel, cell in self.food_cells:
+            flat[channel, cell] = 0
+        self.food_cells = []
+        for food in simulation.foods:
+            x, y = food.position
+            self.food_cells.append((FOOD_CHANNELS[food.food_type], y * self.width + x))
+            flat[FOOD_CHANNELS[food.food_type], y * self.width + x] = 1
+
+
+class VectorSnakeEnv:
+    """Many environments stepped together by a BatchSimulation.
+    
+    Like SnakeEnv, with everything batched: step() takes an array of
+    actions and returns arrays of rewards, terminated and truncated flags,
+    and the observations are one (num_envs, channels, height, width) array
+    kept up to date in place with a fixed number of vectorized operations
+    per step. Finished games restart straight away, so the observation of
+    a game that just ended is already its next game's first; the info
+    arrays hold the finished game's score, length and moves.
+    
+    BatchSimulation plays one move per step and has no power-ups, so the
+    power channel stays empty and only the apple, bonus, death and move
+    rewards apply.
+    """
+    actions = DIRECTIONS
+    
+    def __init__(self, num_envs, settings=None, mode="classic", seed=None, rewards=None,
+                 max_moves=None, dtype=np.uint8):
+        self.settings = settings if settings is not None else Settings()
+        self.rewards = make_rewards(rewards)
+        self.max_moves = max_moves
+        self.batch = BatchSimulation(self.settings, num_envs, mode, seed, auto_reset=False)
+        self.num_envs = num_envs
+        self.width, self.height = self.batch.width, self.batch.height
+        self.observation = np.zeros((num_envs, len(CHANNELS), self.height, self.width), dtype=dtype)
+        self.flat = self.observation.reshape(num_envs, len(CHANNELS), -1)
+        
+    def reset(self, seed=None):
+        """Start new games in every environment."""
+        batch = self.batch
+        if seed is not None:
+            batch.rng = np.random.default_rng(seed)
+        batch.reset()
+        self._rebuild(batch.envs)
+        return self.observation, self._info()
+        
+    def step(self, actions):
+        """Move every snake once; actions holds a direction index (or -1) per game."""
+        batch = self.batch
+        envs = batch.envs
+        flat = self.flat
+        old_heads = batch.head_cells()
+        old_tails = batch.body[envs, (batch.head - batch.length + 1) % batch.size]
+        old_food = batch.food.copy()
+        old_points = batch.food_points.copy()
+        
+        points, terminated = batch.step(actions)
+        grid = batch.grid
+        
+        # Cells that can have changed: the old head and tail, the old and new
+        # food, and the new head
+        flat[envs, HEAD, old_heads] = 0
+        flat[envs, BODY, old_heads] = grid[envs, old_heads] & SNAKE
+        flat[envs, BODY, old_tails] = grid[envs, old_tails] & SNAKE
+        had_food = old_food >= 0
+        flat[envs[had_food], APPLE, old_food[had_food]] = 0
+        flat[envs[had_food], BONUS, old_food[had_food]] = 0
+        heads = batch.head_cells()
+        flat[envs, BODY, heads] = 0
+        flat[envs, HEAD, heads] = 1
+        self._draw_food(envs)
+        
+        rewards = self.rewards
+        reward = np.full(self.num_envs, rewards["move"], dtype=np.float64)
+        eaten = points > 0
+        reward[eaten] += np.where(old_points[eaten] == batch.BONUS_POINTS,
+                                  rewards["bonus"], rewards["apple"])
+        died = terminated & (batch.cause != 3)
+        reward[died] += rewards["death"]
+        
+        truncated = np.zeros(self.num_envs, dtype=bool)
+        if self.max_moves is not None:
+            truncated = batch.alive & (batch.steps >= self.max_moves)
+        info = self._info()
+        
+        finished = np.flatnonzero(terminated | truncated)
+        if len(finished):
+            batch.reset(finished)
+            self._rebuild(finished)
+        return self.observation, reward, terminated, truncated, info
+        
+    def _info(self):
+        batch = self.batch
+        return {
+            "score": batch.score.copy(),
+            "length": batch.length.copy(),
+            "moves": batch.steps.copy(),
+        }
+        
+    def _draw_food(self, env_ids):
+        batch = self.batch
+        food = batch.food[env_ids]
+        placed = food >= 0
+        channels = np.where(batch.food_points[env_ids] == batch.BONUS_POINTS, BONUS, APPLE)
+        self.flat[env_ids[placed], channels[placed], food[placed]] = 1
+        
+    def _rebuild(self, env_ids):
+        """Fill in the given games' observations from their grids."""
+        batch = self.batch
+        grid = batch.grid[env_ids]
+        flat = self.flat
+        flat[env_ids] = 0
+        flat[env_ids, BODY] = grid & SNAKE
+        flat[env_ids, OBSTACLES] = (grid & OBSTACLE) != 0
+        heads = batch.body[env_ids, batch.head[env_ids]]
+        flat[env_ids, BODY, heads] = 0
+        flat[env_ids, HEAD, heads] = 1
+        self._draw_food(env_ids)
\ No newline at end of file
@@ -2,14 +2,19 @@ import pygame
 import random
 import math
 from src.particle import ParticleSystem
+from src.glow import draw_glow
 
 class Food:
-    def __init__(self, settings, food_type="apple"):
+    SPARKLE_CAPACITY = 16  # Live sparkle particles per food (only bonus and power foods sparkle)
+    
+    def __init__(self, settings, food_type="apple", position=None, rng=None, spawn_time=0):
         self.settings = settings
         self.food_type = food_type
         self.position = (0, 0)
         self.lifetime = None  # None for indefinite or milliseconds if timed
-        self.spawn_time = pygame.time.get_ticks()
+        self.spawn_time = spawn_time  # Simulation time (ms) the food appeared
+        # Random source for gameplay choices, so seeded games are reproducible
+        self.rng = rng if rng is not None else random
         
         # Set properties based on food type
         if food_type == "apple":
@@ -28,15 +33,15 @@ class Food:
             self.radius = self.settings.CELL_SIZE // 2 * 1.1
             self.lifetime = 6000  # 6 seconds
             # Randomly choose a power-up type
-            self.powerup_type = random.choice(["speed", "slow", "shrink", "ghost"])
+            self.powerup_type = self.rng.choice(["speed", "slow", "shrink", "ghost"])
             
         # For visual effects
-        self.pulse_effect = random.random()
-        self.pulse_direction = 1 if random.random() > 0.5 else -1
-        self.angle = random.randint(0, 360)
-        self.rotation_speed = random.uniform(0.5, 2.0) * self.pulse_direction
+        self.pulse_effect = self.rng.random()
+        self.pulse_direction = 1 if self.rng.random() > 0.5 else -1
+        self.angle = self.rng.randint(0, 360)
+        self.rotation_speed = self.rng.uniform(0.5, 2.0) * self.pulse_direction
         
-        self.particle_system = ParticleSystem(settings)
+        self.particle_system = None  # Sparkle pool, made on the first sparkle
         self.despawn_time = None
         
         # Set food properties based on type
@@ -47,8 +52,11 @@ class Food:
         elif food_type == "power":
             self.despawn_time = 5000  # Power-ups despawn after 5 seconds
         
-        # Place food in a valid position (initially random)
-        self.respawn(None)
+        # Place food at the given position, or a random one
+        if position is not None:
+            self.position = position
+        else:
+            self.respawn(None)
         
     def respawn(self, occupied_positions):
         """Place food in a random position that doesn't overlap with the snake or obstacles."""
@@ -65,14 +73,13 @@ class Food:
         
         while not valid_position and attempts < max_attempts:
             # Generate random position
-            x = random.randint(1, self.settings.GRID_WIDTH - 2)
-            y = random.randint(1, self.settings.GRID_HEIGHT - 2)
+            x = self.rng.randint(1, self.settings.GRID_WIDTH - 2)
+            y = self.rng.randint(1, self.settings.GRID_HEIGHT - 2)
             
             # Check if position is valid (not on snake or obstacles)
             if (x, y) not in occupied_positions_set:
                 valid_position = True
                 self.position = (x, y)
-                self.spawn_time = pygame.time.get_ticks()
                 
             attempts += 1
             
@@ -82,18 +89,21 @@ class Food:
                 for y in range(1, self.settings.GRID_HEIGHT - 1):
                     if (x, y) not in occupied_positions_set:
                         self.position = (x, y)
-                        self.spawn_time = pygame.time.get_ticks()
                         return
-            
+                        
             # If still no valid position, place it in the center as a last resort
             self.position = (self.settings.GRID_WIDTH // 2, self.settings.GRID_HEIGHT // 2)
-            self.spawn_time = pygame.time.get_ticks()
-                        
-    def update(self):
-        """Update food state and animations. Return False if expired."""
-        current_time = pygame.time.get_ticks()
+            
+    def update(self, current_time):
+        """Check food lifetime at the given simulation time (ms). Return False if expired."""
+        # Check if food has expired
+        if self.lifetime and current_time - self.spawn_time > self.lifetime:
+            return False
+            
+        return True
         
-        # Update animation effects
+    def animate(self):
+        """Advance the pulse and rotation animations by one frame."""
         self.pulse_effect += 0.05 * self.pulse_direction
         if self.pulse_effect > 1.0:
             self.pulse_effect = 1.0
@@ -105,17 +115,20 @@ class Food:
         # Update rotation
         self.angle = (self.angle + self.rotation_speed) % 360
         
-        # Check if food has expired
-        if self.lifetime and current_time - self.spawn_time > self.lifetime:
-            return False
-            
-        return True
+    def get_bounds(self, offset=(0, 0)):
+        """Screen rect that draw() can touch, including the glow."""
+        x = self.position[0] * self.settings.CELL_SIZE + self.settings.CELL_SIZE // 2 - offset[0]
+        y = self.position[1] * self.settings.CELL_SIZE + self.settings.CELL_SIZE // 2 - offset[1]
         
-    def draw(self, screen):
-        """Draw food with enhanced visual effects."""
+        # Largest pulse (1.2x) times the outer glow (1.5x) and bonus glow (1.5x)
+        extent = int(self.radius * 1.2 * 1.5 * 1.5) + 3
+        return pygame.Rect(x - extent, y - extent, extent * 2, extent * 2)
+        
+    def draw(self, screen, offset=(0, 0)):
+        """Draw food with enhanced visual effects, shifted left and up by offset."""
         # Calculate screen position
-        x = self.position[0] * self.settings.CELL_SIZE + self.settings.CELL_SIZE // 2
-        y = self.position[1] * self.settings.CELL_SIZE + self.settings.CELL_SIZE // 2
+        x = self.position[0] * self.settings.CELL_SIZE + self.settings.CELL_SIZE // 2 - offset[0]
+        y = self.position[1] * self.settings.CELL_SIZE + self.settings.CELL_SIZE // 2 - offset[1]
         
         # Calculate animation effects
         pulse_amount = self.pulse_effect * 0.2
@@ -130,17 +143,11 @@ class Food:
             elif self.food_type == "power":
                 glow_multiplier = 1.3
                 
-            # Draw outer glow
+            # Draw outer glow from cached sprites
             for i in range(3):
                 glow_radius = radius * (1.5 - i * 0.2) * glow_multiplier
                 alpha = 120 - i * 30
-                glow_color = (*self.color, alpha)
-                glow_surface = pygame.Surface((glow_radius*2, glow_radius*2), pygame.SRCALPHA)
-                pygame.draw.circle(glow_surface, glow_color, 
-                                  (glow_radius, glow_radius), glow_radius)
-                screen.blit(glow_surface, 
-                           (x - glow_radius, y - glow_radius),
-                           special_flags=pygame.BLEND_ALPHA_SDL2)
+                draw_glow(screen, self.color, (x, y), glow_radius, alpha)
         
         # Draw base food shape with subtle 3D effect
         pygame.draw.circle(screen, (0, 0, 0, 180), (x+2, y+2), radius)  # Shadow
@@ -188,18 +195,13 @@ class Food:
             pixel_x = self.position[0] * self.settings.CELL_SIZE + self.settings.CELL_SIZE // 2
             pixel_y = self.position[1] * self.settings.CELL_SIZE + self.settings.CELL_SIZE // 2
             color = self.color
+            if self.particle_system is None:
+                self.particle_system = ParticleSystem(self.settings, self.SPARKLE_CAPACITY)
             self.particle_system.create_particles(pixel_x, pixel_y, 1, color)
             
         # Update particles
-        self.particle_system.update()
-        
-        # Check if food should despawn
-        if self.despawn_time:
-            current_time = pygame.time.get_ticks()
-            if current_time - self.spawn_time >= self.despawn_time:
-                return False  # Signal that food should be removed
-                
-        return True  # Food should stay
+        if self.particle_system is not None:
+            self.particle_system.update()
         
     def _draw_star(self, screen, x, y, radius, points, angle_offset=0):
         """Draw a star shape."""
@@ -310,50 +312,74 @@ class Food:
 
 
 class Obstacle:
-    def __init__(self, x, y, settings):
+    # Pre-rendered looks shared by all obstacles, keyed by (cell size, color, variant)
+    sprite_atlas = {}
+    SPRITE_VARIANTS = 16
+    
+    def __init__(self, x, y, settings, is_wall=False):
         self.position = (x, y)
         self.settings = settings
+        self.is_wall = is_wall
         self.color = (100, 100, 100)
         self.shadow_color = (70, 70, 70)
         self.highlight_color = (130, 130, 130)
         
-    def draw(self, screen):
-        # Convert grid position to pixel position
+    def draw(self, screen, offset=(0, 0)):
+        # Convert grid position to pixel position and blit the cached sprite
         cell_size = self.settings.CELL_SIZE
         x, y = self.position
-        rect = pygame.Rect(x * cell_size, y * cell_size, cell_size, cell_size)
+        screen.blit(self.get_sprite(), (x * cell_size - offset[0], y * cell_size - offset[1]))
+        
+    def get_sprite(self):
+        """Return this obstacle's pre-rendered appearance from the shared atlas."""
+        cell_size = self.settings.CELL_SIZE
+        variant = self._variant()
+        key = (cell_size, self.color, variant)
+        sprite = Obstacle.sprite_atlas.get(key)
+        if sprite is None:
+            sprite = self._render_sprite(cell_size, variant)
+            Obstacle.sprite_atlas[key] = sprite
+        return sprite
+        
+    def _variant(self):
+        # Stable position hash, so an obstacle always gets the same cracks
+        x, y = self.position
+        return ((x * 73856093) ^ (y * 19349663)) % self.SPRITE_VARIANTS
+        
+    def _render_sprite(self, cell_size, variant):
+        sprite = pygame.Surface((cell_size, cell_size))
+        rect = sprite.get_rect()
         
         # Draw base rect
-        pygame.draw.rect(screen, self.color, rect)
+        pygame.draw.rect(sprite, self.color, rect)
         
         # Draw 3D effect
         edge_size = max(2, cell_size // 8)
         
         # Top highlight
-        pygame.draw.rect(screen, self.highlight_color, 
+        pygame.draw.rect(sprite, self.highlight_color, 
                         (rect.left, rect.top, rect.width, edge_size))
-        pygame.draw.rect(screen, self.highlight_color, 
+        pygame.draw.rect(sprite, self.highlight_color, 
                         (rect.left, rect.top, edge_size, rect.height))
                         
         # Bottom shadow
-        pygame.draw.rect(screen, self.shadow_color, 
+        pygame.draw.rect(sprite, self.shadow_color, 
                         (rect.left, rect.bottom - edge_size, rect.width, edge_size))
-        pygame.draw.rect(screen, self.shadow_color, 
+        pygame.draw.rect(sprite, self.shadow_color, 
                         (rect.right - edge_size, rect.top, edge_size, rect.height))
                         
         # Crack details for variety
         crack_color = (50, 50, 50)
         
-        # Add unique cracks based on position to ensure they're always the same for a given obstacle
-        seed = hash(str(x) + str(y)) % 10000
-        random.seed(seed)
+        # Private RNG so the cracks never disturb the gameplay random state
+        rng = random.Random(variant)
         
         # Draw 2-3 random cracks
-        for _ in range(random.randint(2, 3)):
-            start_x = random.randint(rect.left + edge_size, rect.right - edge_size)
-            start_y = random.randint(rect.top + edge_size, rect.bottom - edge_size)
-            length = random.randint(cell_size // 4, cell_size // 2)
-            angle = random.uniform(0, 2 * math.pi)
+        for _ in range(rng.randint(2, 3)):
+            start_x = rng.randint(rect.left + edge_size, rect.right - edge_size)
+            start_y = rng.randint(rect.top + edge_size, rect.bottom - edge_size)
+            length = rng.randint(cell_size // 4, cell_size // 2)
+            angle = rng.uniform(0, 2 * math.pi)
             
             end_x = start_x + int(math.cos(angle) * length)
             end_y = start_y + int(math.sin(angle) * length)
@@ -363,11 +389,11 @@ class Obstacle:
             end_y = max(rect.top + 1, min(rect.bottom - 1, end_y))
             
             # Draw the crack with a branch
-            pygame.draw.line(screen, crack_color, (start_x, start_y), (end_x, end_y), 1)
+            pygame.draw.line(sprite, crack_color, (start_x, start_y), (end_x, end_y), 1)
             
             # Maybe add a branch to the crack
-            if random.random() < 0.7:
-                branch_angle = angle + random.uniform(-math.pi/4, math.pi/4)
+            if rng.random() < 0.7:
+                branch_angle = angle + rng.uniform(-math.pi/4, math.pi/4)
                 branch_length = length // 2
                 branch_x = end_x + int(math.cos(branch_angle) * branch_length)
                 branch_y = end_y + int(math.sin(branch_angle) * branch_length)
@@ -376,7 +402,8 @@ class Obstacle:
                 branch_x = max(rect.left + 1, min(rect.right - 1, branch_x))
                 branch_y = max(rect.top + 1, min(rect.bottom - 1, branch_y))
                 
-                pygame.draw.line(screen, crack_color, (end_x, end_y), (branch_x, branch_y), 1)
+                pygame.draw.line(sprite, crack_color, (end_x, end_y), (branch_x, branch_y), 1)
                 
-        # Reset random seed after use
-        random.seed() 
\ No newline at end of file
+        if pygame.display.get_surface() is not None:
+            sprite = sprite.convert()
+        return sprite
\ No newline at end of file
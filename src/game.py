@@ -1,39 +1,62 @@
 import pygame
-import random
 import os
 import math
-from src.snake import Snake
-from src.food import Food, Obstacle
+import time
+from src.simulation import Simulation
+from src.replay import Replay, ReplayPlayer
+from src.autopilot import Autopilot
 from src.particle import ParticleSystem
+from src.camera import Camera
+from src.world import ChunkLayers
+from src.text import render_text
+from src.dirty_rects import DirtyRectTracker
+from src.profiler import profiler
 
 class Game:
-    def __init__(self, screen, settings):
+    def __init__(self, screen, settings, clock=None):
         self.screen = screen
         self.settings = settings
-        self.game_over = False
         self.paused = False
-        self.score = 0
-        self.high_score = 0
-        self.current_mode = "classic"
-        self.mode_data = settings.GAME_MODES[self.current_mode]
-        
-        # Initialize game objects
-        self.snake = Snake(settings)
-        self.foods = []
-        self.obstacles = []
+        
+        # Source of the current time in milliseconds; replaceable so games can
+        # run on a simulated clock
+        self.clock = clock if clock is not None else pygame.time.get_ticks
+        
+        # Game rules and state live in a display-free simulation
+        self.simulation = Simulation(settings)
         self.particle_system = ParticleSystem(settings)
         
+        # Pre-rendered background, grid and obstacles (see _get_background_layer),
+        # composed from per-chunk layers for the part of the world in view
+        self.camera = Camera(settings)
+        self.chunk_layers = ChunkLayers(settings)
+        self.background_layer = None
+        self.background_key = None
+        self.background_view = None
+        
+        # Optional dirty-rect rendering: update_rects is what main.py should
+        # pass to pygame.display.update(), or None for a full flip
+        self.dirty_rects = None
+        if settings.DIRTY_RECT_RENDERING:
+            self.dirty_rects = DirtyRectTracker((settings.WIDTH, settings.HEIGHT),
+                                                settings.DIRTY_RECT_THRESHOLD)
+        self.update_rects = None
+        self.ui_rects = []
+        self.overlay_shown = False
+        
+        # Replays: the recording of the game in progress, and the player when
+        # watching a recorded game instead of playing
+        self.recorder = None
+        self.player = None
+        self.playback_rate = 1.0
+        self.last_replay_path = None
+        
+        # Computer player steering the snake (attract mode and soak tests)
+        self.autopilot = None
+        
         # Load sounds
         self.sounds = self._load_sounds()
         
-        # Power-up effects
-        self.active_powerups = {
-            "speed": {"active": False, "end_time": 0},
-            "slow": {"active": False, "end_time": 0},
-            "shrink": {"active": False, "end_time": 0},
-            "ghost": {"active": False, "end_time": 0}
-        }
-        
         # Touch controls
         self.touch_enabled = True
         self._init_touch_controls()
@@ -41,6 +64,47 @@ class Game:
         # Initialize game state
         self.reset()
         
+    # Game state is owned by the simulation; expose it for rendering and main.py
+    @property
+    def snake(self):
+        return self.simulation.snake
+        
+    @property
+    def foods(self):
+        return self.simulation.foods
+        
+    @property
+    def obstacles(self):
+        return self.simulation.obstacles
+        
+    @property
+    def score(self):
+        return self.simulation.score
+        
+    @property
+    def high_score(self):
+        return self.simulation.high_score
+        
+    @property
+    def game_over(self):
+        return self.simulation.game_over
+        
+    @property
+    def active_powerups(self):
+        return self.simulation.active_powerups
+        
+    @property
+    def time_remaining(self):
+        return self.simulation.time_remaining
+        
+    @property
+    def current_mode(self):
+        return self.simulation.current_mode
+        
+    @property
+    def mode_data(self):
+        return self.simulation.mode_data
+        
     def _load_sounds(self):
         sounds = {}
         sounds_dir = os.path.join('assets', 'sounds')
@@ -70,375 +134,320 @@ class Game:
             
         return sounds
         
-    def reset(self):
-        # Reset game state
-        self.game_over = False
-        self.paused = False
-        self.score = 0
-        self.time_remaining = self.mode_data.get('time_limit', None)
-        self.start_time = pygame.time.get_ticks()
-        self.last_speed_increase_time = self.start_time
-        
-        # Reset snake
-        self.snake.reset()
-        
-        # Clear food and obstacles
-        self.foods.clear()
-        self.obstacles.clear()
+    def reset(self, seed=None):
+        """Start a new game, with a fresh random seed unless one is given.
         
-        # Create initial food
-        self.spawn_food()
+        When watching a replay, this restarts the replay instead.
+        """
+        self.finish_recording()
         
-        # Create obstacles for obstacle mode
-        if self.mode_data.get('obstacles', False):
-            self._create_obstacles()
-            
-        # Create walls for walled modes
-        if self.mode_data.get('walls', False):
-            self._create_walls()
-            
-        # Reset power-ups
-        for powerup in self.active_powerups.values():
-            powerup['active'] = False
-            powerup['end_time'] = 0
-            
-    def set_mode(self, mode):
-        """Change the game mode."""
+        # Reset game state
+        self.paused = False
+        self.last_frame_time = None
+        self.accumulator = 0  # Frame time not yet consumed by simulation ticks
+        self.render_alpha = 0.0  # Fraction of a tick between the last tick and now
+        if self.dirty_rects is not None:
+            self.dirty_rects.invalidate()
+        if self.player is not None:
+            self.player.seek(0)
+            events = []
+        else:
+            events = self.simulation.reset(seed)
+            if self.settings.REPLAY_RECORDING:
+                self.recorder = Replay.for_simulation(self.simulation, self.settings.TICK_RATE,
+                                                      self.settings.REPLAY_CHECKSUM_INTERVAL)
+        if self.autopilot is not None:
+            self.autopilot.reset()
+        self.particle_system.clear()
+        self.particle_system.seed(self.simulation.seed)
+        self.snake.seed_effects(self.simulation.seed)
+        self._handle_simulation_events(events)
+        
+    def set_autopilot(self, enabled):
+        """Let the computer steer the snake (or hand control back)."""
+        self.autopilot = Autopilot(self.simulation) if enabled else None
+        
+    def set_mode(self, mode, seed=None):
+        """Change the game mode (stopping any replay)."""
         if mode in self.settings.GAME_MODES:
-            self.current_mode = mode
-            self.mode_data = self.settings.GAME_MODES[mode]
-            self.reset()
-            
-    def _create_obstacles(self):
-        """Create obstacles for the obstacle mode."""
-        num_obstacles = self.mode_data.get('num_obstacles', 10)
-        
-        # Get snake positions to avoid placing obstacles on the snake
-        snake_positions = self.snake.get_segments_positions()
-        
-        # Create specified number of obstacles in valid positions
-        for _ in range(num_obstacles):
-            valid_position = False
-            attempts = 0
-            max_attempts = 100
-            
-            while not valid_position and attempts < max_attempts:
-                # Generate random position (avoid edges)
-                x = random.randint(2, self.settings.GRID_WIDTH - 3)
-                y = random.randint(2, self.settings.GRID_HEIGHT - 3)
-                
-                # Check if position is valid (not on snake or other obstacles)
-                if (x, y) not in snake_positions and not any(o.position == (x, y) for o in self.obstacles):
-                    valid_position = True
-                    
-                attempts += 1
-                
-            if valid_position:
-                self.obstacles.append(Obstacle(x, y, self.settings))
-                
-    def _create_walls(self):
-        """Create walls around the edge of the screen."""
-        # Create walls along the borders
-        for x in range(self.settings.GRID_WIDTH):
-            # Top wall
-            self.obstacles.append(Obstacle(x, 0, self.settings))
-            # Bottom wall
-            self.obstacles.append(Obstacle(x, self.settings.GRID_HEIGHT - 1, self.settings))
-            
-        for y in range(1, self.settings.GRID_HEIGHT - 1):
-            # Left wall
-            self.obstacles.append(Obstacle(0, y, self.settings))
-            # Right wall
-            self.obstacles.append(Obstacle(self.settings.GRID_WIDTH - 1, y, self.settings))
-            
-    def spawn_food(self):
-        """Spawn food at a random position."""
-        # Get current snake positions
-        snake_positions = self.snake.get_segments_positions()
-        
-        # Add obstacle positions as well
-        obstacle_positions = [o.position for o in self.obstacles]
-        all_occupied = snake_positions + obstacle_positions
-        
-        # Add existing food positions to avoid food overlap
-        food_positions = [f.position for f in self.foods]
-        all_occupied.extend(food_positions)
-        
-        # Determine what type of food to spawn
-        food_type = "apple"  # Default food type
-        
-        # Always make sure there's at least one apple
-        if not any(f.food_type == "apple" for f in self.foods):
-            food_type = "apple"
-        # Otherwise, apply spawn chances for special foods
-        elif random.random() < self.settings.BONUS_FOOD_SPAWN_CHANCE:
-            food_type = "bonus"
-        elif random.random() < self.settings.POWERUP_SPAWN_CHANCE:
-            food_type = "power"
-        
-        # Create and add the food
-        food = Food(self.settings, food_type)
-        food.respawn(all_occupied)
-        self.foods.append(food)
-        
-        # Add extra particles when food spawns
-        x = food.position[0] * self.settings.CELL_SIZE + self.settings.CELL_SIZE // 2
-        y = food.position[1] * self.settings.CELL_SIZE + self.settings.CELL_SIZE // 2
-        self.particle_system.create_particles(x, y, 10, food.color)
+            self.player = None
+            self.simulation.set_mode(mode, seed)
+            self.reset(self.simulation.seed)
+            
+    def start_playback(self, replay, rate=1.0):
+        """Watch a recorded game instead of playing; rate scales its speed."""
+        self.finish_recording()
+        self.player = ReplayPlayer(replay, self.simulation)
+        self.playback_rate = rate
+        self.reset()
         
-    def update(self):
-        if self.game_over or self.paused:
+    def seek_playback(self, position):
+        """Jump to the given simulation step of the replay being watched."""
+        self.player.seek(position)
+        self.accumulator = 0
+        self.particle_system.clear()
+        if self.dirty_rects is not None:
+            self.dirty_rects.invalidate()
+            
+    def finish_recording(self):
+        """Save the recording of the current game, if it got anywhere."""
+        recorder = self.recorder
+        self.recorder = None
+        if recorder is None or self.simulation.steps == 0:
             return
+        recorder.finish(self.simulation)
+        try:
+            os.makedirs(self.settings.REPLAY_DIR, exist_ok=True)
+            name = f"{time.strftime('%Y%m%d-%H%M%S')}-{recorder.mode}-{recorder.seed}.snkr"
+            path = os.path.join(self.settings.REPLAY_DIR, name)
+            recorder.save(path)
+            self.last_replay_path = path
+        except OSError as e:
+            print(f"Could not save replay: {e}")
             
+    def update(self):
         # Get elapsed time since last frame
-        dt = pygame.time.get_ticks() - (self.last_frame_time if hasattr(self, 'last_frame_time') else pygame.time.get_ticks())
-        self.last_frame_time = pygame.time.get_ticks()
+        current_time = self.clock()
+        dt = 0 if self.last_frame_time is None else current_time - self.last_frame_time
+        self.last_frame_time = current_time
         
-        # Update time remaining for timed modes
-        if self.time_remaining is not None:
-            self.time_remaining = max(0, self.time_remaining - dt)
-            if self.time_remaining <= 0:
-                self.game_over = True
+        if self.game_over or self.paused:
+            return
+            
+        # Run as many fixed ticks as the elapsed time covers. A long hitch is
+        # clamped so the game slows down instead of trying to catch up forever.
+        tick_ms = 1000 / self.settings.TICK_RATE
+        rate = self.playback_rate if self.player is not None else 1
+        self.accumulator += min(dt, self.settings.MAX_FRAME_TIME) * rate
+        while self.accumulator >= tick_ms and not self.game_over:
+            self.accumulator -= tick_ms
+            self._tick(tick_ms)
+            
+        # How far rendering is into the next tick, for interpolation
+        self.render_alpha = min(1.0, self.accumulator / tick_ms)
+        
+    def _tick(self, dt):
+        """Advance the game rules and visual effects by one fixed tick."""
+        # Snake movement and collisions
+        with profiler.measure("simulation"):
+            if self.player is not None:
+                events = self.player.step()
+            else:
+                if self.autopilot is not None:
+                    direction = self.autopilot.next_direction()
+                    if direction is not None and direction != self.snake.next_direction:
+                        self._change_direction(direction)
+                events = self.simulation.step(dt)
+                if self.recorder is not None:
+                    self.recorder.record_step(self.simulation)
+                    if self.game_over:
+                        self.finish_recording()
+            
+        # Update visual effects
+        with profiler.measure("snake"):
+            self.snake.update(dt, self.foods)
+        with profiler.measure("food"):
+            for food in self.foods:
+                food.animate()
+        with profiler.measure("particles"):
+            self._handle_simulation_events(events)
+            
+            # Update particle system
+            self.particle_system.update()
+        
+    def _handle_simulation_events(self, events):
+        """Play sounds and create particles for things that happened in the simulation."""
+        for event in events:
+            kind = event[0]
+            if kind == "spawn":
+                # Add extra particles when food spawns
+                food = event[1]
+                x = food.position[0] * self.settings.CELL_SIZE + self.settings.CELL_SIZE // 2
+                y = food.position[1] * self.settings.CELL_SIZE + self.settings.CELL_SIZE // 2
+                self.particle_system.create_particles(x, y, 10, food.color)
                 
-        # Update power-up timers and check for expiration
-        current_time = pygame.time.get_ticks()
-        for powerup_type, powerup_data in self.active_powerups.items():
-            if powerup_data['active'] and current_time >= powerup_data['end_time']:
-                powerup_data['active'] = False
+            elif kind == "eat":
+                food = event[1]
+                self._play_sound('eat')
                 
-                # Revert effects when power-up expires
-                if powerup_type == "speed":
-                    self.snake.speed = max(self.settings.INITIAL_SNAKE_SPEED, self.snake.speed - 5)
-                elif powerup_type == "slow":
-                    self.snake.speed = min(self.settings.MAX_SNAKE_SPEED, self.snake.speed + 3)
-                    
-        # Check if we should increase speed (for survival mode)
-        if self.mode_data.get('time_speed_increase', 0) > 0:
-            time_since_last_increase = current_time - self.last_speed_increase_time
-            if time_since_last_increase > 10000:  # 10 seconds
-                self.snake.increase_speed(self.mode_data['time_speed_increase'])
-                self.last_speed_increase_time = current_time
+                # Create extra particle effect for more visual feedback
+                x = food.position[0] * self.settings.CELL_SIZE + self.settings.CELL_SIZE // 2
+                y = food.position[1] * self.settings.CELL_SIZE + self.settings.CELL_SIZE // 2
+                particles_to_create = self.settings.PARTICLE_COUNT * 2
+                if food.food_type == "bonus":
+                    particles_to_create *= 2  # More particles for bonus food
+                self.particle_system.create_particles(x, y, particles_to_create, food.color)
                 
-        # Update snake with food positions for eye tracking
-        self.snake.update(dt, self.foods)
-        
-        # Check for collisions - do this AFTER the snake has been updated
-        self._check_collisions()
-        
-        # Update foods and check for expired foods
-        self.foods = [food for food in self.foods if food.update()]
-        
-        # Ensure there's always at least one food item
-        if not self.foods or not any(f.food_type == "apple" for f in self.foods):
-            self.spawn_food()
-        
-        # Update particle system
-        self.particle_system.update()
-        
-    def _check_collisions(self):
-        # Get head position for collision checking
-        head_x, head_y = self.snake.get_head_position()
-        head_grid_pos = self.snake.get_head_grid_position()
-        
-        # Add a small tolerance for food collision (to make eating easier)
-        head_pos_tolerance = 0.5
-        
-        # First, check food collisions
-        food_eaten = None
+            elif kind == "powerup":
+                self._play_sound('powerup')
+                
+            elif kind == "game_over":
+                self._play_sound('game_over')
+                
+                # Large particle explosion at head position
+                head_x, head_y = event[1]
+                pixel_x = head_x * self.settings.CELL_SIZE + self.settings.CELL_SIZE // 2
+                pixel_y = head_y * self.settings.CELL_SIZE + self.settings.CELL_SIZE // 2
+                self.particle_system.create_particles(pixel_x, pixel_y, self.settings.PARTICLE_COUNT * 5)
+                
+    def _play_sound(self, name):
+        if name in self.sounds and self.settings.SOUND_ENABLED:
+            self.sounds[name].play()
         
-        for food in self.foods:
-            food_x, food_y = food.position
-            
-            # Use both grid position and distance check for more reliable food detection
-            is_grid_match = head_grid_pos == food.position
-            distance = math.sqrt((head_x - food_x)**2 + (head_y - food_y)**2)
+    def render(self):
+        # Keep the head in view (worlds that fit the window never scroll)
+        head = self.snake.get_pixel_positions(self.render_alpha)
+        if len(head):
+            self.camera.follow(*head[0].tolist())
+        offset = self.camera.offset
+        
+        # Draw background, grid and obstacles from the cached layer (only
+        # where something was drawn last frame in dirty-rect mode)
+        tracker = self.dirty_rects
+        with profiler.measure("draw_bg"):
+            background = self._get_background_layer()
+            if tracker is None:
+                self.screen.blit(background, (0, 0))
+            else:
+                # Full-screen overlays change every pixel, both while shown and
+                # on the frame they go away
+                overlay = self.paused or self.game_over
+                if overlay or self.overlay_shown:
+                    tracker.invalidate()
+                self.overlay_shown = overlay
+                tracker.begin_frame(self.screen, background)
+                
+        # Draw food items that are in view
+        with profiler.measure("draw_food"):
+            view = self.camera.view_rect()
+            for food in self.foods:
+                if view.colliderect(food.get_bounds()):
+                    food.draw(self.screen, offset)
+                
+        # Draw snake
+        with profiler.measure("draw_snake"):
+            self.snake.draw(self.screen, self.render_alpha, offset)
             
-            # If either the grid positions match or we're really close to the food
-            if is_grid_match or distance < head_pos_tolerance:
-                food_eaten = food
-                break
-        
-        # If food was found to be eaten
-        if food_eaten:
-            self._handle_food_eaten(food_eaten)
-            self.foods.remove(food_eaten)
-            
-            # Spawn new food if there are no apples left
-            if not any(f.food_type == "apple" for f in self.foods):
-                self.spawn_food()
-            return  # Skip other collision checks when food is eaten
-        
-        # Only check for fatal collisions if no food was eaten
-        # Check if snake collides with itself
-        if self.snake.check_collision_with_self():
-            if not self.active_powerups["ghost"]["active"]:
-                self._handle_game_over()
-            return
+        # Draw particle effects
+        with profiler.measure("draw_particles"):
+            self.particle_system.draw(self.screen, offset)
             
-        # Check if snake collides with walls
-        if self.snake.check_collision_with_walls(self.mode_data.get('walls', False)):
-            if not self.active_powerups["ghost"]["active"]:
-                self._handle_game_over()
-            return
-        
-        # Check if snake collides with obstacles
-        for obstacle in self.obstacles:
-            if head_grid_pos == obstacle.position:
-                if not self.active_powerups["ghost"]["active"]:
-                    self._handle_game_over()
-                return
-        
-    def _handle_food_eaten(self, food):
-        # Increase score
-        self.score += food.points
-        self.high_score = max(self.score, self.high_score)
-        
-        # Grow snake
-        growth_amount = food.points
-        self.snake.grow(growth_amount)
-        
-        # Increase snake speed based on mode and food type
-        if food.food_type == "apple" and self.mode_data.get('speed_increase', 0) > 0:
-            self.snake.increase_speed(self.mode_data['speed_increase'])
-        elif food.food_type == "bonus":
-            # Bonus food gives a small speed boost in all modes
-            self.snake.increase_speed(0.2)
-        
-        # Apply power-up effects
-        if food.food_type == "power":
-            self._apply_powerup(food.powerup_type)
-            
-        # Play sound
-        if 'eat' in self.sounds and self.settings.SOUND_ENABLED:
-            self.sounds['eat'].play()
-            
-        # Create extra particle effect for more visual feedback
-        x = food.position[0] * self.settings.CELL_SIZE + self.settings.CELL_SIZE // 2
-        y = food.position[1] * self.settings.CELL_SIZE + self.settings.CELL_SIZE // 2
-        particles_to_create = self.settings.PARTICLE_COUNT * 2
-        if food.food_type == "bonus":
-            particles_to_create *= 2  # More particles for bonus food
-        self.particle_system.create_particles(x, y, particles_to_create, food.color)
-        
-        # Chance to spawn a new food item immediately (to have more food on screen)
-        if random.random() < 0.3:  # 30% chance
-            self.spawn_food()
-        
-    def _apply_powerup(self, powerup_type):
-        current_time = pygame.time.get_ticks()
-        duration = self.settings.POWERUP_DURATION
-        
-        # Mark power-up as active and set end time
-        self.active_powerups[powerup_type]["active"] = True
-        self.active_powerups[powerup_type]["end_time"] = current_time + duration
-        
-        # Apply power-up effect
-        if powerup_type == "speed":
-            # Speed boost
-            self.snake.increase_speed(5)
-        elif powerup_type == "slow":
-            # Slow down
-            self.snake.speed = max(self.settings.INITIAL_SNAKE_SPEED // 2, self.snake.speed - 3)
-        elif powerup_type == "shrink":
-            # Shrink snake to minimum size
-            excess_segments = len(self.snake.segments) - self.settings.INITIAL_SNAKE_LENGTH
-            if excess_segments > 0:
-                self.snake.segments = self.snake.segments[:-excess_segments]
-        # Ghost mode is handled in collision detection
-        
-        # Play powerup sound
-        if 'powerup' in self.sounds and self.settings.SOUND_ENABLED:
-            self.sounds['powerup'].play()
-            
-    def _handle_game_over(self):
-        self.game_over = True
-        
-        # Play game over sound
-        if 'game_over' in self.sounds and self.settings.SOUND_ENABLED:
-            self.sounds['game_over'].play()
-            
-        # Large particle explosion at head position
-        head_x, head_y = self.snake.get_head_position()
-        pixel_x = head_x * self.settings.CELL_SIZE + self.settings.CELL_SIZE // 2
-        pixel_y = head_y * self.settings.CELL_SIZE + self.settings.CELL_SIZE // 2
-        self.particle_system.create_particles(pixel_x, pixel_y, self.settings.PARTICLE_COUNT * 5)
-        
-    def render(self):
-        # Draw background grid
-        self._draw_background_grid()
-        
-        # Draw obstacles
-        for obstacle in self.obstacles:
-            obstacle.draw(self.screen)
+        with profiler.measure("draw_ui"):
+            # Draw score and other UI elements
+            self._draw_ui()
             
-        # Draw food items
+            # Draw touch controls if enabled
+            if self.touch_enabled:
+                self._draw_touch_controls()
+                
+            # Draw pause screen if paused
+            if self.paused:
+                self._draw_pause_screen()
+                
+            # Draw game over screen if game is over
+            if self.game_over:
+                self._draw_game_over_screen()
+                
+        if tracker is not None:
+            with profiler.measure("dirty_rects"):
+                self._add_dirty_rects(tracker)
+                self.update_rects = tracker.end_frame()
+            
+    def _add_dirty_rects(self, tracker):
+        """Record everything drawn over the background this frame."""
+        offset = self.camera.offset
         for food in self.foods:
-            food.draw(self.screen)
-            
-        # Draw snake
-        self.snake.draw(self.screen)
-        
-        # Draw particle effects
-        self.particle_system.draw(self.screen)
-        
-        # Draw score and other UI elements
-        self._draw_ui()
-        
-        # Draw touch controls if enabled
+            tracker.add(food.get_bounds(offset))
+        for rect in self.snake.get_bounds(self.render_alpha, offset):
+            tracker.add(rect)
+        tracker.add(self.particle_system.get_bounds(offset))
+        for rect in self.ui_rects:
+            tracker.add(rect)
         if self.touch_enabled:
-            self._draw_touch_controls()
+            for rect in self.touch_buttons.values():
+                tracker.add(rect)
+                
+    def _get_background_layer(self):
+        """Return the static background surface, rebuilding it only when it changes.
+        
+        The layer shows the part of the world in view, so it's recomposed
+        from the cached chunk layers whenever the camera moves.
+        """
+        key = (self.settings.WIDTH, self.settings.HEIGHT, self.settings.CELL_SIZE,
+               self.settings.BG_COLOR, self.settings.GRID_COLOR,
+               self.simulation.obstacle_version)
+        view = self.camera.offset
+        if self.background_layer is None or key != self.background_key:
+            layer = pygame.Surface((self.settings.WIDTH, self.settings.HEIGHT))
+            if pygame.display.get_surface() is not None:
+                layer = layer.convert()
+            self.background_layer = layer
+            self.background_view = None
+            
+        if key != self.background_key or view != self.background_view:
+            # Walls and obstacles only change when a new game starts, so they
+            # belong to the static layer too
+            self.background_layer.fill(self.settings.BG_COLOR)
+            self.chunk_layers.draw(self.background_layer, self.camera,
+                                   self.simulation.obstacle_chunks, key)
+            self.background_key = key
+            self.background_view = view
+            if self.dirty_rects is not None:
+                self.dirty_rects.invalidate()
+        return self.background_layer
+        
+    def _blit_ui(self, surface, position):
+        # UI is redrawn every frame, so remember where it went for dirty rects
+        self.ui_rects.append(self.screen.blit(surface, position))
         
-        # Draw pause screen if paused
-        if self.paused:
-            self._draw_pause_screen()
-            
-        # Draw game over screen if game is over
-        if self.game_over:
-            self._draw_game_over_screen()
-        
-    def _draw_background_grid(self):
-        # Draw subtle grid pattern for background
-        for x in range(0, self.settings.WIDTH, self.settings.CELL_SIZE):
-            pygame.draw.line(self.screen, self.settings.GRID_COLOR, 
-                            (x, 0), (x, self.settings.HEIGHT), 1)
-                            
-        for y in range(0, self.settings.HEIGHT, self.settings.CELL_SIZE):
-            pygame.draw.line(self.screen, self.settings.GRID_COLOR, 
-                            (0, y), (self.settings.WIDTH, y), 1)
-            
     def _draw_ui(self):
+        self.ui_rects = []
+        
         # Draw score
-        font = pygame.font.Font(None, 36)
-        score_text = font.render(f"Score: {self.score}", True, self.settings.TEXT_COLOR)
-        self.screen.blit(score_text, (20, 20))
+        score_text = render_text(f"Score: {self.score}", 36, self.settings.TEXT_COLOR)
+        self._blit_ui(score_text, (20, 20))
         
         # Draw high score
-        high_score_text = font.render(f"High Score: {self.high_score}", True, self.settings.TEXT_COLOR)
+        high_score_text = render_text(f"High Score: {self.high_score}", 36, self.settings.TEXT_COLOR)
         high_score_rect = high_score_text.get_rect(topright=(self.settings.WIDTH - 20, 20))
-        self.screen.blit(high_score_text, high_score_rect)
+        self._blit_ui(high_score_text, high_score_rect)
         
         # Draw game mode
-        mode_text = font.render(f"Mode: {self.mode_data['name']}", True, self.settings.TEXT_COLOR)
+        mode_text = render_text(f"Mode: {self.mode_data['name']}", 36, self.settings.TEXT_COLOR)
         mode_rect = mode_text.get_rect(midtop=(self.settings.WIDTH // 2, 20))
-        self.screen.blit(mode_text, mode_rect)
+        self._blit_ui(mode_text, mode_rect)
         
         # Draw time remaining for timed modes
         if self.time_remaining is not None:
             seconds = self.time_remaining // 1000
-            time_text = font.render(f"Time: {seconds}s", True, self.settings.TEXT_COLOR)
+            time_text = render_text(f"Time: {seconds}s", 36, self.settings.TEXT_COLOR)
             time_rect = time_text.get_rect(midtop=(self.settings.WIDTH // 2, 60))
-            self.screen.blit(time_text, time_rect)
+            self._blit_ui(time_text, time_rect)
+            
+        # Draw replay progress
+        if self.player is not None:
+            tick_rate = self.player.replay.tick_rate
+            position = self.player.position // tick_rate
+            duration = self.player.replay.end_step // tick_rate
+            status = (f"Replay {self.playback_rate:g}x  {position // 60}:{position % 60:02d}"
+                      f" / {duration // 60}:{duration % 60:02d}")
+            if self.player.desync_step is not None:
+                status += "  (out of sync)"
+            replay_text = render_text(status, 28, self.settings.TEXT_COLOR)
+            self._blit_ui(replay_text, replay_text.get_rect(midtop=(self.settings.WIDTH // 2, 100)))
+        elif self.autopilot is not None:
+            autopilot_text = render_text("Autopilot", 28, self.settings.TEXT_COLOR)
+            self._blit_ui(autopilot_text, autopilot_text.get_rect(midtop=(self.settings.WIDTH // 2, 100)))
             
         # Draw active power-ups
         powerup_y = 70
-        small_font = pygame.font.Font(None, 24)
         for powerup_type, powerup_data in self.active_powerups.items():
             if powerup_data['active']:
                 # Calculate remaining time
-                remaining = (powerup_data['end_time'] - pygame.time.get_ticks()) // 1000
-                powerup_text = small_font.render(f"{powerup_type.capitalize()}: {remaining}s", 
-                                              True, self.settings.TEXT_COLOR)
-                self.screen.blit(powerup_text, (20, powerup_y))
+                remaining = (powerup_data['end_time'] - self.simulation.time) // 1000
+                powerup_text = render_text(f"{powerup_type.capitalize()}: {remaining}s", 
+                                              24, self.settings.TEXT_COLOR)
+                self._blit_ui(powerup_text, (20, powerup_y))
                 powerup_y += 30
                 
     def _draw_pause_screen(self):
@@ -448,14 +457,12 @@ class Game:
         self.screen.blit(overlay, (0, 0))
         
         # Pause text
-        font = pygame.font.Font(None, 72)
-        pause_text = font.render("PAUSED", True, self.settings.TEXT_COLOR)
+        pause_text = render_text("PAUSED", 72, self.settings.TEXT_COLOR)
         pause_rect = pause_text.get_rect(center=(self.settings.WIDTH // 2, self.settings.HEIGHT // 2))
         self.screen.blit(pause_text, pause_rect)
         
         # Instructions
-        font = pygame.font.Font(None, 36)
-        instr_text = font.render("Press P to resume or ESC to quit", True, self.settings.TEXT_COLOR)
+        instr_text = render_text("Press P to resume or ESC to quit", 36, self.settings.TEXT_COLOR)
         instr_rect = instr_text.get_rect(midtop=(self.settings.WIDTH // 2, pause_rect.bottom + 20))
         self.screen.blit(instr_text, instr_rect)
         
@@ -465,34 +472,31 @@ class Game:
         overlay = pygame.Surface((self.settings.WIDTH, self.settings.HEIGHT), pygame.SRCALPHA)
         
         # Create a pulsing red tint effect
-        pulse = (math.sin(pygame.time.get_ticks() * 0.003) + 1) / 2  # Value between 0-1
+        pulse = (math.sin(self.clock() * 0.003) + 1) / 2  # Value between 0-1
         overlay_color = (180, 30, 30, 150 + int(pulse * 50))  # Pulsing red with transparency
         overlay.fill(overlay_color)  
         self.screen.blit(overlay, (0, 0))
         
         # Game Over text with shadow effect
-        large_font = pygame.font.Font(None, 120)
-        
         # Draw drop shadow
-        game_over_shadow = large_font.render("GAME OVER", True, (0, 0, 0))
+        game_over_shadow = render_text("GAME OVER", 120, (0, 0, 0))
         shadow_rect = game_over_shadow.get_rect(center=(self.settings.WIDTH // 2 + 4, self.settings.HEIGHT // 2 - 50 + 4))
         self.screen.blit(game_over_shadow, shadow_rect)
         
         # Main text with slight pulsing color
         pulse_color = (255, 200 + int(pulse * 55), 200 + int(pulse * 55))
-        game_over_text = large_font.render("GAME OVER", True, pulse_color)
+        game_over_text = render_text("GAME OVER", 120, pulse_color)
         game_over_rect = game_over_text.get_rect(center=(self.settings.WIDTH // 2, self.settings.HEIGHT // 2 - 50))
         self.screen.blit(game_over_text, game_over_rect)
         
         # Score display
-        medium_font = pygame.font.Font(None, 60)
-        final_score_text = medium_font.render(f"Score: {self.score}", True, self.settings.TEXT_COLOR)
+        final_score_text = render_text(f"Score: {self.score}", 60, self.settings.TEXT_COLOR)
         final_score_rect = final_score_text.get_rect(midtop=(self.settings.WIDTH // 2, game_over_rect.bottom + 30))
         self.screen.blit(final_score_text, final_score_rect)
         
         # High score display with highlight if player beat the high score
         if self.score >= self.high_score:
-            high_score_text = medium_font.render(f"NEW HIGH SCORE!", True, (255, 215, 0))  # Gold color
+            high_score_text = render_text(f"NEW HIGH SCORE!", 60, (255, 215, 0))  # Gold color
             high_score_rect = high_score_text.get_rect(midtop=(self.settings.WIDTH // 2, final_score_rect.bottom + 20))
             
             # Draw glow effect behind high score text
@@ -505,19 +509,17 @@ class Game:
             self.screen.blit(high_score_text, high_score_rect)
             instruction_y_offset = high_score_rect.bottom + 30
         else:
-            high_score_text = medium_font.render(f"High Score: {self.high_score}", True, self.settings.TEXT_COLOR)
+            high_score_text = render_text(f"High Score: {self.high_score}", 60, self.settings.TEXT_COLOR)
             high_score_rect = high_score_text.get_rect(midtop=(self.settings.WIDTH // 2, final_score_rect.bottom + 20))
             self.screen.blit(high_score_text, high_score_rect)
             instruction_y_offset = high_score_rect.bottom + 30
         
         # Instructions
-        font = pygame.font.Font(None, 36)
-        
         # Create a subtle pulsing effect for the instruction text
         instruction_alpha = 200 + int(pulse * 55)
         instruction_color = (*self.settings.TEXT_COLOR[:3], instruction_alpha)
         
-        instruction_text = font.render("Press SPACE to restart or ESC to quit", True, instruction_color)
+        instruction_text = render_text("Press SPACE to restart or ESC to quit", 36, instruction_color)
         instruction_rect = instruction_text.get_rect(midtop=(self.settings.WIDTH // 2, instruction_y_offset))
         self.screen.blit(instruction_text, instruction_rect)
         
@@ -547,8 +549,7 @@ class Game:
             pygame.draw.rect(self.screen, (*button_color, 230), restart_btn_rect, border_radius=15, width=3)
             
             # Button text
-            btn_font = pygame.font.Font(None, 40)
-            btn_text = btn_font.render("RESTART", True, (255, 255, 255))
+            btn_text = render_text("RESTART", 40, (255, 255, 255))
             btn_text_rect = btn_text.get_rect(center=restart_btn_rect.center)
             self.screen.blit(btn_text, btn_text_rect)
 
@@ -624,9 +625,8 @@ class Game:
             
             # Add a label for each button
             if self.settings.SHOW_BUTTON_LABELS:
-                small_font = pygame.font.Font(None, 18)
                 if direction == "PAUSE":
-                    label = small_font.render("PAUSE", True, self.settings.TEXT_COLOR)
+                    label = render_text("PAUSE", 18, self.settings.TEXT_COLOR)
                     label_pos = (rect.centerx - label.get_width()//2, rect.bottom + 5)
                     self.screen.blit(label, label_pos)
 
@@ -693,19 +693,42 @@ class Game:
             ]
         }
 
+    def _change_direction(self, direction):
+        # Replays supply their own inputs
+        if self.player is not None:
+            return
+        self.snake.change_direction(direction)
+        if self.recorder is not None:
+            self.recorder.record_input(self.simulation.steps, direction)
+            
+    def _handle_playback_key(self, key):
+        """Seek (left/right) and change speed (up/down) while watching a replay."""
+        if key in (pygame.K_LEFT, pygame.K_RIGHT):
+            offset = 5 * self.player.replay.tick_rate  # Five seconds
+            if key == pygame.K_LEFT:
+                offset = -offset
+            self.seek_playback(self.player.position + offset)
+        elif key == pygame.K_UP:
+            self.playback_rate = min(64, self.playback_rate * 2)
+        elif key == pygame.K_DOWN:
+            self.playback_rate = max(0.25, self.playback_rate / 2)
+            
     def handle_event(self, event):
         if event.type == pygame.KEYDOWN:
             # Handle key presses
-            if not self.game_over:
+            if self.player is not None and event.key in (pygame.K_LEFT, pygame.K_RIGHT,
+                                                         pygame.K_UP, pygame.K_DOWN):
+                self._handle_playback_key(event.key)
+            elif not self.game_over:
                 # Game controls
                 if event.key in (pygame.K_UP, pygame.K_w):
-                    self.snake.change_direction("UP")
+                    self._change_direction("UP")
                 elif event.key in (pygame.K_DOWN, pygame.K_s):
-                    self.snake.change_direction("DOWN")
+                    self._change_direction("DOWN")
                 elif event.key in (pygame.K_LEFT, pygame.K_a):
-                    self.snake.change_direction("LEFT")
+                    self._change_direction("LEFT")
                 elif event.key in (pygame.K_RIGHT, pygame.K_d):
-                    self.snake.change_direction("RIGHT")
+                    self._change_direction("RIGHT")
                 elif event.key == pygame.K_p:
                     self.paused = not self.paused
                     # Play a sound when pausing/unpausing
@@ -713,6 +736,8 @@ class Game:
                         self.sounds['powerup'].play()
                 elif event.key == pygame.K_m:
                     self.settings.SOUND_ENABLED = not self.settings.SOUND_ENABLED
+                elif event.key == pygame.K_F2:
+                    self.set_autopilot(self.autopilot is None)
                 elif event.key == pygame.K_ESCAPE:
                     return 0  # Return to menu
             else:
@@ -759,7 +784,7 @@ class Game:
                     if 'powerup' in self.sounds and self.settings.SOUND_ENABLED:
                         self.sounds['powerup'].play()
                 else:
-                    self.snake.change_direction(direction)
+                    self._change_direction(direction)
                 self.btn_touched = direction
                 break
 
@@ -0,0 +1,57 @@
+import pygame
+from collections import OrderedDict
+
+class GlowCache:
+    """LRU cache of soft glow sprites keyed by (color, radius bucket, alpha).
+    
+    A glow is a translucent filled circle. Radii are quantized to
+    RADIUS_STEP pixels so pulsing glows cycle through a handful of cached
+    surfaces instead of allocating new ones every frame. The least recently
+    used sprites are dropped once their pixel memory exceeds budget bytes.
+    Returned surfaces are shared, so callers must not draw onto them.
+    """
+    RADIUS_STEP = 0.5
+    
+    def __init__(self, budget=2 * 1024 * 1024):
+        self.budget = budget
+        self.used = 0
+        self.sprites = OrderedDict()
+        
+    def get(self, color, radius, alpha):
+        """Return a glow sprite of about the given radius, centred in its surface."""
+        bucket = max(1, round(radius / self.RADIUS_STEP))
+        key = (tuple(color[:3]), bucket, alpha)
+        sprite = self.sprites.get(key)
+        if sprite is not None:
+            self.sprites.move_to_end(key)
+            return sprite
+            
+        glow_radius = bucket * self.RADIUS_STEP
+        sprite = pygame.Surface((glow_radius * 2, glow_radius * 2), pygame.SRCALPHA)
+        pygame.draw.circle(sprite, (*key[0], alpha), (glow_radius, glow_radius), glow_radius)
+        self.sprites[key] = sprite
+        self.used += self._surface_bytes(sprite)
+        
+        # Evict least recently used sprites until we're back under budget
+        while self.used > self.budget and len(self.sprites) > 1:
+            _, evicted = self.sprites.popitem(last=False)
+            self.used -= self._surface_bytes(evicted)
+        return sprite
+        
+    def clear(self):
+        self.sprites.clear()
+        self.used = 0
+        
+    @staticmethod
+    def _surface_bytes(surface):
+        return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+
+glow_cache = GlowCache()
+
+def draw_glow(screen, color, center, radius, alpha):
+    """Blend a cached glow of the given radius centred on center."""
+    sprite = glow_cache.get(color, radius, alpha)
+    half = sprite.get_width() / 2
+    return screen.blit(sprite, (center[0] - half, center[1] - half),
+                       special_flags=pygame.BLEND_ALPHA_SDL2)
\ No newline at end of file
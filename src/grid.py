@@ -0,0 +1,322 @@
+import random
+from array import array
+
+EMPTY = 0
+SNAKE = 1
+OBSTACLE = 2
+FOOD = 4
+
+# Grids with more cells than this keep free cell counts per CHUNK_SIZE x
+# CHUNK_SIZE chunk instead of a list of every free cell
+LARGE_GRID_CELLS = 256 * 256
+CHUNK_SIZE = 16
+
+class OccupancyGrid:
+    """Flat GRID_WIDTH x GRID_HEIGHT map of what occupies each cell.
+    
+    Each cell holds a bit mask of SNAKE, OBSTACLE and FOOD, so any collision
+    query is a single indexed lookup no matter how long the snake is or how
+    many obstacles there are. Snake cells are reference counted because the
+    ghost power-up lets the head pass over the body.
+    
+    Any free cell index created with free_cells() is kept in sync as cells
+    become empty or occupied.
+    
+    After record_changes(), the index of every cell whose tags change is
+    appended to changes, for consumers that mirror the grid incrementally.
+    clear() and restore() replace every cell without logging anything.
+    """
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.cells = bytearray(width * height)
+        self.snake_counts = bytearray(width * height)
+        self.free_indices = []
+        self.changes = None  # Changed cell indices, once record_changes() is called
+        
+    def record_changes(self):
+        """Start logging changed cells in changes (the reader clears the list)."""
+        if self.changes is None:
+            self.changes = []
+            
+    def clear(self):
+        """Mark every cell as empty."""
+        self.cells = bytearray(self.width * self.height)
+        self.snake_counts = bytearray(self.width * self.height)
+        for free_index in self.free_indices:
+            free_index.fill()
+            
+    def snapshot(self):
+        """Copy the cells and free cell indices, for restore()."""
+        return (bytes(self.cells), bytes(self.snake_counts),
+                [free_index.snapshot() for free_index in self.free_indices])
+                
+    def restore(self, snapshot):
+        cells, snake_counts, free_indices = snapshot
+        self.cells = bytearray(cells)
+        self.snake_counts = bytearray(snake_counts)
+        for free_index, state in zip(self.free_indices, free_indices):
+            free_index.restore(state)
+            
+    def free_cells(self, margin=0):
+        """Create a free cell index over the cells at least margin cells from the border.
+        
+        Large grids get a ChunkedFreeCellIndex, which needs memory per chunk
+        rather than per cell.
+        """
+        if self.width * self.height > LARGE_GRID_CELLS:
+            free_index = ChunkedFreeCellIndex(self, margin)
+        else:
+            free_index = FreeCellIndex(self, margin)
+        self.free_indices.append(free_index)
+        return free_index
+        
+    def in_bounds(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height
+        
+    def get(self, x, y):
+        """Return the tag mask for a cell (cells outside the grid are empty)."""
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self.cells[y * self.width + x]
+        return EMPTY
+        
+    def has(self, x, y, tag):
+        return bool(self.get(x, y) & tag)
+        
+    def add(self, x, y, tag):
+        if 0 <= x < self.width and 0 <= y < self.height:
+            self._set(y * self.width + x, self.cells[y * self.width + x] | tag)
+            
+    def remove(self, x, y, tag):
+        if 0 <= x < self.width and 0 <= y < self.height:
+            self._set(y * self.width + x, self.cells[y * self.width + x] & ~tag & 0xFF)
+            
+    def add_snake(self, x, y):
+        if 0 <= x < self.width and 0 <= y < self.height:
+            index = y * self.width + x
+            if self.snake_counts[index] < 255:
+                self.snake_counts[index] += 1
+            self._set(index, self.cells[index] | SNAKE)
+            
+    def remove_snake(self, x, y):
+        if 0 <= x < self.width and 0 <= y < self.height:
+            index = y * self.width + x
+            if self.snake_counts[index] > 0:
+                self.snake_counts[index] -= 1
+            if self.snake_counts[index] == 0:
+                self._set(index, self.cells[index] & ~SNAKE & 0xFF)
+                
+    def _set(self, index, value):
+        old_value = self.cells[index]
+        self.cells[index] = value
+        if self.changes is not None:
+            self.changes.append(index)
+            
+        # Keep free cell indices in sync when a cell changes between empty and occupied
+        if old_value and not value:
+            for free_index in self.free_indices:
+                free_index.add(index)
+        elif value and not old_value:
+            for free_index in self.free_indices:
+                free_index.discard(index)
+
+
+class FreeCellIndex:
+    """Set of empty grid cells with O(1) add, remove and random choice.
+    
+    Free cells are kept in a dense list; removing one swaps the last entry
+    into its slot, and slots maps each cell index to its place in the list
+    (or -1). Only cells at least margin cells away from the border are
+    tracked, so food and obstacles can keep their own spawn areas.
+    """
+    def __init__(self, grid, margin=0):
+        self.grid = grid
+        self.margin = margin
+        
+        # Which cells this index covers
+        size = grid.width * grid.height
+        self.in_region = bytearray(size)
+        self.region = []
+        for y in range(margin, grid.height - margin):
+            for x in range(margin, grid.width - margin):
+                self.in_region[y * grid.width + x] = 1
+                self.region.append(y * grid.width + x)
+                
+        # Slot layout when every cell in the region is free
+        self.region_slots = [-1] * size
+        for slot, index in enumerate(self.region):
+            self.region_slots[index] = slot
+            
+        self.rebuild()
+        
+    def fill(self):
+        """Mark every cell in the region as free (the grid was cleared)."""
+        self.free = self.region[:]
+        self.slots = self.region_slots[:]
+        
+    def rebuild(self):
+        """Recollect every empty cell in the region from the grid."""
+        cells = self.grid.cells
+        self.free = [i for i in self.region if not cells[i]]
+        self.slots = [-1] * len(cells)
+        for slot, index in enumerate(self.free):
+            self.slots[index] = slot
+            
+    def snapshot(self):
+        return self.free[:], self.slots[:]
+        
+    def restore(self, state):
+        # The free list order decides which cell choice() picks, so it's
+        # restored exactly rather than rebuilt
+        free, slots = state
+        self.free = free[:]
+        self.slots = slots[:]
+        
+    def __len__(self):
+        return len(self.free)
+        
+    def __contains__(self, position):
+        x, y = position
+        return self.grid.in_bounds(x, y) and self.slots[y * self.grid.width + x] != -1
+        
+    def add(self, index):
+        if self.in_region[index] and self.slots[index] == -1:
+            self.slots[index] = len(self.free)
+            self.free.append(index)
+            
+    def discard(self, index):
+        slot = self.slots[index]
+        if slot == -1:
+            return
+        # Move the last free cell into the vacated slot
+        last = self.free.pop()
+        if last != index:
+            self.free[slot] = last
+            self.slots[last] = slot
+        self.slots[index] = -1
+        
+    def choice(self, rng=random):
+        """Return a random free (x, y) cell, or None if there are none."""
+        if not self.free:
+            return None
+        index = self.free[rng.randrange(len(self.free))]
+        return (index % self.grid.width, index // self.grid.width)
+        
+
+class ChunkedFreeCellIndex:
+    """Free cell index for large grids, keeping only a count per chunk.
+    
+    The grid is split into CHUNK_SIZE x CHUNK_SIZE chunks and only the
+    number of free region cells in each is tracked, so memory and reset
+    time grow with the number of chunks rather than cells. choice() tries
+    a few random cells first, which almost always finds a free one on a
+    mostly empty board; otherwise it picks a free cell uniformly by
+    walking the chunk counts and then scanning the chosen chunk.
+    """
+    GUESSES = 8
+    
+    def __init__(self, grid, margin=0):
+        self.grid = grid
+        self.margin = margin
+        self.chunks_x = -(-grid.width // CHUNK_SIZE)
+        self.chunks_y = -(-grid.height // CHUNK_SIZE)
+        
+        # Region cells in each chunk, i.e. its free count on an empty grid
+        self.region_counts = array('l', [0]) * (self.chunks_x * self.chunks_y)
+        for chunk_y in range(self.chunks_y):
+            top, bottom = self._span(chunk_y, grid.height)
+            for chunk_x in range(self.chunks_x):
+                left, right = self._span(chunk_x, grid.width)
+                self.region_counts[chunk_y * self.chunks_x + chunk_x] = (
+                    max(0, right - left) * max(0, bottom - top))
+                    
+        self.rebuild()
+        
+    def _span(self, chunk, size):
+        """Cells of the region along one axis within a chunk, as (start, end)."""
+        start = max(chunk * CHUNK_SIZE, self.margin)
+        end = min((chunk + 1) * CHUNK_SIZE, size - self.margin)
+        return start, end
+        
+    def _chunk(self, index):
+        x, y = index % self.grid.width, index // self.grid.width
+        return (y // CHUNK_SIZE) * self.chunks_x + x // CHUNK_SIZE
+        
+    def _in_region(self, index):
+        x, y = index % self.grid.width, index // self.grid.width
+        margin = self.margin
+        return margin <= x < self.grid.width - margin and margin <= y < self.grid.height - margin
+        
+    def fill(self):
+        self.counts = array('l', self.region_counts)
+        self.total = sum(self.counts)
+        
+    def rebuild(self):
+        cells = self.grid.cells
+        if cells.count(0) == len(cells):
+            self.fill()
+            return
+        width = self.grid.width
+        self.counts = array('l', [0]) * len(self.region_counts)
+        for chunk_y in range(self.chunks_y):
+            top, bottom = self._span(chunk_y, self.grid.height)
+            for chunk_x in range(self.chunks_x):
+                left, right = self._span(chunk_x, width)
+                self.counts[chunk_y * self.chunks_x + chunk_x] = sum(
+                    cells[y * width + left:y * width + right].count(0) for y in range(top, bottom))
+        self.total = sum(self.counts)
+        
+    def snapshot(self):
+        return array('l', self.counts), self.total
+        
+    def restore(self, state):
+        counts, self.total = state
+        self.counts = array('l', counts)
+        
+    def __len__(self):
+        return self.total
+        
+    def __contains__(self, position):
+        x, y = position
+        return (self.grid.in_bounds(x, y) and self._in_region(y * self.grid.width + x)
+                and not self.grid.cells[y * self.grid.width + x])
+                
+    def add(self, index):
+        # Only called as a cell becomes empty, so there's no double counting
+        if self._in_region(index):
+            self.counts[self._chunk(index)] += 1
+            self.total += 1
+            
+    def discard(self, index):
+        if self._in_region(index):
+            self.counts[self._chunk(index)] -= 1
+            self.total -= 1
+            
+    def choice(self, rng=random):
+        """Return a random free (x, y) cell, or None if there are none."""
+        if not self.total:
+            return None
+        grid = self.grid
+        cells = grid.cells
+        margin = self.margin
+        for _ in range(self.GUESSES):
+            x = rng.randrange(margin, grid.width - margin)
+            y = rng.randrange(margin, grid.height - margin)
+            if not cells[y * grid.width + x]:
+                return (x, y)
+                
+        # Crowded board: pick the n-th free cell
+        n = rng.randrange(self.total)
+        for chunk, count in enumerate(self.counts):
+            if n < count:
+                break
+            n -= count
+        left, right = self._span(chunk % self.chunks_x, grid.width)
+        top, bottom = self._span(chunk // self.chunks_x, grid.height)
+        for y in range(top, bottom):
+            for x in range(left, right):
+                if not cells[y * grid.width + x]:
+                    if n == 0:
+                        return (x, y)
+                    n -= 1
+        return None
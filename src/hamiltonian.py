@@ -0,0 +1,329 @@
+from collections import deque
+from src.grid import SNAKE, OBSTACLE, LARGE_GRID_CELLS
+from src.simulation import DIRECTIONS
+from src.autopilot import Autopilot, neighbor_table
+
+def build_cycle(width, height, blocked, origin=(0, 0), start=None):
+    """Hamiltonian cycle through the free 2x2 blocks of a rectangle.
+    
+    The rectangle at origin is cut into 2x2 blocks (an odd last row or
+    column is left out). Blocks containing a blocked cell are skipped, a
+    spanning tree is grown over the others from the block holding start,
+    and the cycle runs around the tree: every block starts as its own
+    four-cell loop, and each tree edge joins two loops by swapping their
+    facing sides for two crossing edges. Returns the cells (x, y) in order.
+    """
+    left, top = origin
+    blocks_x, blocks_y = width // 2, height // 2
+    
+    def block_free(bx, by):
+        x, y = left + bx * 2, top + by * 2
+        return not any((x + i, y + j) in blocked for i in (0, 1) for j in (0, 1))
+        
+    free = {(bx, by) for bx in range(blocks_x) for by in range(blocks_y) if block_free(bx, by)}
+    if not free:
+        return []
+    root = None
+    if start is not None:
+        root = ((start[0] - left) // 2, (start[1] - top) // 2)
+    if root not in free:
+        root = min(free, key=lambda block: (block[1], block[0]))
+        
+    # Breadth-first spanning tree over the free blocks
+    tree = [root]
+    parents = {root: None}
+    queue = deque([root])
+    while queue:
+        bx, by = queue.popleft()
+        for neighbor in ((bx + 1, by), (bx, by + 1), (bx - 1, by), (bx, by - 1)):
+            if neighbor in free and neighbor not in parents:
+                parents[neighbor] = (bx, by)
+                tree.append(neighbor)
+                queue.append(neighbor)
+                
+    # Each block's loop, as undirected edges between its corner cells
+    links = {}
+    
+    def link(a, b):
+        links.setdefault(a, set()).add(b)
+        links.setdefault(b, set()).add(a)
+        
+    def unlink(a, b):
+        links[a].discard(b)
+        links[b].discard(a)
+        
+    def corners(block):
+        x, y = left + block[0] * 2, top + block[1] * 2
+        return (x, y), (x + 1, y), (x, y + 1), (x + 1, y + 1)
+        
+    for block in tree:
+        top_left, top_right, bottom_left, bottom_right = corners(block)
+        link(top_left, top_right)
+        link(top_right, bottom_right)
+        link(bottom_right, bottom_left)
+        link(bottom_left, top_left)
+        
+    for block in tree[1:]:
+        parent = parents[block]
+        first, second = sorted((parent, block), key=lambda b: (b[1], b[0]))
+        first_tl, first_tr, first_bl, first_br = corners(first)
+        second_tl, second_tr, second_bl, second_br = corners(second)
+        if first[1] == second[1]:
+            # Side by side: swap the facing columns for two crossing edges
+            unlink(first_tr, first_br)
+            unlink(second_tl, second_bl)
+            link(first_tr, second_tl)
+            link(first_br, second_bl)
+        else:
+            # One above the other
+            unlink(first_bl, first_br)
+            unlink(second_tl, second_tr)
+            link(first_bl, second_tl)
+            link(first_br, second_tr)
+            
+    # Walk the single loop that's left
+    start_cell = corners(root)[0]
+    cycle = [start_cell]
+    previous, cell = start_cell, min(links[start_cell])
+    while cell != start_cell:
+        cycle.append(cell)
+        previous, cell = cell, next(c for c in links[cell] if c != previous)
+    return cycle
+
+
+class HamiltonianSolver:
+    """Plays perfectly by following a Hamiltonian cycle, with shortcuts.
+    
+    A snake whose body lies along the cycle can follow it forever, since
+    the head only ever moves into cells the tail has left. The cycle
+    covers every cell of the playing area (the inside of the walls in
+    walled modes) except the 2x2 blocks that contain obstacles.
+    
+    To get to food sooner the snake may leave the cycle, as long as every
+    cycle cell it crosses lies ahead of the head and before the tail, and
+    it rejoins the cycle far enough ahead of the tail to absorb the growth.
+    The same kind of detour reaches food off the cycle. Everything the
+    body leaves behind is then either off the cycle or behind the head, so
+    following the cycle stays safe. When no such path exists the snake
+    just follows the cycle, retrying every RETRY_MOVES moves. If the snake
+    ends up somewhere the cycle can't help (e.g. starting in a block with
+    an obstacle), an Autopilot takes over until it can. Boards of more than
+    LARGE_GRID_CELLS cells get no cycle, which would need several entries
+    per cell, and the Autopilot plays them throughout.
+    """
+    RETRY_MOVES = 8
+    
+    def __init__(self, simulation):
+        self.simulation = simulation
+        self.fallback = Autopilot(simulation)
+        self.path = deque()  # Cells of the current shortcut, next move first
+        self.direction = None
+        self.last_ticks = None
+        self.retry_ticks = 0
+        self.cycle_key = None
+        
+    def reset(self):
+        self.path.clear()
+        self.last_ticks = None
+        self.retry_ticks = 0
+        self.fallback.reset()
+        
+    def _prepare(self, grid, walls):
+        """Build the cycle for the current board."""
+        simulation = self.simulation
+        width, height = grid.width, grid.height
+        self.cycle_key = (width, height, walls, simulation.obstacle_version)
+        self.path.clear()
+        if width * height > LARGE_GRID_CELLS:
+            self.cycle = None
+            return
+        self.neighbors = neighbor_table(width, height, wrap=not walls)
+        blocked = {obstacle.position for obstacle in simulation.obstacles}
+        if walls:
+            cycle = build_cycle(width - 2, height - 2, blocked, (1, 1),
+                                simulation.snake.get_head_grid_position())
+        else:
+            cycle = build_cycle(width, height, blocked, (0, 0),
+                                simulation.snake.get_head_grid_position())
+        self.cycle = [y * width + x for x, y in cycle]
+        self.index = [-1] * (width * height)  # Position of each cell on the cycle
+        for i, cell in enumerate(self.cycle):
+            self.index[cell] = i
+        self.seen = [0] * (width * height)
+        self.parent = [0] * (width * height)
+        self.floor = [0] * (width * height)
+        self.stamp = 0
+        
+    def next_direction(self):
+        """Direction for the snake's next move (cached until the snake moves)."""
+        simulation = self.simulation
+        ticks = simulation.ticks
+        if ticks == self.last_ticks:
+            return self.direction
+        if self.last_ticks is None or ticks != self.last_ticks + 1:
+            self.path.clear()
+            self.retry_ticks = 0
+        self.last_ticks = ticks
+        
+        grid = simulation.grid
+        walls = simulation.mode_data.get('walls', False)
+        if (grid.width, grid.height, walls, simulation.obstacle_version) != self.cycle_key:
+            self._prepare(grid, walls)
+        if self.cycle is None:
+            self.direction = self.fallback.next_direction()
+            return self.direction
+            
+        snake = simulation.snake
+        head_x, head_y = snake.get_head_grid_position()
+        head = head_y * grid.width + head_x
+        step = None
+        path = self.path
+        if len(path) >= 2 and head == path[0]:
+            path.popleft()
+            step = path[0]
+        else:
+            path.clear()
+            gap = self._gap(head, grid, snake)
+            if gap is not None:
+                wanted, unwanted = self._sort_foods(grid, snake, gap)
+                
+                # Cycle cells may be crossed only if they're in the gap, with
+                # room for the most the snake could grow on the way
+                limit = gap - snake.growth_pending - sum(wanted.values())
+                if ticks >= self.retry_ticks:
+                    if self._plan(head, grid, limit, wanted, unwanted):
+                        step = path[0]
+                    else:
+                        self.retry_ticks = ticks + self.RETRY_MOVES
+                if step is None:
+                    successor = self.cycle[(self.index[head] + 1) % len(self.cycle)]
+                    if successor in unwanted:
+                        detour = self._search(head, None, grid, head, limit, avoid=unwanted)
+                        if detour:
+                            path.extend(detour)
+                            step = path[0]
+                    if step is None and not self._occupied(grid, successor, snake):
+                        step = successor
+                        
+        if step is None:
+            self.direction = self.fallback.next_direction()
+        else:
+            self.direction = DIRECTIONS[self.neighbors[head].index(step)]
+        return self.direction
+        
+    def _occupied(self, grid, cell, snake):
+        """Whether moving into cell next would be fatal."""
+        contents = grid.cells[cell]
+        if contents & OBSTACLE:
+            return True
+        if contents & SNAKE:
+            x, y = snake.get_segment_position(snake.length - 1)
+            return cell != y * grid.width + x or snake.growth_pending > 0
+        return False
+        
+    def _gap(self, head, grid, snake):
+        """Free cycle cells between the head and the tail, or None when the
+        head is off the cycle.
+        
+        Body segments off the cycle (left by detours) don't take up cycle
+        cells, so the gap ends at the last segment that's on it.
+        """
+        index = self.index
+        if index[head] < 0:
+            return None
+        width = grid.width
+        size = len(self.cycle)
+        for i in range(snake.length - 1, 0, -1):
+            x, y = snake.get_segment_position(i)
+            tail_index = index[y * width + x]
+            if tail_index >= 0:
+                return (tail_index - index[head]) % size - 1
+        return size - 1
+        
+    def _sort_foods(self, grid, snake, gap):
+        """Split the foods into wanted ones (cell -> points) and cells to
+        steer around: shrink power-ups, and anything the snake hasn't got
+        room to grow by."""
+        wanted = {}
+        unwanted = set()
+        width = grid.width
+        room = gap - snake.growth_pending
+        for food in self.simulation.foods:
+            x, y = food.position
+            if food.points > room or getattr(food, 'powerup_type', None) == "shrink":
+                unwanted.add(y * width + x)
+            else:
+                wanted[y * width + x] = food.points
+        return wanted, unwanted
+        
+    def _plan(self, head, grid, limit, wanted, unwanted):
+        """Find a shortcut or detour to food that keeps the cycle safe to follow."""
+        if not wanted or limit <= 0:
+            return False
+        path = self._search(head, wanted, grid, head, limit, avoid=unwanted)
+        if path is None:
+            return False
+            
+        # Food off the cycle also needs a way back on, further along than
+        # any cycle cell used to get there
+        target = path[-1]
+        if self.index[target] < 0:
+            exit_path = self._search(target, None, grid, head, limit, self.floor[target],
+                                     unwanted.union(path))
+            if exit_path is None:
+                return False
+            path += exit_path
+        self.path.extend(path)
+        return True
+        
+    def _search(self, start, targets, grid, head, limit, floor=0, avoid=()):
+        """Breadth-first search for the nearest target (or with targets None,
+        the nearest cycle cell) through free cells.
+        
+        Cycle cells on the path must come in cycle order, more than floor
+        and at most limit cells ahead of the head, so none of the body is
+        left ahead of the head. Returns the cells after start, or None.
+        """
+        neighbors = self.neighbors
+        cells = grid.cells
+        index = self.index
+        size = len(self.cycle)
+        origin = index[head]
+        seen = self.seen
+        parent = self.parent
+        floors = self.floor  # Furthest cycle cell on the way to each cell
+        self.stamp += 1
+        stamp = self.stamp
+        seen[start] = stamp
+        floors[start] = floor
+        frontier = [start]
+        while frontier:
+            next_frontier = []
+            for cell in frontier:
+                for neighbor in neighbors[cell]:
+                    if neighbor is None or seen[neighbor] == stamp:
+                        continue
+                    if cells[neighbor] & (SNAKE | OBSTACLE) or neighbor in avoid:
+                        continue
+                    position = index[neighbor]
+                    if position >= 0:
+                        distance = (position - origin) % size
+                        if distance > limit or distance <= floors[cell]:
+                            continue
+                        floors[neighbor] = distance
+                    else:
+                        floors[neighbor] = floors[cell]
+                    seen[neighbor] = stamp
+                    parent[neighbor] = cell
+                    # Without targets, any cell on the cycle will do
+                    found = position >= 0 if targets is None else neighbor in targets
+                    if found:
+                        path = []
+                        while neighbor != start:
+                            path.append(neighbor)
+                            neighbor = parent[neighbor]
+                        path.reverse()
+                        return path
+                    next_frontier.append(neighbor)
+            frontier = next_frontier
+        return None
\ No newline at end of file
@@ -1,7 +1,10 @@
 import pygame
 import math
 import os
+import numpy as np
 from src.particle import ParticleSystem
+from src.starfield import StarField
+from src.text import render_text
 
 class Button:
     def __init__(self, x, y, width, height, text, settings, action=None, hover_text=None):
@@ -79,8 +82,7 @@ class Button:
         self._draw_rounded_rect(screen, button_rect, color, 8)
         
         # Draw button text
-        font = pygame.font.Font(None, 32)
-        text_surf = font.render(self.text, True, self.text_color)
+        text_surf = render_text(self.text, 32, self.text_color)
         text_rect = text_surf.get_rect(center=button_rect.center)
         
         # Add subtle text animation
@@ -98,8 +100,7 @@ class Button:
         
         # Draw hover text if provided and hovered
         if self.hover_text and (self.hovered or self.touched):
-            hover_font = pygame.font.Font(None, 24)
-            hover_surf = hover_font.render(self.hover_text, True, self.text_color)
+            hover_surf = render_text(self.hover_text, 24, self.text_color)
             
             # Make hover text appear with animated effect
             hover_rect = hover_surf.get_rect(midtop=(button_rect.centerx, button_rect.bottom + 5))
@@ -196,45 +197,10 @@ class MainMenu:
         
         # For animated background
         self.animation_timer = 0
+        self._init_background()
         
         # For additional animation effects
-        self.star_particles = []
-        self._create_star_field()
-        
-    def _create_star_field(self):
-        """Create a star field for background animation"""
-        for _ in range(100):
-            x = random.randint(0, self.settings.WIDTH)
-            y = random.randint(0, self.settings.HEIGHT)
-            size = random.uniform(0.5, 2.5)
-            speed = random.uniform(0.1, 0.5)
-            brightness = random.uniform(0.3, 1.0)
-            self.star_particles.append({
-                'x': x, 'y': y, 'size': size, 'speed': speed, 
-                'brightness': brightness, 'color': (255, 255, 255)
-            })
-            
-    def _update_star_field(self):
-        """Update the star field animation"""
-        for star in self.star_particles:
-            # Make stars twinkle
-            star['brightness'] += random.uniform(-0.05, 0.05)
-            star['brightness'] = max(0.3, min(1.0, star['brightness']))
-            
-            # Move stars slowly downward
-            star['y'] += star['speed']
-            if star['y'] > self.settings.HEIGHT:
-                star['y'] = 0
-                star['x'] = random.randint(0, self.settings.WIDTH)
-                
-    def _draw_star_field(self):
-        """Draw the animated star field"""
-        for star in self.star_particles:
-            # Draw star with current brightness
-            color = tuple(int(c * star['brightness']) for c in star['color'])
-            pygame.draw.circle(self.screen, color, 
-                              (int(star['x']), int(star['y'])), 
-                              star['size'])
+        self.star_field = StarField(settings.WIDTH, settings.HEIGHT, settings.STAR_COUNT)
             
     def _init_buttons(self):
         self.buttons = []
@@ -288,7 +254,7 @@ class MainMenu:
         self.particle_system.update()
         
         # Update star field
-        self._update_star_field()
+        self.star_field.update()
         
         # Add occasional new particles for visual effect
         if random.random() < 0.05:
@@ -301,7 +267,7 @@ class MainMenu:
         self._draw_background()
         
         # Draw star field
-        self._draw_star_field()
+        self.star_field.draw(self.screen)
         
         # Draw logo if available, otherwise draw title text
         if self.logo_img:
@@ -312,19 +278,18 @@ class MainMenu:
             # Draw title with pulsating effect
             pulse = (math.sin(self.animation_timer * 3) + 1) * 0.1
             title_size = 80 + int(pulse * 10)
-            font = pygame.font.Font(None, title_size)
             
             # Create glowing title effect
             glow_color = (100, 200, 150)
             for offset in range(3, 0, -1):
                 shadow_color = (*glow_color, 50 + offset * 30)
-                title_text = font.render("Realistic Snake", True, shadow_color)
+                title_text = render_text("Realistic Snake", title_size, shadow_color)
                 title_rect = title_text.get_rect(centerx=self.settings.WIDTH // 2 + offset, 
                                                y=self.settings.HEIGHT // 6 + offset)
                 self.screen.blit(title_text, title_rect)
             
             # Draw main title text
-            title_text = font.render("Realistic Snake", True, self.settings.TEXT_COLOR)
+            title_text = render_text("Realistic Snake", title_size, self.settings.TEXT_COLOR)
             title_rect = title_text.get_rect(centerx=self.settings.WIDTH // 2, 
                                            y=self.settings.HEIGHT // 6)
             self.screen.blit(title_text, title_rect)
@@ -337,42 +302,52 @@ class MainMenu:
         self.particle_system.draw(self.screen)
         
         # Draw footer text - updated for touch controls
-        font = pygame.font.Font(None, 24)
         if self.settings.HAS_TOUCHSCREEN:
-            footer_text = font.render("Use the on-screen directional buttons to control the snake", 
-                                   True, self.settings.TEXT_COLOR)
+            footer_text = render_text("Use the on-screen directional buttons to control the snake", 
+                                   24, self.settings.TEXT_COLOR)
         else:
-            footer_text = font.render("Use arrow keys/WASD or touch controls to play", 
-                                   True, self.settings.TEXT_COLOR)
+            footer_text = render_text("Use arrow keys/WASD or touch controls to play", 
+                                   24, self.settings.TEXT_COLOR)
         footer_rect = footer_text.get_rect(centerx=self.settings.WIDTH // 2, 
                                          bottom=self.settings.HEIGHT - 20)
         self.screen.blit(footer_text, footer_rect)
         
+    def _init_background(self):
+        """Precompute the animated background's per-cell distance field.
+        
+        The background is one color per grid cell, so each frame is computed
+        on a small surface with one pixel per cell and scaled up to the screen.
+        """
+        cell_size = self.settings.CELL_SIZE
+        xs = np.arange(0, self.settings.WIDTH, cell_size)
+        ys = np.arange(0, self.settings.HEIGHT, cell_size)
+        
+        # Distance of each cell's corner from the screen centre, indexed [x, y]
+        # like pygame.surfarray
+        dx = xs[:, None] - self.settings.WIDTH // 2
+        dy = ys[None, :] - self.settings.HEIGHT // 2
+        self.background_distance = np.sqrt(dx * dx + dy * dy) * 0.01
+        
+        self.background_cells = pygame.Surface((len(xs), len(ys)))
+        self.background_surface = pygame.Surface((len(xs) * cell_size, len(ys) * cell_size))
+        self.background_pixels = np.empty((len(xs), len(ys), 3), dtype=np.uint8)
+        
     def _draw_background(self):
-        # Draw animated background pattern
-        for x in range(0, self.settings.WIDTH, self.settings.CELL_SIZE):
-            for y in range(0, self.settings.HEIGHT, self.settings.CELL_SIZE):
-                # Calculate distance from center for radial effect
-                center_x = self.settings.WIDTH // 2
-                center_y = self.settings.HEIGHT // 2
-                dx = x - center_x
-                dy = y - center_y
-                distance = math.sqrt(dx * dx + dy * dy)
-                
-                # Use distance and time for color oscillation
-                color_value = (math.sin(distance * 0.01 + self.animation_timer) + 1) * 0.5
-                color_value = max(0.1, min(0.3, color_value))  # Limit range
-                
-                # Create slightly varied color based on position
-                color = (
-                    int(self.settings.BG_COLOR[0] * color_value),
-                    int(self.settings.BG_COLOR[1] * color_value),
-                    int(self.settings.BG_COLOR[2] * color_value)
-                )
-                
-                # Draw grid cell
-                pygame.draw.rect(self.screen, color, (x, y, self.settings.CELL_SIZE, self.settings.CELL_SIZE))
-                
+        # Use distance and time for color oscillation, for every cell at once
+        color_value = (np.sin(self.background_distance + self.animation_timer) + 1) * 0.5
+        np.clip(color_value, 0.1, 0.3, out=color_value)  # Limit range
+        
+        # Create slightly varied color based on position
+        for channel in range(3):
+            np.multiply(color_value, self.settings.BG_COLOR[channel],
+                        out=self.background_pixels[:, :, channel], casting='unsafe')
+                        
+        # Write one pixel per cell and scale it up to grid cells
+        pygame.surfarray.blit_array(self.background_cells, self.background_pixels)
+        pygame.transform.scale(self.background_cells, self.background_surface.get_size(),
+                               self.background_surface)
+        self.screen.blit(self.background_surface, (0, 0))
+        
     def handle_event(self, event):
         """Handle menu events, including button presses."""
         # Check each button
@@ -1,79 +1,182 @@
 import pygame
-import random
-import math
+import numpy as np
 
-class Particle:
-    def __init__(self, x, y, color, settings):
-        self.x = x
-        self.y = y
-        self.color = color
-        self.settings = settings
-        self.lifetime = settings.PARTICLE_LIFETIME
-        self.size = random.randint(2, 6)
-        self.speed = random.uniform(0.5, 2.0)
-        self.angle = random.uniform(0, math.pi * 2)
-        self.velocity_x = math.cos(self.angle) * self.speed
-        self.velocity_y = math.sin(self.angle) * self.speed
-        self.alpha = 255
-        self.alpha_decay = 255 / self.lifetime
+class ParticleRenderer:
+    """Draws particles from pre-rendered alpha sprites in one batched blit.
+    
+    Sprites are quantized by size (half pixel steps), alpha (ALPHA_LEVELS
+    steps) and color, rendered once on first use and shared by every
+    particle system, so drawing allocates no surfaces after warm-up.
+    """
+    ALPHA_LEVELS = 16
+    
+    def __init__(self):
+        self.sprites = {}
         
-    def update(self):
-        # Move particle
-        self.x += self.velocity_x
-        self.y += self.velocity_y
+    def sprite(self, size_bucket, alpha_bucket, color):
+        key = (size_bucket, alpha_bucket, color)
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            radius = size_bucket / 2
+            alpha = round(alpha_bucket * 255 / (self.ALPHA_LEVELS - 1))
+            sprite = pygame.Surface((size_bucket, size_bucket), pygame.SRCALPHA)
+            pygame.draw.circle(sprite, (*color, alpha), (radius, radius), radius)
+            self.sprites[key] = sprite
+        return sprite
         
-        # Add gravity effect
-        self.velocity_y += 0.05
-        
-        # Slow down over time
-        self.velocity_x *= 0.97
-        self.velocity_y *= 0.97
-        
-        # Shrink particle over time
-        if self.size > 0.5:
-            self.size *= 0.95
-            
-        # Reduce opacity over time
-        self.alpha -= self.alpha_decay
-        if self.alpha < 0:
-            self.alpha = 0
+    def draw(self, system, screen, offset=(0, 0)):
+        n = system.count
+        if n == 0:
+            return
             
-        # Reduce lifetime
-        self.lifetime -= 1
+        # Quantize every particle at once
+        size_buckets = np.maximum(np.rint(system.size[:n] * 2), 1).astype(np.int32)
+        alpha_buckets = np.rint(system.alpha[:n] * ((self.ALPHA_LEVELS - 1) / 255)).astype(np.int32)
+        left = (system.x[:n] - offset[0] - size_buckets / 2).astype(np.int32)
+        top = (system.y[:n] - offset[1] - size_buckets / 2).astype(np.int32)
         
-    def is_alive(self):
-        return self.lifetime > 0
-        
-    def draw(self, screen):
-        # Create a surface with alpha transparency
-        s = pygame.Surface((self.size * 2, self.size * 2), pygame.SRCALPHA)
-        # Draw the particle with appropriate alpha
-        pygame.draw.circle(s, (*self.color, int(self.alpha)), (self.size, self.size), self.size)
-        # Blit the surface onto the screen
-        screen.blit(s, (int(self.x - self.size), int(self.y - self.size)))
+        # Skip ones that have faded out or are off screen
+        width, height = screen.get_size()
+        visible = ((alpha_buckets > 0) & (left < width) & (top < height)
+                   & (left + size_buckets > 0) & (top + size_buckets > 0))
+        if not visible.all():
+            size_buckets = size_buckets[visible]
+            alpha_buckets = alpha_buckets[visible]
+            left = left[visible]
+            top = top[visible]
+        color_indices = system.color_index[:n][visible]
         
+        colors = system.colors
+        sprite = self.sprite
+        screen.blits([(sprite(s, a, colors[c]), (x, y)) for s, a, c, x, y in
+                      zip(size_buckets.tolist(), alpha_buckets.tolist(), color_indices.tolist(),
+                          left.tolist(), top.tolist())], doreturn=False)
+
+
+# Sprites are shared by all particle systems
+particle_renderer = ParticleRenderer()
+
 
 class ParticleSystem:
-    def __init__(self, settings):
+    """Particle effects stored as NumPy arrays (one array per attribute).
+    
+    Particles live in a fixed-capacity pool: creating a burst writes into the
+    free end of the arrays, update() advances every particle with a handful of
+    vectorized operations and compacts dead ones to the front, so no Python
+    object is allocated per particle. Bursts that don't fit are truncated.
+    """
+    def __init__(self, settings, capacity=None, seed=None):
         self.settings = settings
-        self.particles = []
+        self.capacity = capacity or settings.PARTICLE_POOL_SIZE
+        self.count = 0
+        self.rng = np.random.default_rng(seed)
         
-    def create_particles(self, x, y, count, color=None):
-        for _ in range(count):
-            # If no color is provided, choose from the particle colors in settings
-            if color is None:
-                particle_color = random.choice(self.settings.PARTICLE_COLORS)
-            else:
-                particle_color = color
+        # Particle attributes
+        self.x = np.zeros(self.capacity, dtype=np.float32)
+        self.y = np.zeros(self.capacity, dtype=np.float32)
+        self.vx = np.zeros(self.capacity, dtype=np.float32)
+        self.vy = np.zeros(self.capacity, dtype=np.float32)
+        self.size = np.zeros(self.capacity, dtype=np.float32)
+        self.alpha = np.zeros(self.capacity, dtype=np.float32)
+        self.lifetime = np.zeros(self.capacity, dtype=np.int16)
+        self.color_index = np.zeros(self.capacity, dtype=np.int16)
+        
+        # Colors are referenced by index; the settings palette comes first
+        self.colors = list(settings.PARTICLE_COLORS)
+        self.color_indices = {color: i for i, color in enumerate(self.colors)}
+        self.alpha_decay = 255 / settings.PARTICLE_LIFETIME
+        
+    def __len__(self):
+        return self.count
+        
+    def clear(self):
+        self.count = 0
+        
+    def seed(self, seed):
+        """Restart the random stream, so a replayed game's effects repeat exactly."""
+        self.rng = np.random.default_rng(seed)
                 
-            self.particles.append(Particle(x, y, particle_color, self.settings))
+    def _color_index(self, color):
+        color = tuple(color[:3])
+        if color not in self.color_indices:
+            self.color_indices[color] = len(self.colors)
+            self.colors.append(color)
+        return self.color_indices[color]
+        
+    def create_particles(self, x, y, count, color=None):
+        count = min(int(count), self.capacity - self.count)
+        if count <= 0:
+            return
+        start = self.count
+        end = start + count
+        
+        # Random size, speed and direction for each new particle
+        speed = self.rng.uniform(0.5, 2.0, count)
+        angle = self.rng.uniform(0, np.pi * 2, count)
+        self.x[start:end] = x
+        self.y[start:end] = y
+        self.vx[start:end] = np.cos(angle) * speed
+        self.vy[start:end] = np.sin(angle) * speed
+        self.size[start:end] = self.rng.integers(2, 7, count)
+        self.alpha[start:end] = 255
+        self.lifetime[start:end] = self.settings.PARTICLE_LIFETIME
+        
+        # If no color is provided, choose from the particle colors in settings
+        if color is None:
+            self.color_index[start:end] = self.rng.integers(0, len(self.settings.PARTICLE_COLORS), count)
+        else:
+            self.color_index[start:end] = self._color_index(color)
             
+        self.count = end
+        
     def update(self):
-        # Update all particles
-        self.particles = [p for p in self.particles if p.is_alive()]
-        for particle in self.particles:
-            particle.update()
+        # Drop dead particles by compacting the live ones to the front
+        n = self.count
+        alive = self.lifetime[:n] > 0
+        if not alive.all():
+            n = int(np.count_nonzero(alive))
+            for array in (self.x, self.y, self.vx, self.vy, self.size,
+                          self.alpha, self.lifetime, self.color_index):
+                array[:n] = array[:self.count][alive]
+            self.count = n
+        if n == 0:
+            return
             
-    def draw(self, screen):
-        for particle in self.particles:
-            particle.draw(screen) 
\ No newline at end of file
+        # Move particles
+        self.x[:n] += self.vx[:n]
+        self.y[:n] += self.vy[:n]
+        
+        # Add gravity effect
+        self.vy[:n] += 0.05
+        
+        # Slow down over time
+        self.vx[:n] *= 0.97
+        self.vy[:n] *= 0.97
+        
+        # Shrink particles over time
+        size = self.size[:n]
+        size[size > 0.5] *= 0.95
+        
+        # Reduce opacity over time
+        alpha = self.alpha[:n]
+        alpha -= self.alpha_decay
+        np.maximum(alpha, 0, out=alpha)
+        
+        # Reduce lifetime
+        self.lifetime[:n] -= 1
+        
+    def get_bounds(self, offset=(0, 0)):
+        """Screen rect covering every live particle, or None if there are none."""
+        n = self.count
+        if n == 0:
+            return None
+        size = self.size[:n]
+        left = int(np.min(self.x[:n] - size)) - 1 - offset[0]
+        top = int(np.min(self.y[:n] - size)) - 1 - offset[1]
+        right = int(np.max(self.x[:n] + size)) + 2 - offset[0]
+        bottom = int(np.max(self.y[:n] + size)) + 2 - offset[1]
+        return pygame.Rect(left, top, right - left, bottom - top)
+        
+    def draw(self, screen, offset=(0, 0)):
+        """Draw the particles on screen, shifted left and up by offset (world to screen)."""
+        particle_renderer.draw(self, screen, offset)
@@ -0,0 +1,176 @@
+import pygame
+import json
+import time
+import numpy as np
+from contextlib import nullcontext
+from src.text import render_text
+
+class _Section:
+    """Context manager adding the time spent in its block to one section."""
+    __slots__ = ('profiler', 'times', 'start')
+    
+    def __init__(self, profiler, times):
+        self.profiler = profiler
+        self.times = times
+        self.start = 0
+        
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+        
+    def __exit__(self, *exc_info):
+        self.times[self.profiler.slot] += (time.perf_counter() - self.start) * 1000
+        return False
+
+
+class FrameProfiler:
+    """Per-frame timings for the main loop's subsystems.
+    
+    Frame times and the time spent in each named section are kept in ring
+    buffers of the last capacity frames, so recording costs two clock reads
+    per section and no allocation. Sections entered several times in one
+    frame (e.g. once per simulation tick) add up. The overlay shows frame
+    time percentiles and per-section averages; dump() writes the history
+    to a JSON file for offline analysis.
+    """
+    REFRESH_FRAMES = 15  # Frames between overlay redraws, so it stays readable
+    
+    def __init__(self, capacity=600):
+        self.capacity = capacity
+        self.enabled = False
+        self.overlay_visible = False
+        self.frame_times = np.zeros(capacity)
+        self.section_times = {}
+        self.sections = {}
+        self.frame_count = 0  # Completed frames
+        self.slot = 0  # Ring buffer slot of the frame in progress
+        self.frame_start = None
+        self.overlay_surface = None
+        self.overlay_frame = -1
+        self._null_section = nullcontext()
+        
+    def begin_frame(self):
+        """Close the previous frame and start timing a new one."""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self.frame_start is not None:
+            self.frame_times[self.slot] = (now - self.frame_start) * 1000
+            self.frame_count += 1
+            self.slot = self.frame_count % self.capacity
+            for times in self.section_times.values():
+                times[self.slot] = 0
+        self.frame_start = now
+        
+    def measure(self, name):
+        """Return a context manager timing its block under the given section."""
+        if not self.enabled:
+            return self._null_section
+        section = self.sections.get(name)
+        if section is None:
+            times = np.zeros(self.capacity)
+            self.section_times[name] = times
+            section = _Section(self, times)
+            self.sections[name] = section
+        return section
+        
+    def record(self, name, start):
+        """Add the time since start (a time.perf_counter() reading) to a section."""
+        if self.enabled:
+            self.measure(name).times[self.slot] += (time.perf_counter() - start) * 1000
+            
+    def reset(self):
+        self.frame_times[:] = 0
+        self.section_times.clear()
+        self.sections.clear()
+        self.frame_count = 0
+        self.slot = 0
+        self.frame_start = None
+        self.overlay_frame = -1
+        
+    def _history(self, times, frames=None):
+        """Completed frames of a ring buffer, oldest first (optionally only the last few)."""
+        count = min(self.frame_count, self.capacity)
+        if frames is not None:
+            count = min(count, frames)
+        indices = (self.slot - count + np.arange(count)) % self.capacity
+        return times[indices]
+        
+    def percentiles(self, frames=None):
+        """p50/p95/p99 frame times in milliseconds, or None before the first frame."""
+        history = self._history(self.frame_times, frames)
+        if not len(history):
+            return None
+        p50, p95, p99 = np.percentile(history, [50, 95, 99])
+        return {"p50": float(p50), "p95": float(p95), "p99": float(p99)}
+        
+    def section_stats(self, frames=None):
+        """Mean and worst milliseconds per frame for every section."""
+        stats = {}
+        for name, times in self.section_times.items():
+            history = self._history(times, frames)
+            if len(history):
+                stats[name] = {"mean": float(history.mean()), "max": float(history.max())}
+        return stats
+        
+    def dump(self, path):
+        """Write the recorded history and its summary as JSON."""
+        data = {
+            "frames": min(self.frame_count, self.capacity),
+            "percentiles_ms": self.percentiles(),
+            "sections_ms": self.section_stats(),
+            "frame_ms": self._history(self.frame_times).round(3).tolist(),
+            "section_ms": {name: self._history(times).round(3).tolist()
+                           for name, times in self.section_times.items()},
+        }
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2)
+        return path
+        
+    def set_enabled(self, enabled):
+        """Start or stop recording; the time spent stopped isn't counted as a frame."""
+        if enabled and not self.enabled:
+            self.frame_start = None
+            for times in self.section_times.values():
+                times[self.slot] = 0
+        self.enabled = enabled
+        
+    def toggle_overlay(self):
+        self.overlay_visible = not self.overlay_visible
+        self.overlay_frame = -1
+        
+    def draw_overlay(self, screen, color=(230, 230, 230)):
+        """Draw the stats panel in the bottom-left corner and return its rect."""
+        if self.overlay_surface is None or self.frame_count - self.overlay_frame >= self.REFRESH_FRAMES:
+            self.overlay_surface = self._render_overlay(color)
+            self.overlay_frame = self.frame_count
+        rect = self.overlay_surface.get_rect(bottomleft=(10, screen.get_height() - 10))
+        return screen.blit(self.overlay_surface, rect)
+        
+    def _render_overlay(self, color):
+        # Summarize roughly the last second of frames
+        frames = 60
+        percentiles = self.percentiles(frames)
+        if percentiles is None:
+            lines = ["Collecting frame times..."]
+        else:
+            mean_frame = float(self._history(self.frame_times, frames).mean())
+            fps = 1000 / mean_frame if mean_frame else 0
+            lines = [f"{fps:.0f} FPS  p50 {percentiles['p50']:.1f}  "
+                     f"p95 {percentiles['p95']:.1f}  p99 {percentiles['p99']:.1f} ms"]
+            for name, stats in self.section_stats(frames).items():
+                lines.append(f"{name:<12} {stats['mean']:6.2f} ms  max {stats['max']:6.2f}")
+                
+        texts = [render_text(line, 20, color) for line in lines]
+        width = max(text.get_width() for text in texts) + 16
+        height = sum(text.get_height() for text in texts) + 12
+        surface = pygame.Surface((width, height), pygame.SRCALPHA)
+        surface.fill((0, 0, 0, 170))
+        y = 6
+        for text in texts:
+            surface.blit(text, (8, y))
+            y += text.get_height()
+        return surface
+
+
+profiler = FrameProfiler()
\ No newline at end of file
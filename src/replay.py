@@ -0,0 +1,246 @@
+import bisect
+from src.simulation import Simulation, DIRECTIONS, DIRECTION_CODES
+
+MAGIC = b"SNKR"
+VERSION = 1
+
+# Record kinds, stored in the low 3 bits of each record's tick delta
+CHECKSUM = 4
+END = 5
+
+def _write_varint(out, value):
+    """Append an unsigned LEB128 varint to a bytearray."""
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data, pos):
+    """Read a varint from data at pos. Returns (value, new pos)."""
+    value = 0
+    shift = 0
+    while True:
+        if pos >= len(data):
+            raise ValueError("Truncated replay")
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, pos
+        shift += 7
+
+
+def _write_string(out, text):
+    encoded = text.encode()
+    _write_varint(out, len(encoded))
+    out += encoded
+
+
+def _read_string(data, pos):
+    length, pos = _read_varint(data, pos)
+    if pos + length > len(data):
+        raise ValueError("Truncated replay")
+    return data[pos:pos + length].decode(), pos + length
+
+
+class Replay:
+    """A recorded game: everything needed to re-simulate it exactly.
+    
+    Games are deterministic given their seed, so a replay only stores the
+    seed, mode and grid size plus the direction changes, each tagged with
+    the simulation step it was made before. State checksums every
+    checksum_interval steps let playback detect when it has diverged.
+    
+    On disk every record is a varint of (step delta << 3 | kind) followed
+    by the kind's payload, so a typical input costs a byte or two.
+    """
+    def __init__(self, seed, mode, tick_rate, grid_size, checksum_interval=60):
+        self.seed = seed
+        self.mode = mode
+        self.tick_rate = tick_rate  # Simulation steps per second
+        self.grid_size = tuple(grid_size)
+        self.checksum_interval = checksum_interval
+        self.inputs = []  # (step, direction), in order
+        self.checksums = {}  # Step -> state checksum after that many steps
+        self.end_step = None
+        self.score = None
+        
+    @classmethod
+    def for_simulation(cls, simulation, tick_rate, checksum_interval=60):
+        """Start an empty recording of the game the simulation was just reset to."""
+        settings = simulation.settings
+        return cls(simulation.seed, simulation.current_mode, tick_rate,
+                   (settings.GRID_WIDTH, settings.GRID_HEIGHT), checksum_interval)
+                   
+    def record_input(self, step, direction):
+        """Record a direction change made before the given step."""
+        self.inputs.append((step, direction))
+        
+    def record_step(self, simulation):
+        """Call after every simulation step to record periodic checksums."""
+        if self.checksum_interval and simulation.steps % self.checksum_interval == 0:
+            self.checksums[simulation.steps] = simulation.checksum()
+            
+    def finish(self, simulation):
+        """Mark the end of the game, with a checksum of the final state."""
+        self.end_step = simulation.steps
+        self.score = simulation.score
+        self.checksums[simulation.steps] = simulation.checksum()
+        
+    @property
+    def duration(self):
+        """Length of the game in milliseconds of simulation time."""
+        return (self.end_step or 0) * 1000 / self.tick_rate
+        
+    def to_bytes(self):
+        out = bytearray(MAGIC)
+        out.append(VERSION)
+        _write_varint(out, self.seed)
+        _write_string(out, self.mode)
+        for value in (self.tick_rate, *self.grid_size, self.checksum_interval):
+            _write_varint(out, value)
+            
+        # Inputs and checksums interleaved by step; an input made before
+        # step n and the checksum after n steps share a step number, and the
+        # checksum comes first, as in the game
+        records = [(step, 0, CHECKSUM, checksum) for step, checksum in self.checksums.items()]
+        records += [(step, 1, DIRECTION_CODES[direction], None) for step, direction in self.inputs]
+        records.sort(key=lambda record: record[:2])
+        
+        last_step = 0
+        for step, _, kind, payload in records:
+            _write_varint(out, (step - last_step) << 3 | kind)
+            if payload is not None:
+                _write_varint(out, payload)
+            last_step = step
+            
+        if self.end_step is not None:
+            _write_varint(out, (self.end_step - last_step) << 3 | END)
+            _write_varint(out, self.score)
+        return bytes(out)
+        
+    @classmethod
+    def from_bytes(cls, data):
+        if data[:len(MAGIC)] != MAGIC:
+            raise ValueError("Not a replay file")
+        pos = len(MAGIC)
+        version = data[pos]
+        if version != VERSION:
+            raise ValueError(f"Unsupported replay version {version}")
+        seed, pos = _read_varint(data, pos + 1)
+        mode, pos = _read_string(data, pos)
+        values = []
+        for _ in range(4):
+            value, pos = _read_varint(data, pos)
+            values.append(value)
+        tick_rate, grid_width, grid_height, checksum_interval = values
+        replay = cls(seed, mode, tick_rate, (grid_width, grid_height), checksum_interval)
+        
+        step = 0
+        while pos < len(data):
+            record, pos = _read_varint(data, pos)
+            step += record >> 3
+            kind = record & 7
+            if kind < len(DIRECTIONS):
+                replay.inputs.append((step, DIRECTIONS[kind]))
+            elif kind == CHECKSUM:
+                replay.checksums[step], pos = _read_varint(data, pos)
+            elif kind == END:
+                replay.end_step = step
+                replay.score, pos = _read_varint(data, pos)
+            else:
+                raise ValueError(f"Unknown replay record {kind}")
+                
+        # A recording that was cut short ends at its last record
+        if replay.end_step is None:
+            replay.end_step = step
+        return replay
+        
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+            
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+
+class ReplayPlayer:
+    """Re-simulates a replay on a simulation, one step at a time.
+    
+    step() can be called as fast as the CPU allows for headless checks, or
+    from a game loop at any rate for rendered playback. A snapshot of the
+    simulation is kept every KEYFRAME_INTERVAL steps as playback passes
+    it, so seek() only re-simulates from the nearest earlier keyframe.
+    """
+    KEYFRAME_INTERVAL = 600
+    
+    def __init__(self, replay, simulation):
+        settings = simulation.settings
+        if (settings.GRID_WIDTH, settings.GRID_HEIGHT) != replay.grid_size:
+            raise ValueError(f"Replay was recorded on a {replay.grid_size[0]}x{replay.grid_size[1]} grid")
+        self.replay = replay
+        self.simulation = simulation
+        self.dt = 1000 / replay.tick_rate
+        
+        # Directions to apply before each step
+        self.inputs = {}
+        for step, direction in replay.inputs:
+            self.inputs.setdefault(step, []).append(direction)
+            
+        self.desync_step = None  # First step whose checksum didn't match
+        simulation.set_mode(replay.mode, replay.seed)
+        self.keyframes = {0: simulation.snapshot()}
+        self.keyframe_steps = [0]
+        
+    @property
+    def position(self):
+        """Number of steps played so far."""
+        return self.simulation.steps
+        
+    @property
+    def finished(self):
+        return self.simulation.game_over or self.position >= self.replay.end_step
+        
+    def step(self):
+        """Play one simulation step. Returns its events (none once finished)."""
+        if self.finished:
+            return []
+        simulation = self.simulation
+        for direction in self.inputs.get(simulation.steps, ()):
+            simulation.snake.change_direction(direction)
+        events = simulation.step(self.dt)
+        
+        position = simulation.steps
+        expected = self.replay.checksums.get(position)
+        if expected is not None and self.desync_step is None and simulation.checksum() != expected:
+            self.desync_step = position
+        if position % self.KEYFRAME_INTERVAL == 0 and position not in self.keyframes:
+            self.keyframes[position] = simulation.snapshot()
+            bisect.insort(self.keyframe_steps, position)
+        return events
+        
+    def seek(self, position):
+        """Move playback to the given step, going back to a keyframe if needed."""
+        position = max(0, min(position, self.replay.end_step))
+        keyframe = self.keyframe_steps[bisect.bisect_right(self.keyframe_steps, position) - 1]
+        if position < self.position or keyframe > self.position:
+            self.simulation.restore(self.keyframes[keyframe])
+        while self.position < position and not self.finished:
+            self.step()
+            
+    def run(self):
+        """Play the rest of the replay as fast as possible. Returns the simulation."""
+        while not self.finished:
+            self.step()
+        return self.simulation
+
+
+def play_headless(replay, settings):
+    """Re-simulate a replay without a display. Returns the finished ReplayPlayer."""
+    simulation = Simulation(settings, replay.mode, replay.seed)
+    player = ReplayPlayer(replay, simulation)
+    player.run()
+    return player
\ No newline at end of file
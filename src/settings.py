@@ -5,7 +5,9 @@ class Settings:
         # Window settings
         self.WIDTH = 1200
         self.HEIGHT = 800
-        self.FPS = 60
+        self.FPS = 60  # Render frame cap (0 = uncapped)
+        self.TICK_RATE = 60  # Fixed game logic ticks per second, independent of FPS
+        self.MAX_FRAME_TIME = 250  # Longest frame (ms) the simulation catches up on
         
         # Touch settings
         self.HAS_TOUCHSCREEN = True  # Default to true for better compatibility
@@ -40,11 +42,21 @@ class Settings:
         self.ANIMATION_ENABLED = True
         self.PARTICLE_DENSITY = 1.5      # Multiplier for particle effects
         self.GLOW_EFFECTS_ENABLED = True
+        self.STAR_COUNT = 100  # Stars in the menu background (raise for large displays)
+        
+        # Rendering settings
+        self.DIRTY_RECT_RENDERING = False  # Update only changed screen regions (helps slow devices)
+        self.DIRTY_RECT_THRESHOLD = 0.5  # Fraction of the screen above which a full flip is used
+        self.PROFILING_ENABLED = False  # Record per-frame timings from launch (main.py --profile); F3 shows them, F4 saves them
+        
+        # Replay settings
+        self.REPLAY_RECORDING = False  # Save a replay of every game (main.py --record)
+        self.REPLAY_DIR = "replays"
+        self.REPLAY_CHECKSUM_INTERVAL = 60  # Simulation steps between state checksums
         
         # Game settings
         self.CELL_SIZE = 20
-        self.GRID_WIDTH = self.WIDTH // self.CELL_SIZE
-        self.GRID_HEIGHT = self.HEIGHT // self.CELL_SIZE
+        self.set_world_size(None)  # Sets WORLD_SIZE, GRID_WIDTH and GRID_HEIGHT
         self.INITIAL_SNAKE_LENGTH = 3
         self.INITIAL_SNAKE_SPEED = 8  # Moves per second
         self.MAX_SNAKE_SPEED = 20
@@ -98,6 +110,7 @@ class Settings:
         # Particle settings
         self.PARTICLE_COUNT = 30  # Increased from 20
         self.PARTICLE_LIFETIME = 30  # frames
+        self.PARTICLE_POOL_SIZE = 1024  # Max live particles per particle system
         self.PARTICLE_COLORS = [
             (255, 255, 50), (255, 220, 50), (255, 180, 50),
             (255, 140, 50), (255, 100, 50)
@@ -108,6 +121,19 @@ class Settings:
         self.MUSIC_VOLUME = 0.3
         self.SFX_VOLUME = 0.5
         
+    def set_world_size(self, size):
+        """Size the world as (columns, rows), or fit it to the window with None.
+        
+        A world bigger than the window scrolls, with the camera following the
+        snake's head.
+        """
+        self.WORLD_SIZE = size
+        if size is None:
+            self.GRID_WIDTH = self.WIDTH // self.CELL_SIZE
+            self.GRID_HEIGHT = self.HEIGHT // self.CELL_SIZE
+        else:
+            self.GRID_WIDTH, self.GRID_HEIGHT = size
+            
     def is_touch_device(self):
         """Helper method to check if device has touch capabilities"""
         # Check for touch events in pygame event queue
@@ -0,0 +1,367 @@
+import random
+import zlib
+from src.snake import Snake
+from src.food import Food, Obstacle
+from src.grid import OccupancyGrid, OBSTACLE, FOOD
+from src.world import ChunkMap
+
+# Direction codes, shared by replays, the batch simulator and the
+# environments' actions; code ^ 1 is the opposite direction
+DIRECTIONS = ["UP", "DOWN", "LEFT", "RIGHT"]
+DIRECTION_CODES = {direction: code for code, direction in enumerate(DIRECTIONS)}
+
+class Simulation:
+    """Display-free game rules: snake movement, collisions, food and power-ups.
+    
+    All timing comes from the dt passed to step(), so a simulation can run in
+    lockstep with the render loop or headlessly as fast as the CPU allows.
+    Nothing here touches the display or the mixer; step() returns a list of
+    events which the caller can turn into sounds and particles.
+    
+    All randomness comes from a per-game RNG seeded on reset(), so a game is
+    reproduced exactly by resetting with its seed and replaying its actions.
+    """
+    def __init__(self, settings, mode="classic", seed=None):
+        self.settings = settings
+        self.current_mode = mode
+        self.mode_data = settings.GAME_MODES[mode]
+        self.high_score = 0
+        
+        # Game objects, all registered in a shared occupancy grid
+        self.grid = OccupancyGrid(settings.GRID_WIDTH, settings.GRID_HEIGHT)
+        self.snake = Snake(settings, self.grid)
+        
+        # Empty cells where food (away from the border) and obstacles
+        # (away from the walls) may be placed
+        self.food_cells = self.grid.free_cells(margin=1)
+        self.obstacle_cells = self.grid.free_cells(margin=2)
+        self.foods = []
+        self.obstacles = []
+        self.obstacle_chunks = ChunkMap()  # Obstacles by chunk, so renderers can cull them
+        self.obstacle_version = 0
+        
+        # Power-up effects
+        self.active_powerups = {
+            "speed": {"active": False, "end_time": 0},
+            "slow": {"active": False, "end_time": 0},
+            "shrink": {"active": False, "end_time": 0},
+            "ghost": {"active": False, "end_time": 0}
+        }
+        
+        # Events produced by the last step (or reset)
+        self.events = []
+        
+        self.rng = random.Random()
+        self.seed = None
+        self.reset(seed)
+        
+    def reset(self, seed=None):
+        """Start a new game in the current mode, with a fresh seed unless one is given."""
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.rng.seed(self.seed)
+        self.events = []
+        self.game_over = False
+        self.cause_of_death = None
+        self.score = 0
+        self.time = 0  # Simulation clock in milliseconds
+        self.steps = 0  # Number of step() calls so far
+        self.ticks = 0  # Number of snake moves so far
+        self.time_remaining = self.mode_data.get('time_limit', None)
+        self.last_speed_increase_time = 0
+        
+        # Clear food and obstacles
+        self.grid.clear()
+        self.foods.clear()
+        self.obstacles.clear()
+        self.obstacle_chunks.clear()
+        self.obstacle_version += 1  # Lets renderers know cached obstacle layers are stale
+        
+        # Reset snake
+        self.snake.reset()
+        
+        # Create initial food
+        self.spawn_food()
+        
+        # Create obstacles for obstacle mode
+        if self.mode_data.get('obstacles', False):
+            self._create_obstacles()
+            
+        # Create walls for walled modes
+        if self.mode_data.get('walls', False):
+            self._create_walls()
+            
+        # Reset power-ups
+        for powerup in self.active_powerups.values():
+            powerup['active'] = False
+            powerup['end_time'] = 0
+            
+        return self.events
+        
+    def set_mode(self, mode, seed=None):
+        """Change the game mode and start a new game."""
+        if mode in self.settings.GAME_MODES:
+            self.current_mode = mode
+            self.mode_data = self.settings.GAME_MODES[mode]
+            return self.reset(seed)
+        return []
+        
+    def _create_obstacles(self):
+        """Create obstacles for the obstacle mode."""
+        num_obstacles = self.mode_data.get('num_obstacles', 10)
+        
+        # Create specified number of obstacles on free cells (away from the edges)
+        for _ in range(num_obstacles):
+            position = self.obstacle_cells.choice(self.rng)
+            if position is None:
+                break
+            self._add_obstacle(*position)
+                
+    def _create_walls(self):
+        """Create walls around the edge of the screen."""
+        # Create walls along the borders
+        for x in range(self.settings.GRID_WIDTH):
+            # Top wall
+            self._add_obstacle(x, 0, True)
+            # Bottom wall
+            self._add_obstacle(x, self.settings.GRID_HEIGHT - 1, True)
+            
+        for y in range(1, self.settings.GRID_HEIGHT - 1):
+            # Left wall
+            self._add_obstacle(0, y, True)
+            # Right wall
+            self._add_obstacle(self.settings.GRID_WIDTH - 1, y, True)
+            
+    def _add_obstacle(self, x, y, is_wall=False):
+        obstacle = Obstacle(x, y, self.settings, is_wall)
+        self.obstacles.append(obstacle)
+        self.obstacle_chunks.add(obstacle, x, y)
+        self.grid.add(x, y, OBSTACLE)
+        
+    def spawn_food(self):
+        """Spawn food on a random free cell. Returns None if the board is full."""
+        position = self.food_cells.choice(self.rng)
+        if position is None:
+            return None
+            
+        # Determine what type of food to spawn
+        food_type = "apple"  # Default food type
+        
+        # Always make sure there's at least one apple
+        if not any(f.food_type == "apple" for f in self.foods):
+            food_type = "apple"
+        # Otherwise, apply spawn chances for special foods
+        elif self.rng.random() < self.settings.BONUS_FOOD_SPAWN_CHANCE:
+            food_type = "bonus"
+        elif self.rng.random() < self.settings.POWERUP_SPAWN_CHANCE:
+            food_type = "power"
+            
+        # Create and add the food
+        food = Food(self.settings, food_type, position, self.rng, self.time)
+        self.foods.append(food)
+        self.grid.add(food.position[0], food.position[1], FOOD)
+        self.events.append(("spawn", food))
+        return food
+        
+    def step(self, dt, action=None):
+        """Advance the game by dt milliseconds.
+        
+        action is an optional direction ("UP", "DOWN", "LEFT", "RIGHT") applied
+        before moving. Returns the list of events produced during this step.
+        """
+        self.events = []
+        if self.game_over:
+            return self.events
+            
+        if action is not None:
+            self.snake.change_direction(action)
+            
+        self.steps += 1
+        self.time += dt
+        
+        # Update time remaining for timed modes
+        if self.time_remaining is not None:
+            self.time_remaining = max(0, self.time_remaining - dt)
+            if self.time_remaining <= 0:
+                self.game_over = True
+                self.cause_of_death = "time"
+                
+        # Update power-up timers and check for expiration
+        for powerup_type, powerup_data in self.active_powerups.items():
+            if powerup_data['active'] and self.time >= powerup_data['end_time']:
+                powerup_data['active'] = False
+                
+                # Revert effects when power-up expires
+                if powerup_type == "speed":
+                    self.snake.speed = max(self.settings.INITIAL_SNAKE_SPEED, self.snake.speed - 5)
+                elif powerup_type == "slow":
+                    self.snake.speed = min(self.settings.MAX_SNAKE_SPEED, self.snake.speed + 3)
+                    
+        # Check if we should increase speed (for survival mode)
+        if self.mode_data.get('time_speed_increase', 0) > 0:
+            if self.time - self.last_speed_increase_time > 10000:  # 10 seconds
+                self.snake.increase_speed(self.mode_data['time_speed_increase'])
+                self.last_speed_increase_time = self.time
+                
+        # Move the snake and check for collisions at every cell it enters;
+        # a long step may cover several moves
+        moved = self.snake.step(dt)
+        while moved and not self.game_over:
+            self.ticks += 1
+            self._check_collisions()
+            moved = self.snake.step(0)
+            
+        # Remove expired foods
+        for food in self.foods[:]:
+            if not food.update(self.time):
+                self._remove_food(food)
+                
+        # Ensure there's always at least one food item
+        if not self.foods or not any(f.food_type == "apple" for f in self.foods):
+            self.spawn_food()
+            
+        return self.events
+        
+    def snapshot(self):
+        """Capture the whole game state, for restore() to rewind to later."""
+        return {
+            "mode": self.current_mode,
+            "seed": self.seed,
+            "rng": self.rng.getstate(),
+            "grid": self.grid.snapshot(),
+            "snake": self.snake.snapshot(),
+            # Foods and obstacles aren't changed once created, so they can be shared
+            "foods": list(self.foods),
+            "obstacles": list(self.obstacles),
+            "powerups": {name: dict(data) for name, data in self.active_powerups.items()},
+            "state": (self.score, self.high_score, self.time, self.steps, self.ticks,
+                      self.time_remaining, self.last_speed_increase_time,
+                      self.game_over, self.cause_of_death),
+        }
+        
+    def restore(self, snapshot):
+        """Return to a state captured by snapshot()."""
+        self.current_mode = snapshot["mode"]
+        self.mode_data = self.settings.GAME_MODES[self.current_mode]
+        self.seed = snapshot["seed"]
+        self.rng.setstate(snapshot["rng"])
+        self.snake.restore(snapshot["snake"])
+        self.grid.restore(snapshot["grid"])
+        self.foods[:] = snapshot["foods"]
+        self.obstacles[:] = snapshot["obstacles"]
+        self.obstacle_chunks.clear()
+        for obstacle in self.obstacles:
+            self.obstacle_chunks.add(obstacle, *obstacle.position)
+        self.obstacle_version += 1
+        for name, data in snapshot["powerups"].items():
+            self.active_powerups[name].update(data)
+        (self.score, self.high_score, self.time, self.steps, self.ticks,
+         self.time_remaining, self.last_speed_increase_time,
+         self.game_over, self.cause_of_death) = snapshot["state"]
+        self.events = []
+        
+    def checksum(self):
+        """CRC of the game state, to check that a replay re-simulates identically."""
+        snake = self.snake
+        state = repr((self.steps, self.ticks, self.score, self.time, self.game_over,
+                      snake.get_head_grid_position(), snake.length, snake.direction,
+                      snake.next_direction, snake.speed, snake.growth_pending,
+                      [(food.food_type, food.position) for food in self.foods]))
+        return zlib.crc32(self.grid.cells, zlib.crc32(state.encode()))
+        
+    def _remove_food(self, food):
+        self.foods.remove(food)
+        if not any(f.position == food.position for f in self.foods):
+            self.grid.remove(food.position[0], food.position[1], FOOD)
+            
+    def _check_collisions(self):
+        head_grid_pos = self.snake.get_head_grid_position()
+        head_cell = self.grid.get(*head_grid_pos)
+        
+        # First, check food collisions
+        food_eaten = None
+        if head_cell & FOOD:
+            for food in self.foods:
+                if head_grid_pos == food.position:
+                    food_eaten = food
+                    break
+                    
+        # If food was found to be eaten
+        if food_eaten:
+            self._handle_food_eaten(food_eaten)
+            self._remove_food(food_eaten)
+            
+            # Spawn new food if there are no apples left
+            if not any(f.food_type == "apple" for f in self.foods):
+                self.spawn_food()
+            return  # Skip other collision checks when food is eaten
+            
+        # Only check for fatal collisions if no food was eaten
+        # Check if snake collides with itself
+        if self.snake.check_collision_with_self():
+            if not self.active_powerups["ghost"]["active"]:
+                self._handle_game_over("self")
+            return
+            
+        # Check if snake collides with walls
+        if self.snake.check_collision_with_walls(self.mode_data.get('walls', False)):
+            if not self.active_powerups["ghost"]["active"]:
+                self._handle_game_over("wall")
+            return
+            
+        # Check if snake collides with obstacles
+        if head_cell & OBSTACLE:
+            if not self.active_powerups["ghost"]["active"]:
+                self._handle_game_over("obstacle")
+            return
+            
+    def _handle_food_eaten(self, food):
+        # Increase score
+        self.score += food.points
+        self.high_score = max(self.score, self.high_score)
+        
+        # Grow snake
+        growth_amount = food.points
+        self.snake.grow(growth_amount)
+        
+        # Increase snake speed based on mode and food type
+        if food.food_type == "apple" and self.mode_data.get('speed_increase', 0) > 0:
+            self.snake.increase_speed(self.mode_data['speed_increase'])
+        elif food.food_type == "bonus":
+            # Bonus food gives a small speed boost in all modes
+            self.snake.increase_speed(0.2)
+            
+        self.events.append(("eat", food))
+        
+        # Apply power-up effects
+        if food.food_type == "power":
+            self._apply_powerup(food.powerup_type)
+            
+        # Chance to spawn a new food item immediately (to have more food on screen)
+        if self.rng.random() < 0.3:  # 30% chance
+            self.spawn_food()
+            
+    def _apply_powerup(self, powerup_type):
+        duration = self.settings.POWERUP_DURATION
+        
+        # Mark power-up as active and set end time
+        self.active_powerups[powerup_type]["active"] = True
+        self.active_powerups[powerup_type]["end_time"] = self.time + duration
+        
+        # Apply power-up effect
+        if powerup_type == "speed":
+            # Speed boost
+            self.snake.increase_speed(5)
+        elif powerup_type == "slow":
+            # Slow down
+            self.snake.speed = max(self.settings.INITIAL_SNAKE_SPEED // 2, self.snake.speed - 3)
+        elif powerup_type == "shrink":
+            # Shrink snake to minimum size
+            self.snake.shrink(self.settings.INITIAL_SNAKE_LENGTH)
+        # Ghost mode is handled in collision detection
+        
+        self.events.append(("powerup", powerup_type))
+        
+    def _handle_game_over(self, cause):
+        self.game_over = True
+        self.cause_of_death = cause
+        self.events.append(("game_over", self.snake.get_head_grid_position()))
@@ -2,6 +2,8 @@ import pygame
 import math
 import numpy as np
 from src.particle import ParticleSystem
+from src.grid import OccupancyGrid, SNAKE
+from src.glow import draw_glow
 import random
 
 class SnakeSegment:
@@ -35,8 +37,10 @@ class SnakeSegment:
         return (self.x, self.y)
         
     def get_grid_position(self):
-        # Return the integer grid position for collision detection
-        return (int(round(self.x)), int(round(self.y)))
+        # Return the logical grid cell for collision detection. This is the
+        # movement target rather than the interpolated position, so the game
+        # rules don't depend on how often the segment is animated.
+        return (int(round(self.target_x)), int(round(self.target_y)))
         
     def get_pixel_position(self):
         # Convert grid coordinates to pixel coordinates
@@ -140,16 +144,138 @@ class SnakeSegment:
         pygame.draw.circle(screen, self.shadow_color, spot_pos, spot_radius)
 
 
-class Snake:
+class SegmentRenderer:
+    """Draws the snake's body from pre-rendered sprites in one blits() call.
+    
+    The body gradient is quantized into GRADIENT_STEPS colors computed once
+    (a lookup table), each with an outlined segment sprite and horizontal
+    and vertical connector sprites that are blitted halfway between
+    neighbouring segments in place of a thick line. Sprites are rebuilt
+    only when the snake colors, radius or cell size change.
+    """
+    GRADIENT_STEPS = 32
+    COLOR_KEY = (255, 0, 255)
+    
     def __init__(self, settings):
         self.settings = settings
-        self.segments = []
+        self.key = None
+        self.segment_sprites = None
+        self.connector_sprites = None
+        
+    def _surface(self, width, height):
+        surface = pygame.Surface((width, height))
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert()
+        return surface
+        
+    def _segment_sprite(self, radius, outline_color, fill_color):
+        extent = radius + 1
+        sprite = self._surface(extent * 2 + 1, extent * 2 + 1)
+        sprite.fill(self.COLOR_KEY)
+        sprite.set_colorkey(self.COLOR_KEY)
+        pygame.draw.circle(sprite, outline_color, (extent, extent), extent)
+        pygame.draw.circle(sprite, fill_color, (extent, extent), radius)
+        return sprite
+                
+    def _build_sprites(self):
+        key = (self.settings.SNAKE_BODY_COLOR, self.settings.SNAKE_OUTLINE_COLOR,
+               self.settings.SNAKE_BODY_RADIUS, self.settings.CELL_SIZE)
+        if key == self.key:
+            return
+        body_color, outline_color, radius, cell_size = key
+        
+        # Gradient lookup table: from the full body color behind the head
+        # to half brightness at the tail
+        self.gradient = []
+        for step in range(self.GRADIENT_STEPS):
+            color_shift = 1 - 0.5 * step / (self.GRADIENT_STEPS - 1)
+            self.gradient.append(tuple(int(c * color_shift) for c in body_color))
+            
+        # Connectors stand in for a line radius * 2 - 2 pixels wide spanning
+        # one cell; index 0 is horizontal and 1 vertical
+        self.segment_sprites = np.empty(self.GRADIENT_STEPS, dtype=object)
+        self.connector_sprites = np.empty((2, self.GRADIENT_STEPS), dtype=object)
+        for step, color in enumerate(self.gradient):
+            self.segment_sprites[step] = self._segment_sprite(radius, outline_color, color)
+            for orientation, size in enumerate([(cell_size, radius * 2 - 2),
+                                                (radius * 2 - 2, cell_size)]):
+                connector = self._surface(*size)
+                connector.fill(color)
+                self.connector_sprites[orientation, step] = connector
+        self.key = key
+        
+    def draw(self, screen, pixel_positions, length):
+        """Draw body segments 1.. of pixel_positions (the head is drawn separately)."""
+        if len(pixel_positions) < 2:
+            return
+        self._build_sprites()
+        
+        positions = np.asarray(pixel_positions, dtype=np.float32)
+        body = positions[1:]
+        count = len(body)
+        
+        # Gradient step of every segment, from its place along the body
+        steps = np.rint(np.minimum(np.arange(1, count + 1) / length, 1)
+                        * (self.GRADIENT_STEPS - 1)).astype(np.intp)
+                        
+        # Connectors run along the main axis between each segment and the
+        # one before it
+        offsets = np.abs(body - positions[:-1])
+        vertical = (offsets[:, 1] > offsets[:, 0]).astype(np.intp)
+        
+        # Each segment followed by its connector, as in the old per-segment
+        # circle and line drawing
+        radius = self.settings.SNAKE_BODY_RADIUS
+        half_cell = self.settings.CELL_SIZE // 2
+        sprites = np.empty((count, 2), dtype=object)
+        sprites[:, 0] = self.segment_sprites[steps]
+        sprites[:, 1] = self.connector_sprites[vertical, steps]
+        destinations = np.empty((count, 2, 2), dtype=np.int32)
+        destinations[:, 0] = body.astype(np.int32) - (radius + 1)
+        middle = ((body + positions[:-1]) / 2).astype(np.int32)
+        destinations[:, 1, 0] = middle[:, 0] - np.where(vertical, radius - 1, half_cell)
+        destinations[:, 1, 1] = middle[:, 1] - np.where(vertical, half_cell, radius - 1)
+        
+        # No connector across the screen where the body wraps around, and
+        # nothing for segments off screen
+        keep = np.ones((count, 2), dtype=bool)
+        keep[:, 1] = offsets.max(axis=1) <= self.settings.CELL_SIZE * 1.5
+        width, height = screen.get_size()
+        margin = radius + self.settings.CELL_SIZE
+        keep &= ((body[:, 0] > -margin) & (body[:, 0] < width + margin)
+                 & (body[:, 1] > -margin) & (body[:, 1] < height + margin))[:, None]
+                
+        screen.blits(zip(sprites[keep].tolist(), map(tuple, destinations[keep].tolist())),
+                     doreturn=False)
+
+
+class Snake:
+    # Ring buffer slots allocated up front (at most one per cell); the buffer
+    # doubles if the snake outgrows it
+    INITIAL_CAPACITY = 4096
+    
+    def __init__(self, settings, grid=None):
+        self.settings = settings
+        # Occupancy grid shared with the simulation (or private to this snake)
+        if grid is None:
+            grid = OccupancyGrid(settings.GRID_WIDTH, settings.GRID_HEIGHT)
+        self.grid = grid
+        
+        # Body cells live in a ring buffer: body[head_index] is the head and the
+        # previous length - 1 slots (wrapping around) hold the rest, tail last.
+        # Moving pushes a head and pops a tail without shifting anything.
+        self.body = []
+        self.head_index = 0
+        self.length = 0
+        self.last_tail = None  # Cell vacated by the last move, for interpolation
+        self.hit_self = False
         self.direction = "RIGHT"
         self.next_direction = "RIGHT"
         self.speed = settings.INITIAL_SNAKE_SPEED
         self.growth_pending = 0
         self.time_since_last_move = 0
         self.ate_food = False
+        self.growth_effect_pos = None  # Pixel position of the last growth burst
         self.eye_direction = "RIGHT"
         
         # Visual effects
@@ -157,27 +283,30 @@ class Snake:
         self.pulse_direction = 1
         self.particle_system = ParticleSystem(settings)
         self.trail_particles = []
-        
+        self.effects_rng = random.Random()  # Trail randomness (see seed_effects)
+        self.segment_renderer = SegmentRenderer(settings)
+                
         # Initialize snake
         self.reset()
         
     def reset(self):
         """Reset the snake to its initial state."""
         # Clear existing segments
-        self.segments = []
+        for x, y in self.get_segments_positions():
+            self.grid.remove_snake(x, y)
+        self.body = [None] * self._initial_capacity()
+        self.head_index = len(self.body) - 1
+        self.length = 0
+        self.last_tail = None
         
         # Calculate starting position
         start_x = self.settings.GRID_WIDTH // 4
         start_y = self.settings.GRID_HEIGHT // 2
         
-        # Create head segment
-        head = SnakeSegment(start_x, start_y, self.settings.SNAKE_HEAD_RADIUS, self.settings)
-        self.segments.append(head)
-        
-        # Create initial body segments
-        for i in range(1, self.settings.INITIAL_SNAKE_LENGTH):
-            segment = SnakeSegment(start_x - i, start_y, self.settings.SNAKE_BODY_RADIUS, self.settings)
-            self.segments.append(segment)
+        # Create the initial body from the tail up to the head
+        for i in range(self.settings.INITIAL_SNAKE_LENGTH - 1, -1, -1):
+            self._push_head((start_x - i, start_y))
+            self.grid.add_snake(start_x - i, start_y)
             
         # Reset other properties
         self.direction = "RIGHT"
@@ -186,77 +315,96 @@ class Snake:
         self.growth_pending = 0
         self.time_since_last_move = 0
         self.ate_food = False
+        self.growth_effect_pos = None
+        self.hit_self = False
         self.eye_direction = "RIGHT"
         self.trail_particles = []
         
-    def draw(self, screen):
-        """Draw the snake on the screen with enhanced visual effects."""
+    def seed_effects(self, seed):
+        """Clear and reseed the visual effects, so a replayed game's effects repeat exactly."""
+        self.particle_system.clear()
+        self.particle_system.seed((seed, 1))
+        self.effects_rng.seed(seed)
+        self.trail_particles = []
+        
+    def draw(self, screen, alpha=0.0, offset=(0, 0)):
+        """Draw the snake on the screen with enhanced visual effects.
+        
+        alpha is how far (0-1) rendering is into the next simulation tick, so
+        movement is interpolated smoothly at any frame rate. Everything is
+        shifted left and up by offset (the camera position in large worlds).
+        """
         # Draw trail particles first (behind snake)
         if self.settings.SNAKE_TRAIL_EFFECT:
             for particle in self.trail_particles:
-                alpha = int(255 * (particle['life'] / particle['max_life']))
-                color = (*particle['color'], alpha)
+                particle_alpha = int(255 * (particle['life'] / particle['max_life']))
+                color = (*particle['color'], particle_alpha)
                 pygame.draw.circle(screen, color, 
-                                 (int(particle['x']), int(particle['y'])), 
+                                 (int(particle['x'] - offset[0]), int(particle['y'] - offset[1])), 
                                  particle['size'])
         
-        # Draw each segment of the snake
-        for i, segment in enumerate(self.segments):
-            # Special effects for head
-            if i == 0:
-                # Get head position
-                x, y = segment.get_pixel_position()
-                
-                # Pulse effect for the head
-                pulse_amount = math.sin(self.pulse_effect * 3) * 2
-                radius = self.settings.SNAKE_HEAD_RADIUS + pulse_amount
-                
-                # Draw glow effect for the head if enabled
-                if self.settings.GLOW_EFFECTS_ENABLED:
-                    glow_surface = pygame.Surface((radius*3, radius*3), pygame.SRCALPHA)
-                    glow_radius = radius * 1.5
-                    glow_color = (*self.settings.SNAKE_HEAD_COLOR, 80)  # Semi-transparent
-                    pygame.draw.circle(glow_surface, glow_color, 
-                                    (glow_radius, glow_radius), glow_radius)
-                    screen.blit(glow_surface, 
-                               (x - glow_radius + radius, y - glow_radius + radius),
-                               special_flags=pygame.BLEND_ALPHA_SDL2)
-                
-                # Draw head with outline
-                pygame.draw.circle(screen, self.settings.SNAKE_OUTLINE_COLOR, (x, y), radius + 2)
-                pygame.draw.circle(screen, self.settings.SNAKE_HEAD_COLOR, (x, y), radius)
-                
-                # Draw eyes
-                if self.settings.SNAKE_EYES_ENABLED:
-                    self._draw_eyes(screen, x, y, radius)
-                    
-            # Draw body segments with slight gradient effect
-            else:
-                # Position
-                x, y = segment.get_pixel_position()
-                
-                # Color gradient based on position in body
-                color_shift = max(0, 1 - (i / len(self.segments)) * 0.5)
-                color = (
-                    int(self.settings.SNAKE_BODY_COLOR[0] * color_shift),
-                    int(self.settings.SNAKE_BODY_COLOR[1] * color_shift),
-                    int(self.settings.SNAKE_BODY_COLOR[2] * color_shift)
-                )
-                
-                # Draw body segment with outline
-                pygame.draw.circle(screen, self.settings.SNAKE_OUTLINE_COLOR, 
-                                (x, y), self.settings.SNAKE_BODY_RADIUS + 1)
-                pygame.draw.circle(screen, color, 
-                                (x, y), self.settings.SNAKE_BODY_RADIUS)
+        # Pixel centres of every segment on screen, interpolated between moves
+        pixel_positions = self.get_pixel_positions(alpha) - offset
+        
+        # Draw the head with its special effects
+        if len(pixel_positions):
+            x, y = pixel_positions[0].tolist()
+            
+            # Pulse effect for the head
+            pulse_amount = math.sin(self.pulse_effect * 3) * 2
+            radius = self.settings.SNAKE_HEAD_RADIUS + pulse_amount
+            
+            # Draw glow effect for the head if enabled
+            if self.settings.GLOW_EFFECTS_ENABLED:
+                # Semi-transparent, offset down and right of the head
+                glow_radius = radius * 1.5
+                draw_glow(screen, self.settings.SNAKE_HEAD_COLOR,
+                          (x + radius, y + radius), glow_radius, 80)
+            
+            # Draw head with outline
+            pygame.draw.circle(screen, self.settings.SNAKE_OUTLINE_COLOR, (x, y), radius + 2)
+            pygame.draw.circle(screen, self.settings.SNAKE_HEAD_COLOR, (x, y), radius)
+            
+            # Draw eyes
+            if self.settings.SNAKE_EYES_ENABLED:
+                self._draw_eyes(screen, x, y, radius)
                 
-                # Add connector between segments
-                if i > 0:
-                    prev_x, prev_y = self.segments[i-1].get_pixel_position()
-                    pygame.draw.line(screen, color, (prev_x, prev_y), (x, y), 
-                                    self.settings.SNAKE_BODY_RADIUS*2-2)
+        # Draw body segments with slight gradient effect
+        self.segment_renderer.draw(screen, pixel_positions, self.length)
         
         # Draw particle effects
-        self.particle_system.draw(screen)
+        self.particle_system.draw(screen, offset)
+        
+    def get_bounds(self, alpha=0.0, offset=(0, 0)):
+        """Screen rects that draw() touches, for dirty-rect rendering."""
+        rects = []
+        pixel_positions = (self.get_pixel_positions(alpha) - offset).tolist()
+                                   
+        if pixel_positions:
+            # The head glow extends up to 2.5 radii down and right of the centre
+            x, y = pixel_positions[0]
+            extent = int((self.settings.SNAKE_HEAD_RADIUS + 2) * 2.5) + 2
+            rects.append(pygame.Rect(x - extent, y - extent, extent * 2, extent * 2))
+            
+        # Each body segment together with the connector to the one before it
+        radius = self.settings.SNAKE_BODY_RADIUS + 2
+        for (prev_x, prev_y), (x, y) in zip(pixel_positions, pixel_positions[1:]):
+            left = min(prev_x, x) - radius
+            top = min(prev_y, y) - radius
+            rects.append(pygame.Rect(left, top, max(prev_x, x) + radius - left,
+                                     max(prev_y, y) + radius - top))
+                                     
+        if self.settings.SNAKE_TRAIL_EFFECT and self.trail_particles:
+            left = min(p['x'] - p['size'] for p in self.trail_particles) - 1
+            top = min(p['y'] - p['size'] for p in self.trail_particles) - 1
+            right = max(p['x'] + p['size'] for p in self.trail_particles) + 2
+            bottom = max(p['y'] + p['size'] for p in self.trail_particles) + 2
+            rects.append(pygame.Rect(left - offset[0], top - offset[1], right - left, bottom - top))
+            
+        particle_bounds = self.particle_system.get_bounds(offset)
+        if particle_bounds is not None:
+            rects.append(particle_bounds)
+        return rects
         
     def _draw_eyes(self, screen, x, y, radius):
         """Draw the snake's eyes based on direction."""
@@ -298,6 +446,7 @@ class Snake:
                           pupil_radius)
                 
     def update(self, dt, food_positions=None):
+        """Update animations and particle effects. Movement happens in step()."""
         # Update eye direction if food is present
         if food_positions and len(food_positions) > 0:
             closest_food = min(food_positions, key=lambda food: self._distance_to_food(food))
@@ -312,6 +461,12 @@ class Snake:
             self.pulse_effect = 0.0
             self.pulse_direction = 1
             
+        # Burst of particles where the snake last grew
+        if self.growth_effect_pos is not None:
+            pixel_x, pixel_y = self.growth_effect_pos
+            self.particle_system.create_particles(pixel_x, pixel_y, self.settings.PARTICLE_COUNT)
+            self.growth_effect_pos = None
+            
         # Update particle effects
         self.particle_system.update()
         
@@ -324,38 +479,32 @@ class Snake:
                     self.trail_particles.remove(particle)
                     
             # Add new trail particles behind the snake
-            if len(self.segments) > 0 and random.random() < 0.3:
-                tail = self.segments[-1]
-                x, y = tail.get_pixel_position()
+            rng = self.effects_rng
+            if self.length > 0 and rng.random() < 0.3:
+                tail_x, tail_y = self.get_segment_position(self.length - 1)
+                x = tail_x * self.settings.CELL_SIZE + self.settings.CELL_SIZE // 2
+                y = tail_y * self.settings.CELL_SIZE + self.settings.CELL_SIZE // 2
                 self.trail_particles.append({
-                    'x': x + random.uniform(-3, 3),
-                    'y': y + random.uniform(-3, 3),
-                    'size': random.uniform(2, 5),
+                    'x': x + rng.uniform(-3, 3),
+                    'y': y + rng.uniform(-3, 3),
+                    'size': rng.uniform(2, 5),
                     'color': self.settings.SNAKE_BODY_COLOR,
                     'life': 1.0,
                     'max_life': 1.0
                 })
-            
-        # Update all segments
-        for segment in self.segments:
-            segment.update(dt)
-            
-        # Move snake based on speed
+                
+    def step(self, dt):
+        """Advance movement timing by dt milliseconds. Return True if the snake moved."""
         self.time_since_last_move += dt
         move_interval = 1000 / self.speed  # Convert speed (moves per second) to milliseconds
         
         if self.time_since_last_move >= move_interval:
-            self.time_since_last_move = 0
+            # Keep the remainder so the move rate doesn't depend on the step size
+            self.time_since_last_move -= move_interval
             self._move()
+            return True
             
-            # Add particles when snake moves
-            if self.ate_food and random.random() < 0.8:
-                head_x, head_y = self.segments[0].get_pixel_position()
-                self.particle_system.create_particles(
-                    head_x, head_y, 
-                    int(5 * self.settings.PARTICLE_DENSITY)
-                )
-                self.ate_food = False
+        return False
             
     def _distance_to_food(self, food):
         head_x, head_y = self.get_head_position()
@@ -400,7 +549,7 @@ class Snake:
         self.direction = self.next_direction
         
         # Get head position
-        head_x, head_y = self.segments[0].get_position()
+        head_x, head_y = self.body[self.head_index]
         
         # Calculate new head position based on direction
         if self.direction == "UP":
@@ -416,70 +565,160 @@ class Snake:
             new_head_x = head_x + 1
             new_head_y = head_y
             
-        # If growth pending, add new segment
+        # Handle screen wrapping immediately for smoother animation when crossing borders
+        if not self.settings.GAME_MODES.get(self.direction, {}).get('walls', False):
+            # Check if head is outside grid and wrap around
+            if new_head_x < 0:
+                new_head_x = self.settings.GRID_WIDTH - 1
+            elif new_head_x >= self.settings.GRID_WIDTH:
+                new_head_x = 0
+                
+            if new_head_y < 0:
+                new_head_y = self.settings.GRID_HEIGHT - 1
+            elif new_head_y >= self.settings.GRID_HEIGHT:
+                new_head_y = 0
+                
+        # If growth pending, keep the tail; otherwise vacate the tail cell
+        # first so the head may follow the tail into it
         if self.growth_pending > 0:
-            # Create a new head with the same position as the current head
-            new_head = SnakeSegment(head_x, head_y, self.settings.SNAKE_HEAD_RADIUS, self.settings)
-            # Set the new target position
-            new_head.set_target(new_head_x, new_head_y)
-            
-            # Make old head a body segment
-            self.segments[0].radius = self.settings.SNAKE_BODY_RADIUS
-            
-            # Add new head to the beginning of the list
-            self.segments.insert(0, new_head)
+            self.last_tail = None
             
             # Decrease growth counter
             self.growth_pending -= 1
             
-            # Create particle effect at head position when growing
+            # Remember where to show the growth particles when rendering
             if self.ate_food:
                 pixel_x = head_x * self.settings.CELL_SIZE + self.settings.CELL_SIZE // 2
                 pixel_y = head_y * self.settings.CELL_SIZE + self.settings.CELL_SIZE // 2
-                self.particle_system.create_particles(pixel_x, pixel_y, self.settings.PARTICLE_COUNT)
+                self.growth_effect_pos = (pixel_x, pixel_y)
                 self.ate_food = False
         else:
-            # Move segments from tail to head
-            for i in range(len(self.segments) - 1, 0, -1):
-                prev_x, prev_y = self.segments[i-1].get_position()
-                self.segments[i].set_target(prev_x, prev_y)
-                
-            # Move head to new position
-            self.segments[0].set_target(new_head_x, new_head_y)
+            self.last_tail = self._pop_tail()
+            self.grid.remove_snake(*self.last_tail)
             
-        # Handle screen wrapping immediately for smoother animation when crossing borders
-        if not self.settings.GAME_MODES.get(self.direction, {}).get('walls', False):
-            # Check if head is outside grid and wrap around
-            head = self.segments[0]
-            if head.target_x < 0:
-                head.set_target(self.settings.GRID_WIDTH - 1, head.target_y)
-            elif head.target_x >= self.settings.GRID_WIDTH:
-                head.set_target(0, head.target_y)
-                
-            if head.target_y < 0:
-                head.set_target(head.target_x, self.settings.GRID_HEIGHT - 1)
-            elif head.target_y >= self.settings.GRID_HEIGHT:
-                head.set_target(head.target_x, 0)
-
-    def check_collision_with_self(self):
-        # Don't check collision with self if snake is too short
-        if len(self.segments) <= 3:
-            return False
+        # Self collision is a single lookup in the occupancy grid
+        self.hit_self = self.grid.has(new_head_x, new_head_y, SNAKE)
+        self.grid.add_snake(new_head_x, new_head_y)
+        self._push_head((new_head_x, new_head_y))
+        
+    def _initial_capacity(self):
+        return min(self.settings.GRID_WIDTH * self.settings.GRID_HEIGHT, self.INITIAL_CAPACITY)
+        
+    def _push_head(self, position):
+        if self.length == len(self.body):
+            # The snake outgrew the buffer (a long snake in a large world, or
+            # ghosting over the body on a full board)
+            positions = self.get_segments_positions()
+            positions.reverse()
+            self.body = positions + [None] * len(positions)
+            self.head_index = len(positions) - 1
+        self.head_index = (self.head_index + 1) % len(self.body)
+        self.body[self.head_index] = position
+        self.length += 1
+        
+    def _pop_tail(self):
+        tail_index = (self.head_index - self.length + 1) % len(self.body)
+        position = self.body[tail_index]
+        self.body[tail_index] = None
+        self.length -= 1
+        return position
+        
+    def shrink(self, length):
+        """Cut the snake down to the given number of segments."""
+        while self.length > length:
+            x, y = self._pop_tail()
+            self.grid.remove_snake(x, y)
+        self.last_tail = None
+        
+    def set_body(self, cells):
+        """Replace the body with the given grid cells, head first."""
+        for x, y in self.get_segments_positions():
+            self.grid.remove_snake(x, y)
+        self.body = [None] * max(len(cells), self._initial_capacity())
+        self.head_index = len(self.body) - 1
+        self.length = 0
+        for x, y in reversed(cells):
+            self._push_head((x, y))
+            self.grid.add_snake(x, y)
+            
+        self.last_tail = None
+        self.hit_self = False
+        self.growth_pending = 0
+        self.time_since_last_move = 0
         
-        head_x, head_y = self.get_head_position()
-        head_grid_pos = self.get_head_grid_position()
+    def snapshot(self):
+        """Capture the movement state, for restore(). The grid is saved separately."""
+        return (self.get_segments_positions(), self.direction, self.next_direction, self.speed,
+                self.growth_pending, self.time_since_last_move, self.ate_food, self.hit_self,
+                self.last_tail, self.growth_effect_pos)
+                
+    def restore(self, snapshot):
+        (cells, self.direction, self.next_direction, self.speed, self.growth_pending,
+         self.time_since_last_move, self.ate_food, self.hit_self, self.last_tail,
+         self.growth_effect_pos) = snapshot
+        self.body = list(reversed(cells))
+        self.body += [None] * max(len(cells), self._initial_capacity() - len(cells))
+        self.head_index = len(cells) - 1
+        self.length = len(cells)
+        self.trail_particles = []
         
-        # Check if head collides with any body segment (skip first few segments to prevent false collisions)
-        for segment in self.segments[3:]:  # Skip first 3 segments (head + 2 neck segments)
-            segment_grid_pos = segment.get_grid_position()
-            # Use grid positions for more accurate collision detection
-            if head_grid_pos == segment_grid_pos:
-                return True
+    def get_segment_position(self, index):
+        """Grid cell of a segment, counting from the head (0)."""
+        return self.body[(self.head_index - index) % len(self.body)]
+        
+    def get_render_positions(self, extra_time=0):
+        """Interpolated grid coordinates of every segment, head first.
+        
+        Returns an (length, 2) float array. Each segment glides from the cell
+        the segment behind it now occupies (where it was before the last move)
+        towards its own cell. This is the only per-segment interpolation state
+        and it's only built for drawing. extra_time is render time (ms) past
+        the last simulation tick.
+        """
+        positions = np.array(self.get_segments_positions(), dtype=np.float32).reshape(-1, 2)
+        
+        # Same easing as a 0.6 lerp per frame at 60 FPS, but driven by time
+        elapsed = self.time_since_last_move + extra_time
+        progress = 1 - 0.4 ** (elapsed * 60 / 1000)
+        if progress >= 0.999 or not len(positions):
+            return positions
             
-        return False
+        previous = np.empty_like(positions)
+        previous[:-1] = positions[1:]
+        previous[-1] = self.last_tail if self.last_tail is not None else positions[-1]
+        delta = positions - previous
+        
+        # Segments that wrapped around the border don't slide across the screen
+        delta[(np.abs(delta) > 1).any(axis=1)] = 0
+        return positions - delta * (1 - progress)
+        
+    def get_pixel_positions(self, alpha=0.0):
+        """Interpolated pixel centres of every segment, head first.
+        
+        alpha is how far (0-1) rendering is into the next simulation tick.
+        """
+        cell_size = self.settings.CELL_SIZE
+        render_positions = self.get_render_positions(alpha * 1000 / self.settings.TICK_RATE)
+        return render_positions * cell_size + cell_size // 2
+                
+    @property
+    def segments(self):
+        """SnakeSegment views of the body for rendering, head first."""
+        segments = []
+        cells = self.get_segments_positions()
+        for i, (x, y) in enumerate(self.get_render_positions()):
+            radius = self.settings.SNAKE_HEAD_RADIUS if i == 0 else self.settings.SNAKE_BODY_RADIUS
+            segment = SnakeSegment(x, y, radius, self.settings)
+            segment.set_target(*cells[i])
+            segments.append(segment)
+        return segments
+        
+    def check_collision_with_self(self):
+        # The head's new cell was looked up in the occupancy grid during the last move
+        return self.hit_self
         
     def check_collision_with_walls(self, walls=True):
-        head_x, head_y = self.get_head_position()
+        head_x, head_y = self.get_head_grid_position()
         
         if walls:
             # Check if head is outside the grid
@@ -489,20 +728,24 @@ class Snake:
         else:
             # Wrap around the screen
             if head_x < 0:
-                self.segments[0].target_x = self.settings.GRID_WIDTH - 1
+                head_x = self.settings.GRID_WIDTH - 1
             elif head_x >= self.settings.GRID_WIDTH:
-                self.segments[0].target_x = 0
+                head_x = 0
                 
             if head_y < 0:
-                self.segments[0].target_y = self.settings.GRID_HEIGHT - 1
+                head_y = self.settings.GRID_HEIGHT - 1
             elif head_y >= self.settings.GRID_HEIGHT:
-                self.segments[0].target_y = 0
+                head_y = 0
+                
+            if (head_x, head_y) != self.body[self.head_index]:
+                self.grid.remove_snake(*self.body[self.head_index])
+                self.grid.add_snake(head_x, head_y)
+                self.body[self.head_index] = (head_x, head_y)
                 
         return False
         
     def check_collision_with_obstacles(self, obstacles):
-        head_x, head_y = self.get_head_position()
-        head_grid_pos = (int(round(head_x)), int(round(head_y)))
+        head_grid_pos = self.get_head_grid_position()
         
         for obstacle in obstacles:
             if obstacle.position == head_grid_pos:
@@ -511,10 +754,19 @@ class Snake:
         return False
         
     def get_head_position(self):
-        return self.segments[0].get_position()
+        return self.body[self.head_index]
         
     def get_head_grid_position(self):
-        return self.segments[0].get_grid_position()
+        return self.body[self.head_index]
         
     def get_segments_positions(self):
-        return [segment.get_grid_position() for segment in self.segments]
\ No newline at end of file
+        """Grid cells of the whole body, head first."""
+        if not self.length:
+            return []
+        start = self.head_index - self.length + 1
+        if start >= 0:
+            positions = self.body[start:self.head_index + 1]
+        else:
+            positions = self.body[start:] + self.body[:self.head_index + 1]
+        positions.reverse()
+        return positions
\ No newline at end of file
@@ -0,0 +1,84 @@
+import pygame
+import math
+import numpy as np
+
+class StarField:
+    """Twinkling, drifting background stars stored as NumPy arrays.
+    
+    Every star is updated with a few vectorized operations per frame and
+    drawn from a table of pre-rendered sprites (quantized by size and
+    brightness) in a single blits() call whose arguments are built without
+    a per-star Python loop, so the star count can be scaled to thousands
+    for large displays.
+    """
+    SIZE_STEP = 0.25  # Sprite radius resolution in pixels
+    BRIGHTNESS_LEVELS = 32
+    
+    def __init__(self, width, height, count=100, color=(255, 255, 255)):
+        self.width = width
+        self.height = height
+        self.color = color
+        self.rng = np.random.default_rng()
+        
+        # Star attributes
+        self.x = self.rng.integers(0, width, count, endpoint=True).astype(np.float32)
+        self.y = self.rng.integers(0, height, count, endpoint=True).astype(np.float32)
+        self.size = self.rng.uniform(0.5, 2.5, count).astype(np.float32)
+        self.speed = self.rng.uniform(0.1, 0.5, count).astype(np.float32)
+        self.brightness = self.rng.uniform(0.3, 1.0, count).astype(np.float32)
+        
+        # Sprites indexed by size_bucket * BRIGHTNESS_LEVELS + level, so
+        # fancy indexing picks every star's sprite at once
+        max_bucket = int(round(2.5 / self.SIZE_STEP))
+        self.sprite_table = np.empty((max_bucket + 1) * self.BRIGHTNESS_LEVELS, dtype=object)
+        for size_bucket in range(1, max_bucket + 1):
+            for level in range(self.BRIGHTNESS_LEVELS):
+                self.sprite_table[size_bucket * self.BRIGHTNESS_LEVELS + level] = \
+                    self._render_sprite(size_bucket, level)
+        
+    def __len__(self):
+        return len(self.x)
+        
+    def update(self):
+        """Advance the twinkle and drift animation by one frame."""
+        count = len(self.x)
+        
+        # Make stars twinkle
+        self.brightness += self.rng.uniform(-0.05, 0.05, count).astype(np.float32)
+        np.clip(self.brightness, 0.3, 1.0, out=self.brightness)
+        
+        # Move stars slowly downward; ones that leave the bottom restart at
+        # the top in a new column
+        self.y += self.speed
+        wrapped = self.y > self.height
+        wrapped_count = int(np.count_nonzero(wrapped))
+        if wrapped_count:
+            self.y[wrapped] = 0
+            self.x[wrapped] = self.rng.integers(0, self.width, wrapped_count, endpoint=True)
+            
+    def _render_sprite(self, size_bucket, level):
+        radius = size_bucket * self.SIZE_STEP
+        extent = math.ceil(radius)
+        brightness = level / (self.BRIGHTNESS_LEVELS - 1)
+        color = tuple(int(c * brightness) for c in self.color)
+        
+        # Stars are opaque, so a color key is enough (and blits faster than
+        # per-pixel alpha)
+        sprite = pygame.Surface((extent * 2 + 1, extent * 2 + 1))
+        sprite.set_colorkey((0, 0, 0))
+        pygame.draw.circle(sprite, color, (extent, extent), radius)
+        return sprite
+                
+    def draw(self, screen):
+        if not len(self.x):
+            return
+            
+        # Quantize every star at once
+        size_buckets = np.maximum(np.rint(self.size / self.SIZE_STEP), 1).astype(np.int32)
+        levels = np.rint(self.brightness * (self.BRIGHTNESS_LEVELS - 1)).astype(np.int32)
+        extents = np.ceil(size_buckets * self.SIZE_STEP).astype(np.int32)
+        left = self.x.astype(np.int32) - extents
+        top = self.y.astype(np.int32) - extents
+        sprites = self.sprite_table[size_buckets * self.BRIGHTNESS_LEVELS + levels]
+        
+        screen.blits(zip(sprites.tolist(), zip(left.tolist(), top.tolist())), doreturn=False)
\ No newline at end of file
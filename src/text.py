@@ -0,0 +1,59 @@
+import pygame
+from collections import OrderedDict
+
+# Fonts are expensive to construct, so each size is created only once
+_fonts = {}
+
+def get_font(size):
+    """Return the shared default font at the given size."""
+    font = _fonts.get(size)
+    if font is None:
+        font = pygame.font.Font(None, size)
+        _fonts[size] = font
+    return font
+
+
+class TextCache:
+    """LRU cache of rendered text surfaces keyed by (text, size, color).
+    
+    Labels that don't change between frames ("Score: 12", "Mode: Classic")
+    are rendered once and re-blitted. The least recently used surfaces are
+    dropped once their total pixel memory exceeds budget bytes. Returned
+    surfaces are shared, so callers must not draw onto them.
+    """
+    def __init__(self, budget=4 * 1024 * 1024):
+        self.budget = budget
+        self.used = 0
+        self.surfaces = OrderedDict()
+        
+    def render(self, text, size, color):
+        key = (text, size, tuple(color))
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            return surface
+            
+        surface = get_font(size).render(text, True, color)
+        self.surfaces[key] = surface
+        self.used += self._surface_bytes(surface)
+        
+        # Evict least recently used surfaces until we're back under budget
+        while self.used > self.budget and len(self.surfaces) > 1:
+            _, evicted = self.surfaces.popitem(last=False)
+            self.used -= self._surface_bytes(evicted)
+        return surface
+        
+    def clear(self):
+        self.surfaces.clear()
+        self.used = 0
+        
+    @staticmethod
+    def _surface_bytes(surface):
+        return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+
+text_cache = TextCache()
+
+def render_text(text, size, color):
+    """Render text with the shared font registry and LRU cache."""
+    return text_cache.render(text, size, color)
@@ -0,0 +1,92 @@
+from collections import OrderedDict
+import pygame
+from src.grid import CHUNK_SIZE
+
+class ChunkMap:
+    """Objects bucketed by the CHUNK_SIZE x CHUNK_SIZE chunk of cells they're in.
+    
+    Only chunks holding something take any memory, and the objects in a
+    region are found by looking at the chunks it overlaps, however big the
+    world is and however much else is in it.
+    """
+    def __init__(self):
+        self.chunks = {}
+        
+    def clear(self):
+        self.chunks.clear()
+        
+    def add(self, item, x, y):
+        self.chunks.setdefault((x // CHUNK_SIZE, y // CHUNK_SIZE), []).append(item)
+        
+    def get(self, chunk_x, chunk_y):
+        """Objects in one chunk."""
+        return self.chunks.get((chunk_x, chunk_y), ())
+        
+    def query(self, left, top, right, bottom):
+        """Objects in the chunks overlapping cells left..right-1, top..bottom-1."""
+        for chunk_y in range(top // CHUNK_SIZE, (bottom - 1) // CHUNK_SIZE + 1):
+            for chunk_x in range(left // CHUNK_SIZE, (right - 1) // CHUNK_SIZE + 1):
+                yield from self.chunks.get((chunk_x, chunk_y), ())
+
+
+class ChunkLayers:
+    """Pre-rendered background of each chunk: floor, grid lines, walls and obstacles.
+    
+    A chunk is rendered the first time it comes into view and kept until
+    MAX_CHUNKS others have been drawn since, so drawing the background is a
+    few blits a frame however big the world is. Everything is thrown away
+    when the key passed to draw() changes (a new game, or new colors).
+    """
+    MAX_CHUNKS = 48
+    
+    def __init__(self, settings):
+        self.settings = settings
+        self.layers = OrderedDict()
+        self.key = None
+        
+    def draw(self, surface, camera, obstacle_chunks, key):
+        """Draw the chunks in the camera's view onto surface."""
+        if key != self.key:
+            self.layers.clear()
+            self.key = key
+        chunk_pixels = CHUNK_SIZE * self.settings.CELL_SIZE
+        left, top, right, bottom = camera.visible_cells()
+        blits = []
+        for chunk_y in range(top // CHUNK_SIZE, (bottom - 1) // CHUNK_SIZE + 1):
+            for chunk_x in range(left // CHUNK_SIZE, (right - 1) // CHUNK_SIZE + 1):
+                chunk = (chunk_x, chunk_y)
+                layer = self.layers.get(chunk)
+                if layer is None:
+                    layer = self._render(chunk_x, chunk_y, obstacle_chunks.get(chunk_x, chunk_y))
+                    self.layers[chunk] = layer
+                    if len(self.layers) > self.MAX_CHUNKS:
+                        self.layers.popitem(last=False)
+                else:
+                    self.layers.move_to_end(chunk)
+                blits.append((layer, (chunk_x * chunk_pixels - camera.x,
+                                      chunk_y * chunk_pixels - camera.y)))
+        surface.blits(blits, doreturn=False)
+        
+    def _render(self, chunk_x, chunk_y, obstacles):
+        settings = self.settings
+        cell_size = settings.CELL_SIZE
+        
+        # Chunks on the far edges of the world may be cut short
+        columns = min(CHUNK_SIZE, settings.GRID_WIDTH - chunk_x * CHUNK_SIZE)
+        rows = min(CHUNK_SIZE, settings.GRID_HEIGHT - chunk_y * CHUNK_SIZE)
+        width, height = columns * cell_size, rows * cell_size
+        layer = pygame.Surface((width, height))
+        if pygame.display.get_surface() is not None:
+            layer = layer.convert()
+        layer.fill(settings.BG_COLOR)
+        
+        # Subtle grid pattern
+        for x in range(0, width, cell_size):
+            pygame.draw.line(layer, settings.GRID_COLOR, (x, 0), (x, height), 1)
+        for y in range(0, height, cell_size):
+            pygame.draw.line(layer, settings.GRID_COLOR, (0, y), (width, y), 1)
+            
+        origin = (chunk_x * CHUNK_SIZE * cell_size, chunk_y * CHUNK_SIZE * cell_size)
+        for obstacle in obstacles:
+            obstacle.draw(layer, origin)
+        return layer
\ No newline at end of file
@@ -0,0 +1,30 @@
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from src.settings import Settings
+from src.batch import BatchSimulation
+from src.simulation import DIRECTION_CODES
+from src.env import SnakeEnv
+
+def test_episode_matches_simulation():
+    # Head straight up into the wall; neither game eats on the way
+    settings = Settings()
+    up = DIRECTION_CODES["UP"]
+    
+    env = SnakeEnv(settings, mode="survival", seed=0)
+    env.reset()
+    terminated = False
+    while not terminated:
+        _, _, terminated, _, info = env.step(up)
+        
+    batch = BatchSimulation(settings, 1, mode="survival", seed=0, auto_reset=False)
+    batch.reset()
+    done = [False]
+    while not done[0]:
+        _, done = batch.step([up])
+        
+    assert info["score"] == batch.episode_score[0] == 0
+    assert info["cause"] == "obstacle"
+    assert info["length"] == batch.episode_length[0] == settings.INITIAL_SNAKE_LENGTH
+    assert info["moves"] == batch.episode_steps[0]
@@ -0,0 +1,101 @@
+import random
+from src.grid import OccupancyGrid, FreeCellIndex, ChunkedFreeCellIndex, SNAKE, OBSTACLE, FOOD, LARGE_GRID_CELLS
+
+def scramble(grid, rng, moves, area=None):
+    """Add and remove random tags (snake cells reference counted) all over the grid."""
+    left, top, right, bottom = area or (0, 0, grid.width, grid.height)
+    for _ in range(moves):
+        x, y = rng.randrange(left, right), rng.randrange(top, bottom)
+        kind = rng.randrange(4)
+        if kind == 0:
+            grid.add_snake(x, y)
+        elif kind == 1:
+            grid.remove_snake(x, y)
+        elif kind == 2:
+            grid.add(x, y, rng.choice([OBSTACLE, FOOD]))
+        else:
+            grid.remove(x, y, rng.choice([OBSTACLE, FOOD]))
+            
+def expected_free(grid, margin):
+    return {(x, y) for y in range(margin, grid.height - margin)
+            for x in range(margin, grid.width - margin) if not grid.cells[y * grid.width + x]}
+            
+def check_free_index(free_index, grid, margin):
+    expected = expected_free(grid, margin)
+    assert len(free_index) == len(expected)
+    if isinstance(free_index, FreeCellIndex):
+        assert {(i % grid.width, i // grid.width) for i in free_index.free} == expected
+        assert all(free_index.slots[index] == slot for slot, index in enumerate(free_index.free))
+    else:
+        # Per-chunk counts match a fresh count of the grid
+        assert list(free_index.counts) == list(ChunkedFreeCellIndex(grid, margin).counts)
+        
+def test_snake_cells_are_reference_counted():
+    grid = OccupancyGrid(10, 10)
+    grid.add_snake(3, 4)
+    grid.add_snake(3, 4)  # Ghosting over the body
+    grid.add(3, 4, OBSTACLE)
+    grid.remove_snake(3, 4)
+    assert grid.get(3, 4) == SNAKE | OBSTACLE
+    grid.remove_snake(3, 4)
+    assert grid.get(3, 4) == OBSTACLE
+    grid.remove_snake(3, 4)  # Removing more than was added leaves the count at zero
+    grid.add_snake(3, 4)
+    grid.remove_snake(3, 4)
+    assert not grid.has(3, 4, SNAKE)
+    assert grid.get(-1, 4) == 0 and grid.get(10, 0) == 0
+    
+def test_free_cells_follow_grid_changes():
+    rng = random.Random(0)
+    grid = OccupancyGrid(20, 15)
+    indices = [(grid.free_cells(margin), margin) for margin in (0, 1, 2)]
+    for _ in range(20):
+        scramble(grid, rng, 200)
+        for free_index, margin in indices:
+            check_free_index(free_index, grid, margin)
+            position = free_index.choice(rng)
+            assert position in expected_free(grid, margin) and position in free_index
+            
+def test_free_cells_snapshot_and_restore():
+    rng = random.Random(1)
+    grid = OccupancyGrid(20, 15)
+    free_index = grid.free_cells(1)
+    scramble(grid, rng, 500)
+    snapshot = grid.snapshot()
+    cells = bytes(grid.cells)
+    picks = [free_index.choice(random.Random(2)) for _ in range(5)]
+    scramble(grid, rng, 500)
+    grid.restore(snapshot)
+    assert bytes(grid.cells) == cells
+    check_free_index(free_index, grid, 1)
+    
+    # The free list order is restored too, so seeded picks repeat
+    assert [free_index.choice(random.Random(2)) for _ in range(5)] == picks
+    grid.clear()
+    assert len(free_index) == 18 * 13
+    
+def test_chunked_free_cells():
+    rng = random.Random(3)
+    grid = OccupancyGrid(300, 250)
+    assert grid.width * grid.height > LARGE_GRID_CELLS
+    free_index = grid.free_cells(1)
+    assert isinstance(free_index, ChunkedFreeCellIndex)
+    
+    # Crowd one corner so choice() has to fall back to walking the chunks
+    scramble(grid, rng, 20000, (0, 0, 40, 40))
+    check_free_index(free_index, grid, 1)
+    snapshot = grid.snapshot()
+    for y in range(grid.height):
+        for x in range(grid.width):
+            if (x, y) != (10, 10):
+                grid.add(x, y, OBSTACLE)
+    grid.remove(10, 10, OBSTACLE)
+    grid.remove_snake(10, 10)
+    grid.remove(10, 10, FOOD)
+    assert len(free_index) == 1
+    assert free_index.choice(rng) == (10, 10)
+    assert (10, 10) in free_index and (11, 10) not in free_index
+    
+    grid.restore(snapshot)
+    check_free_index(free_index, grid, 1)
+    assert free_index.choice(rng) in free_index
@@ -0,0 +1,41 @@
+import numpy as np
+from src.settings import Settings
+from src.particle import ParticleSystem
+
+def test_pool_compacts_dead_particles():
+    settings = Settings()
+    system = ParticleSystem(settings, capacity=64, seed=0)
+    system.create_particles(0, 0, 10)
+    for _ in range(15):
+        system.update()
+    system.create_particles(500, 500, 10, (1, 2, 3))
+    assert len(system) == 20
+    
+    # The first burst dies after PARTICLE_LIFETIME updates and is dropped
+    for _ in range(settings.PARTICLE_LIFETIME + 1 - 15):
+        system.update()
+    assert len(system) == 10
+    n = system.count
+    assert np.all(system.lifetime[:n] > 0)
+    assert np.all(np.abs(system.x[:n] - 500) < 100) and np.all(np.abs(system.y[:n] - 500) < 100)
+    assert all(system.colors[i] == (1, 2, 3) for i in system.color_index[:n])
+    
+    for _ in range(settings.PARTICLE_LIFETIME):
+        system.update()
+    assert len(system) == 0 and system.get_bounds() is None
+    
+def test_bursts_are_truncated_to_capacity():
+    system = ParticleSystem(Settings(), capacity=64, seed=0)
+    system.create_particles(0, 0, 50)
+    system.create_particles(0, 0, 50)
+    assert len(system) == 64
+    system.create_particles(0, 0, 5)
+    assert len(system) == 64
+    
+def test_seeded_systems_repeat():
+    a, b = (ParticleSystem(Settings(), capacity=64, seed=5) for _ in range(2))
+    for system in (a, b):
+        system.create_particles(100, 100, 30)
+        system.update()
+    assert np.array_equal(a.x[:a.count], b.x[:b.count])
+    assert np.array_equal(a.color_index[:a.count], b.color_index[:b.count])
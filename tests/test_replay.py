@@ -0,0 +1,61 @@
+import random
+from src.settings import Settings
+from src.simulation import Simulation, DIRECTIONS
+from src.replay import Replay, ReplayPlayer, play_headless
+
+def record_game(settings, mode="classic", seed=7, max_steps=3000):
+    simulation = Simulation(settings, mode, seed)
+    replay = Replay.for_simulation(simulation, settings.TICK_RATE, settings.REPLAY_CHECKSUM_INTERVAL)
+    rng = random.Random(seed)
+    dt = 1000 / settings.TICK_RATE
+    while not simulation.game_over and simulation.steps < max_steps:
+        if rng.random() < 0.05:
+            direction = rng.choice(DIRECTIONS)
+            replay.record_input(simulation.steps, direction)
+            simulation.snake.change_direction(direction)
+        simulation.step(dt)
+        replay.record_step(simulation)
+    replay.finish(simulation)
+    return replay, simulation.checksum()
+    
+def test_save_and_load(tmp_path):
+    settings = Settings()
+    replay, _ = record_game(settings)
+    path = tmp_path / "game.snkr"
+    replay.save(path)
+    loaded = Replay.load(path)
+    assert (loaded.seed, loaded.mode, loaded.tick_rate, loaded.grid_size) == (
+        replay.seed, replay.mode, replay.tick_rate, replay.grid_size)
+    assert loaded.inputs == replay.inputs
+    assert loaded.checksums == replay.checksums
+    assert (loaded.end_step, loaded.score) == (replay.end_step, replay.score)
+    assert loaded.to_bytes() == replay.to_bytes()
+    
+def test_headless_playback_matches_recording(tmp_path):
+    settings = Settings()
+    replay, final = record_game(settings, "obstacle", seed=3)
+    replay.save(tmp_path / "game.snkr")
+    player = play_headless(Replay.load(tmp_path / "game.snkr"), settings)
+    assert player.desync_step is None
+    assert player.position == replay.end_step
+    assert player.simulation.checksum() == final
+    assert player.simulation.score == replay.score
+    
+def test_seek_to_keyframes():
+    settings = Settings()
+    replay, final = record_game(settings)
+    interval = ReplayPlayer.KEYFRAME_INTERVAL
+    assert replay.end_step > interval * 2
+    player = ReplayPlayer(replay, Simulation(settings))
+    player.seek(replay.end_step)
+    assert player.simulation.checksum() == final
+    
+    # Back to a keyframe, between keyframes, then forward to the end again
+    player.seek(interval)
+    assert player.simulation.checksum() == replay.checksums[interval]
+    player.seek(interval + 1)
+    player.seek(interval * 2)
+    assert player.simulation.checksum() == replay.checksums[interval * 2]
+    player.seek(replay.end_step)
+    assert player.simulation.checksum() == final
+    assert player.desync_step is None
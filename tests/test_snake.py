@@ -0,0 +1,63 @@
+import random
+from collections import Counter
+from src.settings import Settings
+from src.snake import Snake
+from src.grid import SNAKE
+
+def check_body(snake):
+    grid = snake.grid
+    segments = [snake.get_segment_position(i) for i in range(snake.length)]
+    assert snake.get_segments_positions() == segments
+    
+    # The grid marks exactly the body's cells, counting overlapping segments
+    counts = Counter(y * grid.width + x for x, y in segments)
+    marked = {i for i, cell in enumerate(grid.cells) if cell & SNAKE}
+    assert marked == set(counts)
+    assert all(grid.snake_counts[i] == min(count, 255) for i, count in counts.items())
+    
+def test_ring_buffer_body_matches_grid():
+    settings = Settings()
+    settings.set_world_size((12, 10))
+    snake = Snake(settings)
+    rng = random.Random(0)
+    interval = 1000 / snake.speed
+    for move in range(3000):
+        snake.change_direction(rng.choice(["UP", "DOWN", "LEFT", "RIGHT"]))
+        if rng.random() < 0.05:
+            snake.grow(rng.randrange(1, 4))
+        elif rng.random() < 0.01:
+            snake.shrink(max(1, snake.length // 2))
+        assert snake.step(interval)
+        if move % 50 == 0:
+            check_body(snake)
+            
+    check_body(snake)
+    
+    # Outgrow the board (and the buffer's initial capacity) by overlapping itself
+    snake.grow(200)
+    for _ in range(200):
+        snake.change_direction(rng.choice(["UP", "DOWN", "LEFT", "RIGHT"]))
+        snake.step(interval)
+    assert snake.length > 12 * 10 and len(snake.body) >= snake.length
+    check_body(snake)
+    
+def test_snapshot_and_restore():
+    settings = Settings()
+    snake = Snake(settings)
+    rng = random.Random(1)
+    interval = 1000 / snake.speed
+    snake.grow(20)
+    for _ in range(100):
+        snake.change_direction(rng.choice(["UP", "DOWN", "LEFT", "RIGHT"]))
+        snake.step(interval)
+    state, cells = snake.snapshot(), snake.grid.snapshot()
+    before = snake.get_segments_positions()
+    for _ in range(100):
+        snake.step(interval)
+    snake.restore(state)
+    snake.grid.restore(cells)
+    assert snake.get_segments_positions() == before
+    check_body(snake)
+    for _ in range(100):
+        snake.step(interval)
+    check_body(snake)
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""Play many seeded headless games with computer players, in parallel.
+
+Games are spread over a process pool (one worker per core by default), and
+each game's result is written as a line of JSON as soon as it finishes. A
+summary per mode and controller is printed at the end. Settings can be
+overridden to compare balance changes:
+
+    python tournament.py --games 1000 --set POWERUP_SPAWN_CHANCE=0.2 \\
+        --set classic.speed_increase=0.8 --output results.jsonl
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import argparse
+import ast
+import itertools
+import json
+import multiprocessing
+import statistics
+import sys
+import time
+from src.settings import Settings
+from src.simulation import Simulation
+from src.autopilot import Autopilot
+from src.hamiltonian import HamiltonianSolver
+
+CONTROLLERS = {
+    "autopilot": Autopilot,
+    "hamiltonian": HamiltonianSolver,
+}
+
+def parse_override(text):
+    """Parse NAME=VALUE (a Settings attribute) or MODE.KEY=VALUE (a game mode entry)."""
+    name, separator, value = text.partition("=")
+    if not separator:
+        raise argparse.ArgumentTypeError(f"expected NAME=VALUE, got {text!r}")
+    try:
+        value = ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        pass  # Plain strings don't need quotes
+    return name.strip(), value
+
+
+def make_settings(overrides):
+    settings = Settings()
+    settings.SOUND_ENABLED = False
+    settings.REPLAY_RECORDING = False
+    for name, value in overrides:
+        mode, dot, key = name.partition(".")
+        if dot:
+            if mode not in settings.GAME_MODES:
+                raise ValueError(f"Unknown game mode {mode!r}")
+            settings.GAME_MODES[mode][key] = value
+        elif hasattr(settings, name):
+            setattr(settings, name, value)
+        else:
+            raise ValueError(f"Unknown setting {name!r}")
+    return settings
+
+
+# Per-worker state, set up once by init_worker rather than sent with every game
+_settings = None
+_max_moves = None
+
+def init_worker(overrides, max_moves):
+    global _settings, _max_moves
+    _settings = make_settings(overrides)
+    _max_moves = max_moves
+
+
+def play_game(game):
+    """Play one game to the end (or max_moves snake moves). Returns its result."""
+    mode, controller_name, seed = game
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+    
+    # Step at the game's fixed tick rate, so speed-ups and time limits play
+    # out as they would on screen
+    simulation = Simulation(_settings, mode, seed)
+    controller = CONTROLLERS[controller_name](simulation)
+    dt = 1000 / _settings.TICK_RATE
+    while not simulation.game_over and simulation.ticks < _max_moves:
+        simulation.step(dt, controller.next_direction())
+        
+    return {
+        "mode": mode,
+        "controller": controller_name,
+        "seed": seed,
+        "score": simulation.score,
+        "length": simulation.snake.length,
+        "ticks": simulation.ticks,
+        "time_ms": round(simulation.time),
+        "cause": simulation.cause_of_death if simulation.game_over else "limit",
+        "wall_s": round(time.perf_counter() - start, 4),
+        "cpu_s": round(time.process_time() - cpu_start, 4),
+    }
+
+
+def summarize(results):
+    """Statistics per (mode, controller) over a list of game results."""
+    groups = {}
+    for result in results:
+        groups.setdefault((result["mode"], result["controller"]), []).append(result)
+        
+    summary = []
+    for (mode, controller), games in sorted(groups.items()):
+        scores = sorted(game["score"] for game in games)
+        causes = {}
+        for game in games:
+            causes[game["cause"]] = causes.get(game["cause"], 0) + 1
+        summary.append({
+            "mode": mode,
+            "controller": controller,
+            "games": len(games),
+            "score_mean": round(statistics.fmean(scores), 2),
+            "score_stdev": round(statistics.pstdev(scores), 2),
+            "score_min": scores[0],
+            "score_median": statistics.median(scores),
+            "score_p90": scores[min(len(scores) - 1, int(len(scores) * 0.9))],
+            "score_max": scores[-1],
+            "length_mean": round(statistics.fmean(game["length"] for game in games), 2),
+            "ticks_mean": round(statistics.fmean(game["ticks"] for game in games), 1),
+            "causes": causes,
+        })
+    return summary
+
+
+def print_summary(summary, out=sys.stderr):
+    print(f"{'mode':<12} {'controller':<12} {'games':>6} {'score':>8} {'stdev':>7} {'median':>7} "
+          f"{'p90':>6} {'max':>6} {'length':>7} {'moves':>8}  causes", file=out)
+    for row in summary:
+        causes = ", ".join(f"{cause} {count}" for cause, count in sorted(row["causes"].items()))
+        print(f"{row['mode']:<12} {row['controller']:<12} {row['games']:>6} {row['score_mean']:>8.1f} "
+              f"{row['score_stdev']:>7.1f} {row['score_median']:>7g} {row['score_p90']:>6} "
+              f"{row['score_max']:>6} {row['length_mean']:>7.1f} {row['ticks_mean']:>8.0f}  {causes}",
+              file=out)
+
+
+def main():
+    settings = Settings()
+    parser = argparse.ArgumentParser(description="Play many headless games with computer players.")
+    parser.add_argument("--modes", default=",".join(settings.GAME_MODES),
+                        help="comma-separated game modes (default: all)")
+    parser.add_argument("--controllers", default=",".join(CONTROLLERS),
+                        help="comma-separated controllers (default: all)")
+    parser.add_argument("--games", type=int, default=100, help="games per mode and controller")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="first seed; game i of every mode and controller uses seed + i")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(),
+                        help="worker processes (default: one per core)")
+    parser.add_argument("--max-moves", type=int, default=20000,
+                        help="end games after this many snake moves")
+    parser.add_argument("--set", dest="overrides", type=parse_override, action="append", default=[],
+                        metavar="NAME=VALUE",
+                        help="override a setting, or a game mode entry as MODE.KEY=VALUE")
+    parser.add_argument("--output", help="write per-game JSON lines here instead of stdout")
+    parser.add_argument("--summary", metavar="JSON", help="also write the summary to this file")
+    args = parser.parse_args()
+    
+    modes = args.modes.split(",")
+    controllers = args.controllers.split(",")
+    for mode in modes:
+        if mode not in settings.GAME_MODES:
+            parser.error(f"unknown mode {mode!r} (choose from {', '.join(settings.GAME_MODES)})")
+    for controller in controllers:
+        if controller not in CONTROLLERS:
+            parser.error(f"unknown controller {controller!r} (choose from {', '.join(CONTROLLERS)})")
+    try:
+        make_settings(args.overrides)
+    except ValueError as e:
+        parser.error(str(e))
+        
+    games = list(itertools.product(modes, controllers, range(args.seed, args.seed + args.games)))
+    
+    # Small chunks keep every worker busy to the end, while saving a round
+    # trip per game when games are short
+    chunksize = max(1, len(games) // (args.jobs * 32))
+    
+    out = open(args.output, "w") if args.output else sys.stdout
+    results = []
+    start = time.perf_counter()
+    try:
+        with multiprocessing.Pool(args.jobs, init_worker, (args.overrides, args.max_moves)) as pool:
+            for result in pool.imap_unordered(play_game, games, chunksize):
+                results.append(result)
+                print(json.dumps(result), file=out, flush=True)
+                if len(results) % 100 == 0:
+                    print(f"{len(results)}/{len(games)} games", file=sys.stderr)
+    except KeyboardInterrupt:
+        print(f"Interrupted after {len(results)} games", file=sys.stderr)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - start
+    
+    summary = summarize(results)
+    print_summary(summary)
+    cpu = sum(result["cpu_s"] for result in results)
+    print(f"{len(results)} games in {elapsed:.1f}s ({len(results) / elapsed:.1f} games/s) on "
+          f"{args.jobs} workers, {cpu / (elapsed * args.jobs):.0%} busy", file=sys.stderr)
+    if args.summary:
+        with open(args.summary, "w") as f:
+            json.dump({"settings": dict(args.overrides), "elapsed_s": round(elapsed, 2),
+                       "jobs": args.jobs, "groups": summary}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file